@@ -5,7 +5,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 
 
 class AIProvider(ABC):
@@ -41,6 +41,24 @@ class AIProvider(ABC):
         """
         pass
 
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Получить эмбеддинги для списка текстов.
+        
+        Необязательная возможность: провайдеры без embedding endpoint
+        оставляют реализацию по умолчанию.
+        
+        Args:
+            texts: Тексты для векторизации
+            
+        Returns:
+            Список векторов (по одному на текст)
+            
+        Raises:
+            AIProviderError: Если провайдер не поддерживает эмбеддинги
+        """
+        raise AIProviderError(f"Провайдер {self.name} не поддерживает эмбеддинги")
+
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -2,6 +2,8 @@
 Унифицированный AI клиент.
 """
 
+from typing import List
+
 from ontology_toolkit.ai.base_provider import AIProvider, AIProviderError
 
 
@@ -48,6 +50,34 @@ class AIClient:
         except Exception as e:
             raise AIProviderError(f"Ошибка генерации: {e}")
 
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Получить эмбеддинги с обработкой ошибок.
+        
+        Подходит как функция модели для `EmbeddingIndex`.
+        
+        Args:
+            texts: Тексты для векторизации
+            
+        Returns:
+            Список векторов
+            
+        Raises:
+            AIProviderError: При ошибке или отсутствии поддержки эмбеддингов
+        """
+        if not self.is_available():
+            raise AIProviderError(
+                f"Провайдер {self.provider.name} недоступен. "
+                f"Проверьте API ключ и установку библиотеки."
+            )
+        
+        try:
+            return self.provider.embed(texts)
+        except AIProviderError:
+            raise
+        except Exception as e:
+            raise AIProviderError(f"Ошибка получения эмбеддингов: {e}")
+
     def is_available(self) -> bool:
         """
         Проверить доступность провайдера.
@@ -4,26 +4,41 @@
 
 import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from ontology_toolkit.ai.client import AIClient
-from ontology_toolkit.core.schema import Concept, ConceptStatus, MetaMetaType
+from ontology_toolkit.core.embeddings import EmbeddingIndex
+from ontology_toolkit.core.schema import Concept, ConceptSchema, ConceptStatus, MetaMetaType
+from ontology_toolkit.core.similarity import entity_text
 from ontology_toolkit.core.ontology import Ontology
 
 
 class ConceptExtractor:
     """Извлечение понятий из текста через AI."""
 
-    def __init__(self, client: AIClient, ontology: Ontology):
+    # Косинусная близость, начиная с которой понятие считается семантическим дубликатом
+    DUPLICATE_THRESHOLD = 0.9
+
+    def __init__(
+        self,
+        client: AIClient,
+        ontology: Ontology,
+        embeddings: Optional[EmbeddingIndex] = None,
+    ):
         """
         Инициализация extractor'а.
         
         Args:
             client: AI клиент
             ontology: Онтология проекта
+            embeddings: Индекс эмбеддингов для поиска семантических дубликатов
+                (по умолчанию — индекс, подключённый к онтологии, если есть)
         """
         self.client = client
         self.ontology = ontology
+        self.embeddings = embeddings if embeddings is not None else ontology.embeddings
+        # (извлечённое понятие, ID существующего, близость) из последнего извлечения
+        self.duplicates: List[Tuple[Concept, str, float]] = []
 
     def extract_from_file(self, file_path: Path | str) -> List[Concept]:
         """
@@ -62,8 +77,46 @@ class ConceptExtractor:
         # Парсим ответ
         concepts = self._parse_extraction_response(response)
         
+        # Отсеиваем семантические дубликаты существующих понятий
+        if self.embeddings is not None:
+            concepts = self._drop_duplicates(concepts)
+        
         return concepts
 
+    def _drop_duplicates(self, concepts: List[Concept]) -> List[Concept]:
+        """
+        Убрать понятия, семантически совпадающие с уже существующими.
+        
+        Args:
+            concepts: Извлечённые понятия
+            
+        Returns:
+            Понятия без дубликатов (ID перенумерованы подряд)
+        """
+        assert self.embeddings is not None
+        self.embeddings.sync(self.ontology.index.by_id.values())
+        self.duplicates = []
+        
+        # Все тексты кандидатов векторизуются пачкой, а не вызовом на понятие
+        results = self.embeddings.query_texts(
+            [entity_text(concept) for concept in concepts],
+            k=1,
+            min_score=self.DUPLICATE_THRESHOLD,
+        )
+        unique: List[Concept] = []
+        for concept, matches in zip(concepts, results):
+            if matches:
+                existing_id, score = matches[0]
+                self.duplicates.append((concept, existing_id, score))
+            else:
+                unique.append(concept)
+        
+        if len(unique) != len(concepts):
+            _, next_num = ConceptSchema.parse_id(self.ontology.get_next_id("C"))
+            for i, concept in enumerate(unique):
+                concept.id = ConceptSchema.format_id("C", next_num + i)
+        return unique
+
     def _build_extraction_prompt(self, text: str) -> str:
         """
         Построить промпт для извлечения понятий.
@@ -147,7 +200,6 @@ class ConceptExtractor:
         # Получаем следующий ID (формат: C_5)
         next_id_str = self.ontology.get_next_id("C")
         # Извлекаем номер из ID
-        from ontology_toolkit.core.schema import ConceptSchema
         _, next_num = ConceptSchema.parse_id(next_id_str)
         
         for i, row in enumerate(data_rows):
@@ -14,6 +14,9 @@ from ontology_toolkit.core.schema import Concept, ConceptStatus
 class ConceptFiller:
     """Заполнение понятий через AI."""
 
+    # Поля, которые может изменить fill_concept (записываются в журнал пакетных запусков)
+    FILLED_FIELDS = ("definition", "purpose", "meta_meta", "examples", "relations", "status", "updated")
+
     def __init__(self, client: AIClient, ontology: Ontology):
         """
         Инициализация filler'а.
@@ -2,7 +2,7 @@
 Google Gemini провайдер.
 """
 
-from typing import Optional
+from typing import List, Optional
 
 from ontology_toolkit.ai.base_provider import AIProvider, AIProviderError
 
@@ -10,6 +10,8 @@ from ontology_toolkit.ai.base_provider import AIProvider, AIProviderError
 class GeminiProvider(AIProvider):
     """Провайдер для Google Gemini API."""
 
+    EMBEDDING_MODEL = "models/text-embedding-004"
+
     def __init__(self, api_key: str, model: str = "gemini-pro", temperature: float = 0.3):
         """
         Инициализация Gemini провайдера.
@@ -52,6 +54,16 @@ class GeminiProvider(AIProvider):
         except Exception as e:
             raise AIProviderError(f"Gemini generation failed: {e}")
 
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Эмбеддинги через Gemini Embedding API."""
+        try:
+            self._get_model()  # Конфигурирует genai с API ключом
+            import google.generativeai as genai
+            response = genai.embed_content(model=self.EMBEDDING_MODEL, content=texts)
+            return list(response["embedding"])
+        except Exception as e:
+            raise AIProviderError(f"Gemini embedding failed: {e}")
+
     def is_available(self) -> bool:
         """Проверка доступности."""
         if not self.api_key:
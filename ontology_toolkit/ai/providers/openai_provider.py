@@ -2,7 +2,7 @@
 OpenAI ChatGPT провайдер.
 """
 
-from typing import Optional
+from typing import List, Optional
 
 from ontology_toolkit.ai.base_provider import AIProvider, AIProviderError
 
@@ -10,6 +10,8 @@ from ontology_toolkit.ai.base_provider import AIProvider, AIProviderError
 class OpenAIProvider(AIProvider):
     """Провайдер для OpenAI API (ChatGPT)."""
 
+    EMBEDDING_MODEL = "text-embedding-3-small"
+
     def __init__(self, api_key: str, model: str = "gpt-4-turbo", temperature: float = 0.3):
         """
         Инициализация OpenAI провайдера.
@@ -49,6 +51,15 @@ class OpenAIProvider(AIProvider):
         except Exception as e:
             raise AIProviderError(f"OpenAI generation failed: {e}")
 
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Эмбеддинги через OpenAI Embeddings API."""
+        try:
+            client = self._get_client()
+            response = client.embeddings.create(model=self.EMBEDDING_MODEL, input=texts)
+            return [item.embedding for item in response.data]
+        except Exception as e:
+            raise AIProviderError(f"OpenAI embedding failed: {e}")
+
     def is_available(self) -> bool:
         """Проверка доступности."""
         if not self.api_key:
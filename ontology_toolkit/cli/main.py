@@ -6,14 +6,21 @@ CLI для Ontology Toolkit.
 - add: добавить понятие
 - list: показать список объектов
 - audit: проверить онтологию
-- export: экспортировать в CSV/XLSX
+- export: экспортировать в CSV/XLSX/Parquet/RDF/GraphML/GEXF/DOT
 - graph: создать граф связей (Mermaid)
+- site: статический HTML-сайт онтологии (инкрементальная сборка)
+- diff: сравнить онтологию между двумя ревизиями Git
+- pack/unpack: сжатый пакет онтологии для переноса
+- layout: сменить раскладку файлов (flat/sharded)
+- migrate: привести файлы к текущей версии схемы
+- import: импортировать объекты из Parquet
+- validate: проверка онтологии по правилам (схема, связи, meta_meta; для CI)
 """
 
 import sys
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 # Настройка кодировки для Windows
 if sys.platform == "win32":
@@ -59,7 +66,8 @@ from rich.table import Table
 
 from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
 from ontology_toolkit.core.schema import ConceptStatus
-from ontology_toolkit.io.csv_export import export_concepts_to_csv
+from ontology_toolkit.io.csv_export import iter_entities, selected_types, stream_csv
+from ontology_toolkit.io.streams import is_stdout
 from ontology_toolkit.io.xlsx_export import export_to_xlsx
 
 app = typer.Typer(
@@ -78,6 +86,21 @@ console = Console(
 # Путь к онтологии по умолчанию
 DEFAULT_ONTOLOGY_PATH = Path(".ontology")
 
+# Форматы export и расширения файла по умолчанию
+EXPORT_EXTENSIONS: Dict[str, str] = {
+    "csv": "csv",
+    "xlsx": "xlsx",
+    "parquet": "parquet",
+    "turtle": "ttl",
+    "jsonld": "jsonld",
+    "graphml": "graphml",
+    "gexf": "gexf",
+    "dot": "dot",
+}
+
+# Форматы с потоковой записью (stdout, --compress)
+STREAMING_FORMATS = ("csv", "turtle", "jsonld", "graphml", "gexf", "dot")
+
 SUPPORTED_ENTITY_TYPES = tuple(ENTITY_REGISTRY.keys())
 TYPE_TO_PREFIX: Dict[str, str] = {
     name: config["prefix"] for name, config in ENTITY_REGISTRY.items()
@@ -106,13 +129,22 @@ def normalize_entity_type(value: str) -> str:
 @app.command()
 def init(
     project: str = typer.Option("Ontology Project", "--project", "-p", help="Название проекта"),
+    layout: str = typer.Option("flat", "--layout", help="Раскладка файлов: flat или sharded (для очень больших онтологий)"),
     path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
 ):
     """
     Инициализировать структуру онтологии проекта.
     
-    Создаёт папки для каждого типа объектов и README файл.
+    Создаёт папки для каждого типа объектов, README и ontology.yaml.
     """
+    from ontology_toolkit.core.config import CONFIG_FILE, save_config
+    from ontology_toolkit.core.migrations import CURRENT_SCHEMA_VERSION
+    from ontology_toolkit.core.schema import OntologyConfig
+    
+    if layout not in ("flat", "sharded"):
+        console.print(f"[red][ERROR] Неизвестная раскладка: {layout} (flat/sharded)[/red]")
+        raise typer.Exit(code=1)
+    
     try:
         # Создаём структуру папок
         folders = ["concepts", "methods", "systems", "problems", "artifacts", "context"]
@@ -159,6 +191,15 @@ ontology export --format csv
 """
             readme_path.write_text(readme_content, encoding="utf-8")
         
+        # Конфигурация проекта (раскладка файлов и т.п.)
+        if not (path / CONFIG_FILE).exists():
+            save_config(
+                path,
+                OntologyConfig(
+                    project_name=project, layout=layout, schema_version=CURRENT_SCHEMA_VERSION
+                ),
+            )
+        
         # Создаём project_context.yaml из template
         context_file = path / "context" / "project_context.yaml"
         if not context_file.exists():
@@ -358,115 +399,568 @@ def audit(
         raise typer.Exit(code=1)
 
 
+@app.command()
+def validate(
+    rules: Optional[List[str]] = typer.Option(None, "--rule", "-r", help="Только указанные правила (можно несколько)"),
+    strict: bool = typer.Option(False, "--strict", help="Предупреждения тоже считать ошибками"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Процессов проверки (по умолчанию — число ядер)"),
+    as_json: bool = typer.Option(False, "--json", help="Вывести отчёт в JSON"),
+    limit: int = typer.Option(50, "--limit", help="Сколько проблем показать (без --json)"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Проверить онтологию по правилам (для CI).
+    
+    Схема каждого файла, заглушки [пусто], существование целей связей,
+    взаимность симметричных связей, правила meta_meta.
+    Файлы проверяются параллельно; код 1, если есть ошибки (--strict — и предупреждения).
+    """
+    from ontology_toolkit.core.validation import RULES, validate_ontology
+    
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    
+    unknown = sorted(set(rules or []) - set(RULES))
+    if unknown:
+        console.print(f"[red][ERROR] Неизвестные правила: {', '.join(unknown)}[/red]")
+        console.print(f"[yellow]Доступны: {', '.join(RULES)}[/yellow]")
+        raise typer.Exit(code=1)
+    
+    try:
+        report = validate_ontology(path, rules=rules or None, workers=workers)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка проверки: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    passed = report.passed(strict=strict)
+    if as_json:
+        typer.echo(report.model_dump_json(indent=2))
+        if not passed:
+            raise typer.Exit(code=1)
+        return
+    
+    summary = (
+        f"файлов: {report.files_checked}, объектов: {report.entities}, "
+        f"{report.duration_seconds:.2f} с"
+    )
+    if not report.issues:
+        console.print(f"[green][OK] Проверено {summary}, ошибок нет[/green]")
+        return
+    
+    for issue in report.issues[:limit]:
+        color = "red" if issue.severity == "error" else "yellow"
+        location = issue.file or issue.entity_id or ""
+        console.print(f"[{color}]  {issue.severity:7}[/{color}] [dim]{issue.rule:18}[/dim] {location}: {issue.message}")
+    if len(report.issues) > limit:
+        console.print(f"[dim]  ... и ещё {len(report.issues) - limit}[/dim]")
+    
+    color = "green" if passed else "red"
+    console.print(
+        f"\n[{color}]Ошибок: {len(report.errors)}, предупреждений: {len(report.warnings)} "
+        f"(проверено {summary})[/{color}]"
+    )
+    if not passed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def diff(
+    old_rev: str = typer.Argument(..., help="Исходная ревизия (коммит, ветка, тег)"),
+    new_rev: str = typer.Argument("HEAD", help="Новая ревизия"),
+    as_json: bool = typer.Option(False, "--json", help="Вывести результат в JSON"),
+    timestamps: bool = typer.Option(
+        False, "--timestamps", help="Показывать изменения полей created/updated"
+    ),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Сравнить онтологию между двумя ревизиями Git.
+    
+    Читает обе ревизии напрямую из объектов Git (без checkout):
+    разбираются только файлы, у которых различается хэш содержимого.
+    """
+    from ontology_toolkit.core.diff import diff_revisions
+    from ontology_toolkit.core.gitstore import GitError
+    
+    try:
+        result = diff_revisions(path, old_rev, new_rev, timestamps=timestamps)
+    except GitError as e:
+        console.print(f"[red][ERROR] Ошибка Git: {e}[/red]")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка сравнения: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    if as_json:
+        typer.echo(result.model_dump_json(indent=2))
+        return
+    
+    console.print(f"[bold]Сравнение {old_rev} → {new_rev}[/bold]")
+    if result.is_empty:
+        console.print("[green][OK] Изменений нет[/green]")
+    
+    for summary in result.added:
+        console.print(f"[green]+ {summary.id} {summary.name}[/green] [dim]{summary.path}[/dim]")
+    for summary in result.removed:
+        console.print(f"[red]- {summary.id} {summary.name}[/red] [dim]{summary.path}[/dim]")
+    for change in result.changed:
+        console.print(f"[yellow]~ {change.id} {change.name}[/yellow]")
+        if change.old_path != change.new_path:
+            console.print(f"[dim]    файл: {change.old_path} → {change.new_path}[/dim]")
+        for field_change in change.fields:
+            console.print(
+                f"[dim]    {field_change.field}: {field_change.old!r} → {field_change.new!r}[/dim]"
+            )
+    
+    if result.relations_added or result.relations_removed:
+        console.print("\n[bold]Связи[/bold]")
+        for edge in result.relations_added:
+            console.print(f"[green]+ {edge}[/green]")
+        for edge in result.relations_removed:
+            console.print(f"[red]- {edge}[/red]")
+    
+    for error in result.errors:
+        console.print(f"[red][!] {error}[/red]")
+    
+    console.print(
+        f"\n[dim]Добавлено: {len(result.added)}, удалено: {len(result.removed)}, "
+        f"изменено: {len(result.changed)}, без изменений: {result.unchanged}"
+        + (f", только отметки времени: {result.touched}" if result.touched else "")
+        + "[/dim]"
+    )
+
+
 @app.command()
 def export(
-    format: str = typer.Option("csv", "--format", "-f", help="Формат экспорта (csv/xlsx)"),
-    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Путь к выходному файлу"),
+    format: str = typer.Option("csv", "--format", "-f", help="Формат экспорта (csv/xlsx/parquet/turtle/jsonld/graphml/gexf/dot)"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Путь к выходному файлу (- для stdout: csv, turtle, jsonld, graphml, gexf, dot)"),
     prefix: Optional[str] = typer.Option(None, "--prefix", "-p", help="Фильтр по префиксу"),
     status: Optional[str] = typer.Option(None, "--status", "-s", help="Фильтр по статусу"),
+    columns: Optional[str] = typer.Option(None, "--columns", "-c", help="Колонки CSV через запятую (id,name,status)"),
+    compress: Optional[str] = typer.Option(None, "--compress", help="Сжатие потоковых форматов: gzip или zstd (по умолчанию — по расширению .gz/.zst)"),
+    base: str = typer.Option("urn:ontology:", "--base", help="Префикс IRI объектов (turtle/jsonld)"),
+    vocab: Optional[str] = typer.Option(None, "--vocab", help="IRI словаря ot: (turtle/jsonld; по умолчанию rdf_vocabulary из ontology.yaml)"),
     path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
 ):
     """
-    Экспортировать онтологию в CSV или XLSX формат.
+    Экспортировать онтологию в CSV, XLSX, Parquet, RDF (Turtle, JSON-LD)
+    или граф связей (GraphML, GEXF, DOT).
+    
+    --prefix/--status отбирают объекты во всех форматах, кроме XLSX;
+    в граф попадают связи только между отобранными объектами.
+    CSV, RDF и графы пишутся потоково: `-o -` выводит в stdout (для конвейеров),
+    `.gz`/`.zst` в имени файла включают сжатие. Parquet — две таблицы
+    (объекты и связи) с типизированными колонками для pandas/Polars/DuckDB.
+    Turtle/JSON-LD загружаются в хранилище троек для SPARQL;
+    GraphML открывают yEd/Cytoscape, GEXF — Gephi, DOT — Graphviz.
     """
+    to_stdout = output is not None and is_stdout(output)
+    # При выводе в stdout сообщения идут в stderr, чтобы не смешиваться с данными
+    out = Console(stderr=True) if to_stdout else console
+    
+    # Проверяем существование онтологии
+    if not path.exists():
+        out.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        out.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    if format not in EXPORT_EXTENSIONS:
+        out.print(f"[red][ERROR] Неподдерживаемый формат: {format}[/red]")
+        out.print(f"[dim]Доступные: {', '.join(EXPORT_EXTENSIONS)}[/dim]")
+        raise typer.Exit(code=1)
+    if format not in STREAMING_FORMATS and (to_stdout or compress):
+        out.print(f"[red][ERROR] stdout и --compress поддерживаются для {', '.join(STREAMING_FORMATS)}[/red]")
+        raise typer.Exit(code=1)
+    if format != "csv" and columns:
+        out.print(f"[red][ERROR] --columns поддерживается только для CSV[/red]")
+        raise typer.Exit(code=1)
+    if compress not in (None, "gzip", "zstd"):
+        out.print(f"[red][ERROR] Неизвестное сжатие: {compress} (доступные: gzip, zstd)[/red]")
+        raise typer.Exit(code=1)
+    
     try:
-        # Проверяем существование онтологии
-        if not path.exists():
-            console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
-            console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
-            raise typer.Exit(code=1)
-        
         # Загружаем онтологию
         onto = Ontology(path)
+        if to_stdout:
+            onto.console = out
         onto.load_all()
         
         # Определяем выходной файл
         if not output:
-            output = Path(f"ontology_export.{format}")
+            output = Path(f"ontology_export.{EXPORT_EXTENSIONS[format]}")
         
         # Экспорт
+        status_enum = ConceptStatus(status) if status else None
         if format == "csv":
-            status_enum = ConceptStatus(status) if status else None
-            count = export_concepts_to_csv(onto, output, prefix, status_enum)
-            console.print(f"[green][OK] Экспортировано {count} объектов в {output.absolute()}[/green]")
+            stats = stream_csv(
+                iter_entities(onto, prefix, status_enum),
+                output,
+                entity_types=selected_types(onto, prefix, status_enum),
+                columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+                compression=compress,
+            )
+            target = "stdout" if to_stdout else output.absolute()
+            out.print(f"[green][OK] Экспортировано {stats.rows} объектов в {target}[/green]")
+            out.print(f"[dim]  {stats.summary()}[/dim]")
+        elif format in ("turtle", "jsonld"):
+            from ontology_toolkit.io.rdf_export import stream_rdf
+            
+            stats = stream_rdf(
+                onto,
+                output,
+                format,
+                base=base,
+                vocabulary=vocab,
+                compression=compress,
+                entities=iter_entities(onto, prefix, status_enum),
+            )
+            target = "stdout" if to_stdout else output.absolute()
+            out.print(f"[green][OK] Экспортировано {stats.rows} объектов в {target}[/green]")
+            out.print(f"[dim]  {stats.summary()}[/dim]")
+        elif format in ("graphml", "gexf", "dot"):
+            from ontology_toolkit.io.graph_export import stream_graph
+            
+            stats = stream_graph(
+                onto,
+                output,
+                format,
+                compression=compress,
+                entities=iter_entities(onto, prefix, status_enum),
+            )
+            target = "stdout" if to_stdout else output.absolute()
+            out.print(
+                f"[green][OK] Экспортирован граф: {stats.rows} узлов, {stats.edges} рёбер в {target}[/green]"
+            )
+            out.print(f"[dim]  {stats.summary()}[/dim]")
+        elif format == "parquet":
+            from ontology_toolkit.io.parquet_io import export_to_parquet, relations_path
             
-        elif format == "xlsx":
+            counts = export_to_parquet(
+                onto, output, entities=iter_entities(onto, prefix, status_enum)
+            )
+            out.print(f"[green][OK] Экспортировано {counts['entities']} объектов в {output.absolute()}[/green]")
+            out.print(f"[dim]  - связи ({counts['relations']}): {relations_path(output)}[/dim]")
+        else:
             stats = export_to_xlsx(onto, output)
-            console.print(f"[green][OK] Экспортировано в {output.absolute()}[/green]")
+            out.print(f"[green][OK] Экспортировано в {output.absolute()}[/green]")
             for sheet, count in stats.items():
-                console.print(f"[dim]  - {sheet}: {count} объектов[/dim]")
-        else:
-            console.print(f"[red][ERROR] Неподдерживаемый формат: {format}[/red]")
-            console.print(f"[dim]Доступные: csv, xlsx[/dim]")
-            raise typer.Exit(code=1)
+                out.print(f"[dim]  - {sheet}: {count} объектов[/dim]")
         
     except Exception as e:
-        console.print(f"[red][ERROR] Ошибка экспорта: {e}[/red]")
+        out.print(f"[red][ERROR] Ошибка экспорта: {e}[/red]")
+        raise typer.Exit(code=1)
+
+
+@app.command(name="import")
+def import_entities(
+    source: Path = typer.Argument(..., help="Таблица объектов Parquet (связи — в <имя>.relations.parquet рядом)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Показать изменения, не записывать файлы"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Импортировать объекты из Parquet (результат export --format parquet).
+    
+    Объекты с неизменившимся содержимым пропускаются, остальные
+    добавляются или заменяют существующие и записываются в файлы.
+    """
+    from ontology_toolkit.io.parquet_io import import_parquet
+    
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    if not source.exists():
+        console.print(f"[red][ERROR] Файл не найден: {source}[/red]")
+        raise typer.Exit(code=1)
+    
+    try:
+        onto = Ontology(path)
+        onto.load_all()
+        report = import_parquet(onto, source)
+        if not dry_run:
+            onto.save_all()
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка импорта: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    for entity_id in report.added:
+        console.print(f"  [green]+ {entity_id}[/green]")
+    for entity_id in report.updated:
+        console.print(f"  [yellow]~ {entity_id}[/yellow]")
+    prefix = "Dry run - " if dry_run else ""
+    console.print(
+        f"[green][OK] {prefix}Добавлено: {len(report.added)}, обновлено: {len(report.updated)}, "
+        f"без изменений: {report.unchanged}[/green]"
+    )
+
+
+@app.command()
+def layout(
+    target: str = typer.Argument(..., help="Новая раскладка: flat или sharded"),
+    shard_size: Optional[int] = typer.Option(None, "--shard-size", help="Сущностей на подкаталог (sharded)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Показать план, не переносить файлы"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Перенести файлы онтологии в другую раскладку.
+    
+    sharded: concepts/00/C_100_*.md — подкаталоги по номеру ID,
+    чтобы в одном каталоге не было десятков тысяч файлов.
+    Файлы переименовываются, содержимое не меняется.
+    """
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    
+    try:
+        onto = Ontology(path)
+        onto.load_all()
+        moves = onto.relayout(target, shard_size=shard_size, dry_run=dry_run)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка смены раскладки: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    for source, destination in moves[:20]:
+        console.print(
+            f"[dim]{source.relative_to(path).as_posix()} → {destination.relative_to(path).as_posix()}[/dim]"
+        )
+    if len(moves) > 20:
+        console.print(f"[dim]... и ещё {len(moves) - 20}[/dim]")
+    
+    if dry_run:
+        console.print(f"[yellow]Dry run - будет перенесено файлов: {len(moves)}[/yellow]")
+    else:
+        console.print(f"[green][OK] Раскладка {target}: перенесено файлов: {len(moves)}[/green]")
+
+
+@app.command()
+def migrate(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Показать файлы, которые изменятся, без записи"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Процессов (по умолчанию — число ядер)"),
+    as_json: bool = typer.Option(False, "--json", help="Вывести отчёт в JSON"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Привести файлы онтологии к текущей версии схемы.
+    
+    Применяет миграции новее schema_version из ontology.yaml: файлы читаются
+    параллельно, переписываются атомарно и только если изменились.
+    """
+    from ontology_toolkit.core.migrations import migrate_ontology
+    
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    
+    try:
+        report = migrate_ontology(path, dry_run=dry_run, workers=workers)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка миграции: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    if as_json:
+        typer.echo(report.model_dump_json(indent=2))
+        if report.errors:
+            raise typer.Exit(code=1)
+        return
+    
+    if not report.applied:
+        console.print(f"[green][OK] Схема актуальна (версия {report.to_version})[/green]")
+        return
+    
+    console.print(f"[bold]Миграция схемы v{report.from_version} → v{report.to_version}[/bold]")
+    for description in report.applied:
+        console.print(f"[dim]  {description}[/dim]")
+    for file_name in report.changed[:20]:
+        console.print(f"  [cyan]{file_name}[/cyan]")
+    if len(report.changed) > 20:
+        console.print(f"[dim]  ... и ещё {len(report.changed) - 20}[/dim]")
+    for error in report.errors:
+        console.print(f"[red][!] {error}[/red]")
+    
+    summary = f"файлов: {report.files_checked}, {report.duration_seconds:.2f} с"
+    if dry_run:
+        console.print(f"[yellow]Dry run - будет изменено файлов: {len(report.changed)} ({summary})[/yellow]")
+    elif report.errors:
+        console.print(f"[red]Изменено: {len(report.changed)}, ошибок: {len(report.errors)}; версия схемы не обновлена[/red]")
+        raise typer.Exit(code=1)
+    else:
+        console.print(f"[green][OK] Изменено файлов: {len(report.changed)} ({summary})[/green]")
+
+
+@app.command()
+def pack(
+    output: Optional[Path] = typer.Argument(None, help="Файл пакета (по умолчанию ontology.bundle.zip)"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Упаковать онтологию в один сжатый файл.
+    
+    Пакет содержит файлы онтологии и манифест с их размерами и SHA-256.
+    """
+    from ontology_toolkit.io.bundle import pack_ontology
+    
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    
+    output = output or Path("ontology.bundle.zip")
+    try:
+        manifest = pack_ontology(path, output)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка упаковки: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    size_kb = output.stat().st_size / 1024
+    console.print(
+        f"[green][OK] Упаковано файлов: {len(manifest.files)}, "
+        f"объектов: {manifest.entity_count} → {output.absolute()} ({size_kb:.1f} КБ)[/green]"
+    )
+
+
+@app.command()
+def unpack(
+    bundle: Path = typer.Argument(..., help="Файл пакета"),
+    verify: bool = typer.Option(True, "--verify/--no-verify", help="Проверять хэши по манифесту"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
+    """
+    Распаковать пакет онтологии.
+    
+    Файлы, уже совпадающие локально, пропускаются; запись атомарная.
+    Локальные файлы переименованных в пакете сущностей удаляются.
+    """
+    from ontology_toolkit.io.bundle import unpack_bundle
+    
+    if not bundle.exists():
+        console.print(f"[red][ERROR] Пакет не найден: {bundle}[/red]")
+        raise typer.Exit(code=1)
+    
+    try:
+        report = unpack_bundle(bundle, path, verify=verify)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка распаковки: {e}[/red]")
+        raise typer.Exit(code=1)
+    
+    console.print(
+        f"[green][OK] Записано: {len(report.written)}, "
+        f"без изменений: {len(report.skipped)}[/green]"
+    )
+    if report.removed:
+        console.print(f"[dim]Удалены устаревшие имена файлов: {', '.join(report.removed)}[/dim]")
+    if report.errors:
+        for error in report.errors:
+            console.print(f"[red][!] {error}[/red]")
         raise typer.Exit(code=1)
 
 
 @app.command()
 def graph(
     output: Path = typer.Option(Path("visuals/ontology.mmd"), "--output", "-o", help="Путь к выходному файлу"),
+    focus: Optional[str] = typer.Option(None, "--focus", help="Только окрестность объекта (ID)"),
+    depth: int = typer.Option(1, "--depth", "-d", help="Глубина окрестности (с --focus)"),
+    relation: Optional[List[str]] = typer.Option(None, "--relation", "-r", help="Только связи этого типа (можно несколько)"),
+    group_by: Optional[str] = typer.Option(None, "--group-by", help="Группировка в subgraph: type или community"),
+    page_size: Optional[int] = typer.Option(None, "--page-size", help="Узлов на страницу (разбить на несколько файлов)"),
     path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
 ):
     """
     Создать граф связей в формате Mermaid (.mmd).
     
     Граф можно открыть в Obsidian или сконвертировать в PNG через mmdc.
+    Для больших онтологий: --focus/--depth, --relation, --group-by, --page-size.
     """
+    from ontology_toolkit.core.schema import RelationType
+    from ontology_toolkit.io.mermaid import write_mermaid
+    
+    # Проверяем существование онтологии
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
+    if group_by not in (None, "type", "community"):
+        console.print(f"[red][ERROR] Неизвестная группировка: {group_by} (доступные: type, community)[/red]")
+        raise typer.Exit(code=1)
+    valid_relations = {item.value for item in RelationType}
+    unknown = [value for value in relation or [] if value not in valid_relations]
+    if unknown:
+        console.print(f"[red][ERROR] Неизвестный тип связи: {', '.join(unknown)}[/red]")
+        console.print(f"[dim]Доступные: {', '.join(sorted(valid_relations))}[/dim]")
+        raise typer.Exit(code=1)
+    
     try:
-        # Проверяем существование онтологии
-        if not path.exists():
-            console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
-            console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
-            raise typer.Exit(code=1)
-        
         # Загружаем онтологию
         onto = Ontology(path)
         onto.load_all()
         
-        # Создаём Mermaid граф
-        mermaid_content = _generate_mermaid_graph(onto)
-        
-        # Сохраняем
-        output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(mermaid_content, encoding="utf-8")
-        
-        console.print(f"[green][OK] Граф сохранён в {output.absolute()}[/green]")
-        console.print(f"[dim]Узлов: {len(onto.index.by_id)}, рёбер: {onto.graph.number_of_edges()}[/dim]")
-        console.print(f"\n[yellow][TIP] Конвертировать в PNG: mmdc -i {output} -o {output.with_suffix('.png')}[/yellow]")
-        
+        report = write_mermaid(
+            onto,
+            output,
+            focus=focus,
+            depth=depth,
+            relation_types=[RelationType(value) for value in relation] if relation else None,
+            group_by=group_by,
+            page_size=page_size,
+        )
     except Exception as e:
         console.print(f"[red][ERROR] Ошибка создания графа: {e}[/red]")
         raise typer.Exit(code=1)
+    
+    if len(report.pages) == 1:
+        console.print(f"[green][OK] Граф сохранён в {Path(report.pages[0]).absolute()}[/green]")
+    else:
+        console.print(f"[green][OK] Граф сохранён на {len(report.pages)} страницах:[/green]")
+        for page in report.pages:
+            console.print(f"  [cyan]{page}[/cyan]")
+    for page in report.removed:
+        console.print(f"[dim]  - удалена страница прошлой разбивки: {page}[/dim]")
+    summary = f"Узлов: {report.nodes}, рёбер: {report.edges}"
+    if report.cross_page_edges:
+        summary += f" (между страницами: {report.cross_page_edges})"
+    console.print(f"[dim]{summary}[/dim]")
+    first = Path(report.pages[0])
+    console.print(f"\n[yellow][TIP] Конвертировать в PNG: mmdc -i {first} -o {first.with_suffix('.png')}[/yellow]")
 
 
-def _generate_mermaid_graph(onto: Ontology) -> str:
+@app.command()
+def site(
+    output: Path = typer.Option(Path("site"), "--output", "-o", help="Каталог сайта"),
+    title: Optional[str] = typer.Option(None, "--title", help="Заголовок сайта (по умолчанию — название проекта)"),
+    force: bool = typer.Option(False, "--force", help="Перерисовать все страницы"),
+    path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
+):
     """
-    Сгенерировать Mermaid граф из онтологии.
+    Собрать статический HTML-сайт онтологии.
     
-    Args:
-        onto: Онтология
-        
-    Returns:
-        Mermaid код
+    Страница на каждый объект (с обратными ссылками), списки по типам
+    и статусам, поиск в браузере. Повторная сборка перерисовывает только
+    страницы, у которых изменились объект, связанные объекты или обратные ссылки.
     """
-    lines = ["graph TD"]
+    from ontology_toolkit.io.site import build_site
     
-    # Добавляем узлы
-    for entity_id, entity in onto.index.by_id.items():
-        # Экранируем название для Mermaid
-        safe_name = entity.name.replace('"', '\\"')
-        lines.append(f'    {entity_id}["{safe_name}"]')
+    if not path.exists():
+        console.print(f"[red][ERROR] Онтология не найдена: {path}[/red]")
+        console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
+        raise typer.Exit(code=1)
     
-    # Добавляем рёбра
-    for entity_id, entity in onto.index.by_id.items():
-        for relation in entity.relations:
-            if relation.target in onto.index.by_id:
-                lines.append(f'    {entity_id} -->|{relation.type.value}| {relation.target}')
+    try:
+        onto = Ontology(path)
+        onto.load_all()
+        report = build_site(onto, output, title=title, force=force)
+    except Exception as e:
+        console.print(f"[red][ERROR] Ошибка сборки сайта: {e}[/red]")
+        raise typer.Exit(code=1)
     
-    return "\n".join(lines)
+    console.print(f"[green][OK] Сайт собран в {output.absolute()}[/green]")
+    summary = f"Страниц: {report.pages}, обновлено: {len(report.written)}, без изменений: {report.unchanged}"
+    if report.removed:
+        summary += f", удалено: {len(report.removed)}"
+    console.print(f"[dim]{summary} ({report.seconds:.2f} с)[/dim]")
+    console.print(f"[yellow][TIP] Открыть: {(output / 'index.html').absolute()}[/yellow]")
 
 
 @app.command(name="config-ai")
@@ -646,6 +1140,8 @@ def fill_all(
     ),
     dry_run: bool = typer.Option(False, "--dry-run", help="Показать что будет заполнено, не выполнять"),
     delay: int = typer.Option(2, "--delay", help="Пауза между запросами (секунды)"),
+    save_every: int = typer.Option(10, "--save-every", help="Сохранять изменённые понятия каждые N запросов"),
+    resume: bool = typer.Option(False, "--resume", help="Продолжить прерванный запуск по журналу"),
     path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии")
 ):
     """
@@ -653,6 +1149,9 @@ def fill_all(
     
     По умолчанию исключает: approved, draft+filled
     Заполняет каждое понятие отдельно для качества (принцип: 1 понятие = 1 запрос).
+    Изменённые понятия сохраняются пачками (только реально изменившиеся файлы).
+    Каждый ответ AI записывается в журнал (.ontology/.journal/): с --resume
+    уже полученные ответы применяются повторно, запросы идут только для остальных.
     """
     try:
         # Проверяем существование онтологии
@@ -667,18 +1166,53 @@ def fill_all(
         onto.load_all()
         console.print(f"[dim]Загружено объектов: {len(onto.index.by_id)}[/dim]")
         
-        # Получаем список статусов для исключения
-        excluded_statuses = [s.strip() for s in exclude_status.split(",")]
-        console.print(f"[dim]Исключаем статусы: {', '.join(excluded_statuses)}[/dim]")
+        from ontology_toolkit.ai.filler import ConceptFiller
+        from ontology_toolkit.core.journal import OperationJournal, apply_fields
         
-        # Находим понятия для заполнения
-        concepts_to_fill = []
-        for entity in onto.index.by_id.values():
-            if hasattr(entity, 'prefix') and entity.prefix == "C":
-                if entity.status.value not in excluded_statuses:
-                    concepts_to_fill.append(entity)
+        journal = OperationJournal.unfinished(path, "fill-all")
+        if resume:
+            if journal is None:
+                console.print("[red][ERROR] Нет прерванного запуска fill-all для продолжения[/red]")
+                raise typer.Exit(code=1)
+            
+            # Повторно применяем ответы AI, полученные до сбоя
+            restored = 0
+            for concept_id, fields in journal.results.items():
+                entity = onto.index.get(concept_id)
+                if entity is not None and fields and apply_fields(entity, fields):
+                    restored += 1
+            console.print(
+                f"[blue]Продолжаем запуск {journal.run_id}: выполнено {len(journal.results)} "
+                f"из {len(journal.planned)}, восстановлено из журнала: {restored}[/blue]"
+            )
+            concepts_to_fill = [
+                onto.index.get(concept_id)
+                for concept_id in journal.pending()
+                if onto.index.get(concept_id) is not None
+            ]
+        else:
+            if journal is not None:
+                console.print(
+                    f"[yellow][TIP] Есть прерванный запуск {journal.run_id} "
+                    f"({len(journal.results)}/{len(journal.planned)}): ontology fill-all --resume[/yellow]"
+                )
+            journal = None
+            
+            # Получаем список статусов для исключения
+            excluded_statuses = [s.strip() for s in exclude_status.split(",")]
+            console.print(f"[dim]Исключаем статусы: {', '.join(excluded_statuses)}[/dim]")
+            
+            # Находим понятия для заполнения
+            concepts_to_fill = []
+            for entity in onto.index.by_id.values():
+                if hasattr(entity, 'prefix') and entity.prefix == "C":
+                    if entity.status.value not in excluded_statuses:
+                        concepts_to_fill.append(entity)
         
         if not concepts_to_fill:
+            if journal is not None:
+                console.print(f"[dim]Сохранено файлов: {len(onto.save_all())}[/dim]")
+                journal.finish()
             console.print("[yellow]Нет понятий для заполнения![/yellow]")
             console.print("[dim]Все понятия уже имеют исключенные статусы[/dim]")
             return
@@ -709,7 +1243,6 @@ def fill_all(
         # Создаём AI провайдер
         from ontology_toolkit.ai.factory import AIProviderFactory
         from ontology_toolkit.ai.client import AIClient
-        from ontology_toolkit.ai.filler import ConceptFiller
         from ontology_toolkit.ai.base_provider import AIProviderError
         
         try:
@@ -723,32 +1256,58 @@ def fill_all(
         client = AIClient(ai_provider)
         filler = ConceptFiller(client, onto)
         
+        if journal is None:
+            journal = OperationJournal.start(
+                path, "fill-all", [concept.id for concept in concepts_to_fill],
+                params={"exclude_status": exclude_status},
+            )
+        console.print(f"[dim]Журнал: {journal.path}[/dim]")
+        
         # Заполняем по одному (принцип качества!)
         success_count = 0
         error_count = 0
         
         console.print(f"\n[blue]Начинаем заполнение (пауза между запросами: {delay}с)...[/blue]")
         
-        for i, concept in enumerate(concepts_to_fill, 1):
-            console.print(f"\n[blue]({i}/{len(concepts_to_fill)}) Заполняем {concept.id} - {concept.name}...[/blue]")
-            
-            try:
-                # Заполняем понятие
-                filled_concept = filler.fill_concept(concept.id)
-                onto.save_concept(filled_concept)
+        saved_count = 0
+        try:
+            for i, concept in enumerate(concepts_to_fill, 1):
+                console.print(f"\n[blue]({i}/{len(concepts_to_fill)}) Заполняем {concept.id} - {concept.name}...[/blue]")
                 
-                console.print(f"[green]✓ {concept.id} заполнено![/green]")
-                success_count += 1
+                try:
+                    # Заполняем понятие (сохранение — пачкой, см. save_all)
+                    filled = filler.fill_concept(concept.id)
+                    # Ответ попадает в журнал до сохранения файлов
+                    journal.record(
+                        concept.id,
+                        filled.model_dump(mode="json", include=set(ConceptFiller.FILLED_FIELDS)),
+                    )
+                    
+                    console.print(f"[green]✓ {concept.id} заполнено![/green]")
+                    success_count += 1
+                    
+                except Exception as e:
+                    journal.record_failure(concept.id, str(e))
+                    console.print(f"[red]✗ Ошибка при заполнении {concept.id}: {e}[/red]")
+                    error_count += 1
                 
-            except Exception as e:
-                console.print(f"[red]✗ Ошибка при заполнении {concept.id}: {e}[/red]")
-                error_count += 1
-            
-            # Пауза между запросами (кроме последнего)
-            if i < len(concepts_to_fill):
-                import time
-                console.print(f"[dim]Пауза {delay}с...[/dim]")
-                time.sleep(delay)
+                if save_every > 0 and i % save_every == 0:
+                    saved_count += len(onto.save_all())
+                
+                # Пауза между запросами (кроме последнего)
+                if i < len(concepts_to_fill):
+                    import time
+                    console.print(f"[dim]Пауза {delay}с...[/dim]")
+                    time.sleep(delay)
+        finally:
+            # Сохраняем всё заполненное, даже если цикл прерван
+            saved_count += len(onto.save_all())
+        
+        console.print(f"[dim]Сохранено файлов: {saved_count}[/dim]")
+        if error_count == 0:
+            journal.finish()
+        else:
+            console.print("[yellow][TIP] Повторить неудачные: ontology fill-all --resume[/yellow]")
         
         # Итоги
         console.print(f"\n[green]Готово![/green]")
@@ -770,17 +1329,23 @@ def extract(
     model: Optional[str] = typer.Option(None, "--model", help="Модель AI"),
     preview: bool = typer.Option(False, "--preview", help="Только показать, не сохранять"),
     auto_add: bool = typer.Option(False, "--auto-add", help="Сразу добавить в онтологию"),
+    resume: bool = typer.Option(False, "--resume", help="Взять ответ AI из журнала прерванного запуска"),
     path: Path = typer.Option(DEFAULT_ONTOLOGY_PATH, "--path", help="Путь к онтологии"),
 ):
     """
     Извлечь понятия из текста через AI.
     
     Анализирует текст или файл и предлагает ключевые понятия для добавления в онтологию.
+    Ответ AI записывается в журнал (.ontology/.journal/) до сохранения: после сбоя
+    `--resume` с тем же источником добавит понятия без повторного запроса.
     """
     from ontology_toolkit.ai.factory import AIProviderFactory
     from ontology_toolkit.ai.client import AIClient
     from ontology_toolkit.ai.extractor import ConceptExtractor
     from ontology_toolkit.ai.base_provider import AIProviderError
+    from ontology_toolkit.core.embeddings import content_hash
+    from ontology_toolkit.core.journal import OperationJournal
+    from ontology_toolkit.core.schema import Concept
     from rich.table import Table
     
     try:
@@ -790,45 +1355,68 @@ def extract(
             console.print(f"[yellow][TIP] Выполните: ontology init[/yellow]")
             raise typer.Exit(code=1)
         
-        # Создаём AI провайдер
-        try:
-            if provider:
-                env_key = AIProviderFactory.ENV_KEY_MAPPING.get(provider)
-                api_key = os.getenv(env_key)
-                if not api_key:
-                    console.print(f"[red][ERROR] API ключ не найден: {env_key}[/red]")
-                    raise typer.Exit(code=1)
-                
-                ai_provider = AIProviderFactory.create(provider, api_key, model)
-            else:
-                ai_provider = AIProviderFactory.from_env()
-        
-        except AIProviderError as e:
-            console.print(f"[red][ERROR] {e}[/red]")
-            console.print(f"\n[yellow][TIP] Проверьте конфигурацию:[/yellow]")
-            console.print(f"[dim]ontology config-ai --check[/dim]")
-            raise typer.Exit(code=1)
-        
-        client = AIClient(ai_provider)
+        # Определяем источник (файл или текст)
+        source_path = Path(source)
+        is_file = source_path.exists() and source_path.is_file()
+        text = source_path.read_text(encoding="utf-8") if is_file else source
+        # Ключ операции в журнале — хэш текста источника
+        source_key = content_hash(text)[:16]
         
         # Загружаем онтологию
         console.print(f"[blue]Загрузка онтологии...[/blue]")
         onto = Ontology(path)
         onto.load_all()
         
-        # Создаём extractor
-        extractor = ConceptExtractor(client, onto)
+        journal = None
+        concepts: Optional[List[Concept]] = None
+        if resume:
+            journal = OperationJournal.unfinished(path, "extract", params={"source": source_key})
+            if journal is None or not journal.is_done(source_key):
+                console.print("[red][ERROR] В журнале нет прерванного извлечения для этого источника[/red]")
+                raise typer.Exit(code=1)
+            concepts = [Concept.model_validate(data) for data in journal.results[source_key]]
+            console.print(f"[blue]Ответ AI взят из журнала {journal.run_id}[/blue]")
         
-        # Определяем источник (файл или текст)
-        source_path = Path(source)
-        if source_path.exists() and source_path.is_file():
-            console.print(f"[blue]Извлечение понятий из {source_path.name}...[/blue]")
-            concepts = extractor.extract_from_file(source_path)
-        else:
-            console.print(f"[blue]Извлечение понятий из текста...[/blue]")
-            concepts = extractor.extract_from_text(source)
+        if concepts is None:
+            # Создаём AI провайдер
+            try:
+                if provider:
+                    env_key = AIProviderFactory.ENV_KEY_MAPPING.get(provider)
+                    api_key = os.getenv(env_key)
+                    if not api_key:
+                        console.print(f"[red][ERROR] API ключ не найден: {env_key}[/red]")
+                        raise typer.Exit(code=1)
+                    
+                    ai_provider = AIProviderFactory.create(provider, api_key, model)
+                else:
+                    ai_provider = AIProviderFactory.from_env()
+            
+            except AIProviderError as e:
+                console.print(f"[red][ERROR] {e}[/red]")
+                console.print(f"\n[yellow][TIP] Проверьте конфигурацию:[/yellow]")
+                console.print(f"[dim]ontology config-ai --check[/dim]")
+                raise typer.Exit(code=1)
+            
+            client = AIClient(ai_provider)
+            
+            # Создаём extractor
+            extractor = ConceptExtractor(client, onto)
+            
+            if is_file:
+                console.print(f"[blue]Извлечение понятий из {source_path.name}...[/blue]")
+            else:
+                console.print(f"[blue]Извлечение понятий из текста...[/blue]")
+            concepts = extractor.extract_from_text(text, source=str(source_path) if is_file else "")
+            
+            if not preview:
+                journal = OperationJournal.start(
+                    path, "extract", [source_key], params={"source": source_key}
+                )
+                journal.record(source_key, [concept.model_dump(mode="json") for concept in concepts])
         
         if not concepts:
+            if journal is not None:
+                journal.finish()
             console.print(f"[yellow]Понятий не найдено[/yellow]")
             return
         
@@ -855,13 +1443,22 @@ def extract(
         # Сохраняем если нужно
         if not preview:
             if auto_add or typer.confirm("\nДобавить эти понятия в онтологию?"):
+                added = 0
                 for concept in concepts:
+                    # При возобновлении часть понятий могла быть сохранена до сбоя
+                    if onto.index.find_by_name(concept.name):
+                        continue
+                    if concept.id in onto.index.by_id:
+                        concept.id = onto.get_next_id("C")
                     onto.add_entity(concept)
-                    onto.save_concept(concept)
+                    added += 1
+                onto.save_all()
                 
-                console.print(f"\n[green][OK] Добавлено {len(concepts)} понятий![/green]")
+                console.print(f"\n[green][OK] Добавлено {added} понятий![/green]")
             else:
                 console.print(f"\n[dim]Понятия не добавлены (используйте --preview для предпросмотра)[/dim]")
+            if journal is not None:
+                journal.finish()
         
     except Exception as e:
         console.print(f"[red][ERROR] {e}[/red]")
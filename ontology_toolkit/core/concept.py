@@ -5,36 +5,55 @@
 - универсальные функции для разбора и сериализации файлов;
 - менеджер `ConceptFile`, сохраняющий обратную совместимость с текущим API;
 - фабрику `ConceptFactory` для создания черновиков/заполненных концептов.
+
+Отрисовка сущности в Markdown кэшируется по отпечатку её содержимого,
+поэтому повторные сохранения и экспорты неизменённых сущностей почти бесплатны.
 """
 
 from __future__ import annotations
 
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
 
 import frontmatter
+from pydantic import ValidationError
 
 from ontology_toolkit.core.schema import (
     Concept as ConceptModel,
     BaseEntity,
+    ConceptSchema,
     ConceptStatus,
     MetaMetaType,
     Relation,
     RelationType,
 )
+from ontology_toolkit.core.storage import AtomicWriteBatch, atomic_write_bytes
 
 __all__ = [
     "ConceptFile",
     "ConceptFactory",
+    "clear_render_cache",
+    "entity_from_markdown",
+    "entity_from_parts",
     "entity_to_markdown",
     "load_entity_from_file",
+    "parse_entity_strict",
     "save_entity_to_file",
+    "split_markdown",
 ]
 
 TEntity = TypeVar("TEntity", bound=BaseEntity)
 
+# Кэш отрисовки: (тип сущности, отпечаток содержимого) → Markdown.
+_RENDER_CACHE_SIZE = 4096
+_render_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_render_lock = threading.Lock()
+
 
 # ---------------------------------------------------------------------------
 # Вспомогательные парсеры
@@ -166,11 +185,30 @@ def load_entity_from_file(file_path: Path, entity_cls: Type[TEntity]) -> TEntity
         raise FileNotFoundError(f"Файл не найден: {file_path}")
 
     with open(file_path, "r", encoding="utf-8") as handler:
-        post = frontmatter.load(handler)
+        return entity_from_markdown(handler.read(), entity_cls)
+
+
+def entity_from_markdown(text: str, entity_cls: Type[TEntity]) -> TEntity:
+    """Разбирает Markdown + YAML frontmatter в сущность заданного типа."""
+    post = frontmatter.loads(text)
+    return entity_from_parts(dict(post.metadata), _parse_content_sections(post.content), entity_cls)
 
-    metadata = dict(post.metadata)
-    sections = _parse_content_sections(post.content)
 
+def split_markdown(text: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Разбирает файл сущности на frontmatter и секции (без построения модели).
+    
+    Returns:
+        (метаданные, {заголовок секции в нижнем регистре: текст})
+    """
+    post = frontmatter.loads(text)
+    return dict(post.metadata), _parse_content_sections(post.content)
+
+
+def entity_from_parts(
+    metadata: Dict[str, Any], sections: Dict[str, str], entity_cls: Type[TEntity]
+) -> TEntity:
+    """Строит сущность из уже разобранных frontmatter и секций (см. `split_markdown`)."""
     field_names = set(entity_cls.model_fields.keys())
     data: Dict[str, Any] = {}
 
@@ -196,11 +234,105 @@ def load_entity_from_file(file_path: Path, entity_cls: Type[TEntity]) -> TEntity
         if key in field_names:
             data[key] = value
 
-    return entity_cls(**data)  # type: ignore[arg-type]
+    entity = entity_cls(**data)  # type: ignore[arg-type]
+    entity.mark_clean()
+    return entity
+
+
+def parse_entity_strict(
+    text: str, entity_cls: Type[TEntity]
+) -> Tuple[Optional[TEntity], List[str]]:
+    """
+    Разбор файла сущности со строгой проверкой.
+    
+    `entity_from_markdown` терпим к ошибкам: некорректные связи пропускает,
+    нераспознанные даты заменяет текущим временем. Здесь такие случаи
+    считаются ошибками, а ошибки pydantic перечисляются по полям.
+    
+    Args:
+        text: Содержимое Markdown-файла
+        entity_cls: Ожидаемый тип сущности
+        
+    Returns:
+        (сущность или None, если разобрать не удалось; список ошибок)
+    """
+    try:
+        metadata = dict(frontmatter.loads(text).metadata)
+    except Exception as exc:
+        return None, [f"frontmatter: {exc}"]
+
+    errors: List[str] = []
+    entity_id = str(metadata.get("id", ""))
+    try:
+        prefix, _ = ConceptSchema.parse_id(entity_id)
+        if ConceptSchema.get_entity_class(prefix) is not entity_cls:
+            errors.append(f"id: {entity_id} не относится к типу {entity_cls.__name__}")
+    except ValueError as exc:
+        errors.append(f"id: {exc}")
+    for position, raw in enumerate(metadata.get("relations") or [], start=1):
+        try:
+            Relation(
+                type=RelationType(raw["type"]),
+                target=raw["target"],
+                description=raw.get("description"),
+            )
+        except KeyError as exc:
+            errors.append(f"relations[{position}]: нет поля {exc}")
+        except (TypeError, ValueError) as exc:
+            errors.append(f"relations[{position}]: некорректная связь ({exc})")
+    for key in ("created", "updated"):
+        value = metadata.get(key)
+        if value and not isinstance(value, datetime):
+            try:
+                datetime.fromisoformat(str(value))
+            except ValueError:
+                errors.append(f"{key}: нераспознанная дата {value!r}")
+
+    entity: Optional[TEntity] = None
+    try:
+        entity = entity_from_markdown(text, entity_cls)
+    except ValidationError as exc:
+        for error in exc.errors():
+            location = ".".join(str(part) for part in error["loc"]) or "entity"
+            errors.append(f"{location}: {error['msg']}")
+    except Exception as exc:
+        errors.append(str(exc))
+    return entity, errors
 
 
 def entity_to_markdown(entity: BaseEntity) -> str:
-    """Формирует Markdown + YAML frontmatter для произвольной сущности."""
+    """
+    Формирует Markdown + YAML frontmatter для произвольной сущности.
+
+    Результат кэшируется по отпечатку содержимого сущности (хэш её JSON),
+    поэтому изменения «на месте» (например, `examples.append`) тоже учитываются.
+    """
+    key = (type(entity).__name__, _content_fingerprint(entity))
+    with _render_lock:
+        cached = _render_cache.get(key)
+        if cached is not None:
+            _render_cache.move_to_end(key)
+            return cached
+
+    rendered = _render_markdown(entity)
+    with _render_lock:
+        _render_cache[key] = rendered
+        if len(_render_cache) > _RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return rendered
+
+
+def clear_render_cache() -> None:
+    """Очистить кэш отрисовки (например, в тестах)."""
+    with _render_lock:
+        _render_cache.clear()
+
+
+def _content_fingerprint(entity: BaseEntity) -> str:
+    return hashlib.blake2b(entity.model_dump_json().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _render_markdown(entity: BaseEntity) -> str:
     payload = entity.model_dump(mode="python")
 
     metadata: Dict[str, Any] = {}
@@ -261,6 +393,7 @@ def entity_to_markdown(entity: BaseEntity) -> str:
         lines.append("")
 
     post = frontmatter.Post("\n".join(lines).strip() + "\n", **metadata)
+    # python-frontmatter сам использует эмиттер libyaml (CSafeDumper), если он собран
     return frontmatter.dumps(post)
 
 
@@ -268,8 +401,27 @@ def save_entity_to_file(
     entity: BaseEntity,
     directory: Path,
     overwrite: bool = False,
+    batch: Optional[AtomicWriteBatch] = None,
+    previous_path: Optional[Path] = None,
 ) -> Path:
-    """Сохраняет сущность в указанную директорию."""
+    """
+    Сохраняет сущность в указанную директорию.
+
+    Запись атомарная (временный файл + переименование), поэтому прерванное
+    сохранение не оставляет повреждённый файл. Если файл уже содержит ровно
+    те же байты, запись пропускается (не меняется mtime, нет шума в Git).
+
+    Args:
+        entity: Сущность
+        directory: Каталог типа сущности
+        overwrite: Разрешить перезапись существующего файла
+        batch: Пакет записей с групповым fsync (файл появится после его фиксации)
+        previous_path: Прежний файл сущности; если имя файла изменилось
+            (переименование), старый файл удаляется после записи нового
+
+    Returns:
+        Путь к файлу сущности
+    """
     directory.mkdir(parents=True, exist_ok=True)
 
     filename = f"{entity.id}_{_sanitize_filename(entity.name or entity.id)}.md"
@@ -278,12 +430,37 @@ def save_entity_to_file(
     if file_path.exists() and not overwrite:
         raise FileExistsError(f"Файл уже существует: {file_path}")
 
-    with open(file_path, "w", encoding="utf-8") as handler:
-        handler.write(entity_to_markdown(entity))
+    stale_path = previous_path if previous_path not in (None, file_path) else None
+
+    payload = entity_to_markdown(entity).encode("utf-8")
+    if _same_bytes_on_disk(file_path, payload):
+        entity.mark_clean()
+    elif batch is not None:
+        batch.write(file_path, payload, on_commit=entity.mark_clean)
+    else:
+        atomic_write_bytes(file_path, payload)
+        entity.mark_clean()
+
+    if stale_path is not None:
+        if batch is not None:
+            # Старый файл удаляется, только если новый записан
+            batch.remove(stale_path, after=file_path)
+        else:
+            stale_path.unlink(missing_ok=True)
 
     return file_path
 
 
+def _same_bytes_on_disk(file_path: Path, payload: bytes) -> bool:
+    """Проверяет, совпадает ли содержимое файла с payload (сначала по размеру)."""
+    try:
+        if file_path.stat().st_size != len(payload):
+            return False
+        return file_path.read_bytes() == payload
+    except FileNotFoundError:
+        return False
+
+
 # ---------------------------------------------------------------------------
 # API для концептов (обратная совместимость)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,58 @@
+"""
+Файл конфигурации онтологического проекта (`.ontology/ontology.yaml`).
+
+Хранит `OntologyConfig`: название проекта, раскладку файлов и т.п.
+Если файла нет, используются значения по умолчанию (плоская раскладка),
+поэтому существующие онтологии продолжают работать без изменений.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import yaml
+
+from ontology_toolkit.core.schema import OntologyConfig
+from ontology_toolkit.core.storage import atomic_write_bytes
+
+__all__ = ["CONFIG_FILE", "load_config", "save_config", "shard_name"]
+
+CONFIG_FILE = "ontology.yaml"
+
+
+def load_config(root: Path) -> OntologyConfig:
+    """
+    Прочитать конфигурацию проекта.
+
+    Args:
+        root: Корень онтологии (.ontology/)
+
+    Returns:
+        Конфигурация (значения по умолчанию, если файла нет)
+    """
+    config_path = Path(root) / CONFIG_FILE
+    data = {}
+    if config_path.exists():
+        data = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+    data.setdefault("project_name", Path(root).resolve().parent.name or "Ontology Project")
+    return OntologyConfig.model_validate(data)
+
+
+def save_config(root: Path, config: OntologyConfig) -> Path:
+    """
+    Сохранить конфигурацию проекта (атомарно).
+
+    Returns:
+        Путь к файлу конфигурации
+    """
+    config_path = Path(root) / CONFIG_FILE
+    text = yaml.safe_dump(
+        config.model_dump(mode="json"), allow_unicode=True, sort_keys=False
+    )
+    atomic_write_bytes(config_path, text.encode("utf-8"))
+    return config_path
+
+
+def shard_name(number: int, shard_size: int) -> str:
+    """Имя подкаталога для номера ID (`C_100` при shard_size=1000 → `00`)."""
+    return f"{number // shard_size:02d}"
@@ -0,0 +1,236 @@
+"""
+Сравнение онтологии между двумя ревизиями Git.
+
+Алгоритм:
+1. Деревья обеих ревизий читаются через `git ls-tree` (без checkout).
+2. Сущности сопоставляются по ID; совпадающие SHA blob'ов означают, что файл
+   не менялся — такие сущности не читаются и не разбираются.
+3. Разбираются только добавленные, удалённые и изменённые файлы (через общий
+   кэш разбора по SHA); для изменённых считается разница по полям и по рёбрам связей.
+   Файлы с тем же отпечатком содержимого (`BaseEntity.fingerprint`) — например,
+   изменилась только дата `updated` — изменениями не считаются (`touched`).
+   Поля `created`/`updated` не попадают и в список изменённых полей
+   (если не передан `timestamps=True`).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.gitstore import GitObjectStore, index_tree, parse_cache
+from ontology_toolkit.core.schema import BaseEntity, ConceptSchema
+
+__all__ = [
+    "EntityChange",
+    "EntitySummary",
+    "FieldChange",
+    "OntologyDiff",
+    "RelationEdge",
+    "diff_revisions",
+]
+
+
+class FieldChange(BaseModel):
+    """Изменение одного поля сущности."""
+
+    field: str
+    old: Any = None
+    new: Any = None
+
+
+class EntitySummary(BaseModel):
+    """Краткое описание добавленной/удалённой сущности."""
+
+    id: str
+    name: str
+    path: str
+
+
+class EntityChange(BaseModel):
+    """Изменённая сущность и её поля."""
+
+    id: str
+    name: str
+    old_path: str
+    new_path: str
+    fields: List[FieldChange] = Field(default_factory=list)
+
+
+class RelationEdge(BaseModel):
+    """Ребро графа связей."""
+
+    source: str
+    type: str
+    target: str
+
+    def __str__(self) -> str:
+        return f"{self.source} -[{self.type}]-> {self.target}"
+
+
+class OntologyDiff(BaseModel):
+    """Результат сравнения двух ревизий."""
+
+    old_rev: str
+    new_rev: str
+    added: List[EntitySummary] = Field(default_factory=list)
+    removed: List[EntitySummary] = Field(default_factory=list)
+    changed: List[EntityChange] = Field(default_factory=list)
+    relations_added: List[RelationEdge] = Field(default_factory=list)
+    relations_removed: List[RelationEdge] = Field(default_factory=list)
+    unchanged: int = 0
+    # Файл изменился, но смысловое содержимое — нет (отметки времени, форматирование)
+    touched: int = 0
+    errors: List[str] = Field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Нет ни одного изменения."""
+        return not (
+            self.added
+            or self.removed
+            or self.changed
+            or self.relations_added
+            or self.relations_removed
+        )
+
+
+def _edges(entity: BaseEntity) -> Set[Tuple[str, str, str]]:
+    return {(entity.id, relation.type.value, relation.target) for relation in entity.relations}
+
+
+def _field_changes(
+    old: BaseEntity, new: BaseEntity, timestamps: bool = False
+) -> List[FieldChange]:
+    # Те же поля, что не входят в отпечаток, по умолчанию не считаются изменениями
+    exclude = {"relations"} if timestamps else {"relations", *type(old).FINGERPRINT_EXCLUDE}
+    old_data = old.model_dump(mode="json", exclude=exclude)
+    new_data = new.model_dump(mode="json", exclude=exclude)
+    changes: List[FieldChange] = []
+    for field in list(old_data) + [key for key in new_data if key not in old_data]:
+        before = old_data.get(field)
+        after = new_data.get(field)
+        if before != after:
+            changes.append(FieldChange(field=field, old=before, new=after))
+    return changes
+
+
+def diff_revisions(
+    ontology_root: Path,
+    old_rev: str,
+    new_rev: str = "HEAD",
+    store: Optional[GitObjectStore] = None,
+    timestamps: bool = False,
+) -> OntologyDiff:
+    """
+    Сравнить онтологию в двух ревизиях Git.
+
+    Args:
+        ontology_root: Путь к онтологии (.ontology/) внутри репозитория
+        old_rev: Исходная ревизия
+        new_rev: Новая ревизия
+        store: Открытое хранилище (иначе создаётся и закрывается внутри)
+        timestamps: Показывать изменения полей created/updated
+
+    Returns:
+        Добавленные, удалённые и изменённые сущности, изменения полей и рёбер
+    """
+    own_store = store is None
+    git = store or GitObjectStore(ontology_root)
+    try:
+        old_tree = index_tree(git.list_tree(git.resolve(old_rev)))
+        new_tree = index_tree(git.list_tree(git.resolve(new_rev)))
+
+        # Разбирать нужно только то, что отличается по SHA
+        to_parse: List[Tuple[str, str, str]] = []
+        for tree, other in ((old_tree, new_tree), (new_tree, old_tree)):
+            for entity_id, (path, sha) in tree.items():
+                if other.get(entity_id, (None, None))[1] != sha:
+                    to_parse.append((entity_id, path, sha))
+        # Результаты идут в порядке to_parse
+        results = parse_cache.load(git, to_parse, copy=False)
+        parsed: Dict[Tuple[str, str], Any] = {
+            (entity_id, sha): result
+            for (entity_id, _, sha), (_, _, result) in zip(to_parse, results)
+        }
+    finally:
+        if own_store:
+            git.close()
+
+    diff = OntologyDiff(old_rev=old_rev, new_rev=new_rev)
+    added_edges: Set[Tuple[str, str, str]] = set()
+    removed_edges: Set[Tuple[str, str, str]] = set()
+
+    def load(entity_id: str, path: str, sha: str) -> Optional[BaseEntity]:
+        result = parsed[(entity_id, sha)]
+        if isinstance(result, Exception):  # Некорректный файл не должен ломать весь diff
+            diff.errors.append(f"{path}: {result}")
+            return None
+        return result
+
+    for entity_id in sorted(old_tree.keys() | new_tree.keys(), key=_sort_key):
+        old_entry = old_tree.get(entity_id)
+        new_entry = new_tree.get(entity_id)
+
+        if old_entry and new_entry and old_entry[1] == new_entry[1]:
+            diff.unchanged += 1
+            continue
+
+        if new_entry and not old_entry:
+            entity = load(entity_id, *new_entry)
+            if entity is not None:
+                diff.added.append(EntitySummary(id=entity_id, name=entity.name, path=new_entry[0]))
+                added_edges |= _edges(entity)
+            continue
+
+        if old_entry and not new_entry:
+            entity = load(entity_id, *old_entry)
+            if entity is not None:
+                diff.removed.append(
+                    EntitySummary(id=entity_id, name=entity.name, path=old_entry[0])
+                )
+                removed_edges |= _edges(entity)
+            continue
+
+        assert old_entry and new_entry
+        old_entity = load(entity_id, *old_entry)
+        new_entity = load(entity_id, *new_entry)
+        if old_entity is None or new_entity is None:
+            continue
+        if old_entity.fingerprint == new_entity.fingerprint and old_entry[0] == new_entry[0]:
+            diff.touched += 1
+            continue
+        fields = _field_changes(old_entity, new_entity, timestamps)
+        old_edges, new_edges = _edges(old_entity), _edges(new_entity)
+        added_edges |= new_edges - old_edges
+        removed_edges |= old_edges - new_edges
+        if fields or old_edges != new_edges or old_entry[0] != new_entry[0]:
+            diff.changed.append(
+                EntityChange(
+                    id=entity_id,
+                    name=new_entity.name,
+                    old_path=old_entry[0],
+                    new_path=new_entry[0],
+                    fields=fields,
+                )
+            )
+        else:
+            diff.unchanged += 1
+
+    diff.relations_added = [_edge_model(edge) for edge in sorted(added_edges)]
+    diff.relations_removed = [_edge_model(edge) for edge in sorted(removed_edges)]
+    return diff
+
+
+def _edge_model(edge: Tuple[str, str, str]) -> RelationEdge:
+    source, relation_type, target = edge
+    return RelationEdge(source=source, type=relation_type, target=target)
+
+
+def _sort_key(entity_id: str) -> Tuple[str, int]:
+    try:
+        return ConceptSchema.parse_id(entity_id)
+    except ValueError:
+        return entity_id, 0
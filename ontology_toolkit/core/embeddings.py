@@ -0,0 +1,428 @@
+"""
+Векторный индекс эмбеддингов сущностей с кэшем по хэшу содержимого.
+
+Содержит:
+- `EmbeddingIndex` — матрица float32 в memory-mapped файле под `.ontology/.cache/`,
+  строки которой ключуются по ID сущности и хэшу её текста;
+- точный top-k на NumPy и опциональный приближённый индекс (LSH)
+  для больших онтологий.
+
+Сама модель подключается извне: любая функция `texts -> векторы`
+(локальная модель или `AIClient.embed` поверх провайдера).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ontology_toolkit.core.schema import BaseEntity
+from ontology_toolkit.core.similarity import entity_text
+
+__all__ = ["EmbeddingIndex", "EmbedFunction", "content_hash", "ensure_cache_dir"]
+
+EmbedFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# Начиная с этого размера `approximate=True` включает LSH вместо полного перебора.
+_APPROXIMATE_MIN_ROWS = 5000
+_LSH_TABLES = 16
+# Средний размер корзины LSH (число бит подбирается под размер индекса).
+_LSH_BUCKET_SIZE = 32
+_EMBED_BATCH_SIZE = 64
+# Размер блока строк в `top_k_all` (ограничивает память матрицы близостей n×n).
+_BLOCK_SIZE = 512
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 хэш текста, по которому кэшируются эмбеддинги."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_") or "default"
+
+
+def ensure_cache_dir(cache_dir: Path) -> Path:
+    """Создаёт каталог кэша, исключённый из Git."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    gitignore = cache_dir / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n", encoding="utf-8")
+    return cache_dir
+
+
+class _LshIndex:
+    """Приближённый поиск: случайные гиперплоскости, несколько хэш-таблиц."""
+
+    def __init__(self, matrix: np.ndarray, tables: int = _LSH_TABLES):
+        bits = int(np.clip(np.log2(max(matrix.shape[0], 1) / _LSH_BUCKET_SIZE), 2, 20))
+        rng = np.random.default_rng(0)
+        self._planes = rng.standard_normal((tables, matrix.shape[1], bits)).astype(np.float32)
+        self._weights = (1 << np.arange(bits)).astype(np.int64)
+        self._buckets: List[Dict[int, List[int]]] = []
+        for table in range(tables):
+            keys = self._keys(matrix, table)
+            buckets: Dict[int, List[int]] = {}
+            for row, key in enumerate(keys.tolist()):
+                buckets.setdefault(key, []).append(row)
+            self._buckets.append(buckets)
+
+    def _keys(self, vectors: np.ndarray, table: int) -> np.ndarray:
+        bits = (vectors @ self._planes[table]) > 0
+        return bits.astype(np.int64) @ self._weights
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        rows: Set[int] = set()
+        for table, buckets in enumerate(self._buckets):
+            key = int(self._keys(vector[None, :], table)[0])
+            rows.update(buckets.get(key, ()))
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+
+class EmbeddingIndex:
+    """
+    Кэш эмбеддингов сущностей в memory-mapped матрице.
+
+    Файлы (на модель):
+    - `embeddings/<model>.f32` — матрица float32 (строка на сущность, L2-нормирована);
+    - `embeddings/<model>.json` — размерность и соответствие ID → (строка, хэш текста).
+
+    Повторный расчёт эмбеддинга выполняется только при изменении текста сущности.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        embed: EmbedFunction,
+        model_name: str,
+        text_getter: Callable[[BaseEntity], str] = entity_text,
+    ):
+        """
+        Инициализация индекса.
+
+        Args:
+            cache_dir: Каталог кэша (обычно `.ontology/.cache`)
+            embed: Функция, возвращающая векторы для списка текстов
+            model_name: Имя модели (кэш разделяется по моделям)
+            text_getter: Функция, возвращающая текст сущности
+        """
+        self._embed = embed
+        self._text_getter = text_getter
+        self.model_name = model_name
+        self._dir = Path(cache_dir) / "embeddings"
+        slug = _model_slug(model_name)
+        self._matrix_path = self._dir / f"{slug}.f32"
+        self._meta_path = self._dir / f"{slug}.json"
+
+        self.dim = 0
+        self._entries: Dict[str, Tuple[int, str]] = {}
+        self._free_rows: List[int] = []
+        # Первая ни разу не выданная строка (строки выше неё в матрице не заняты)
+        self._next_row = 0
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._lsh: Optional[_LshIndex] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._entries
+
+    # ------------------------------------------------------------------
+    # Синхронизация
+    # ------------------------------------------------------------------
+
+    def sync(self, entities: Iterable[BaseEntity], prune: bool = True) -> int:
+        """
+        Обновить эмбеддинги сущностей, текст которых изменился.
+
+        Args:
+            entities: Актуальный набор сущностей
+            prune: Удалить из кэша сущности, которых нет в наборе
+
+        Returns:
+            Количество пересчитанных эмбеддингов
+        """
+        pending: List[Tuple[str, str, str]] = []
+        current: Dict[str, Tuple[str, str]] = {}
+        for entity in entities:
+            text = self._text_getter(entity)
+            digest = content_hash(text)
+            current[entity.id] = (digest, text)
+            entry = self._entries.get(entity.id)
+            if entry is None or entry[1] != digest:
+                pending.append((entity.id, digest, text))
+
+        removed = [eid for eid in self._entries if eid not in current] if prune else []
+        for entity_id in removed:
+            self._free_rows.append(self._entries.pop(entity_id)[0])
+
+        start = 0
+        while start < len(pending):
+            batch = pending[start:start + _EMBED_BATCH_SIZE]
+            vectors = self._normalize(self._embed([text for _, _, text in batch]))
+            if self._ensure_dim(vectors.shape[1]):
+                # Кэш прежней размерности сброшен: в очередь встают и сущности,
+                # текст которых не менялся, иначе они останутся без вектора
+                queued = {entity_id for entity_id, _, _ in pending[start:]}
+                pending.extend(
+                    (entity_id, digest, text)
+                    for entity_id, (digest, text) in current.items()
+                    if entity_id not in queued
+                )
+            start += len(batch)
+            for (entity_id, digest, _), vector in zip(batch, vectors):
+                entry = self._entries.get(entity_id)
+                row = entry[0] if entry is not None else self._allocate_row()
+                assert self._matrix is not None
+                self._matrix[row] = vector
+                self._entries[entity_id] = (row, digest)
+
+        if pending or removed:
+            self._lsh = None
+            self._save()
+        return len(pending)
+
+    # ------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------
+
+    def vector(self, entity_id: str) -> Optional[np.ndarray]:
+        """Нормированный эмбеддинг сущности (или None)."""
+        entry = self._entries.get(entity_id)
+        if entry is None or self._matrix is None:
+            return None
+        return np.asarray(self._matrix[entry[0]])
+
+    def top_k(
+        self,
+        entity_id: str,
+        k: int = 5,
+        exclude: Optional[Set[str]] = None,
+        min_score: float = 0.0,
+        approximate: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """Ближайшие соседи сущности по косинусной близости."""
+        vector = self.vector(entity_id)
+        if vector is None:
+            return []
+        excluded = {entity_id} | (exclude or set())
+        return self._search(vector, k, excluded, min_score, approximate)
+
+    def query_text(
+        self,
+        text: str,
+        k: int = 5,
+        exclude: Optional[Set[str]] = None,
+        min_score: float = 0.0,
+        approximate: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """Ближайшие сущности к произвольному тексту (текст не кэшируется)."""
+        if not self._entries:
+            return []
+        vector = self._normalize(self._embed([text]))[0]
+        return self._search(vector, k, exclude or set(), min_score, approximate)
+
+    def query_texts(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        exclude: Optional[Set[str]] = None,
+        min_score: float = 0.0,
+        approximate: bool = False,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Ближайшие сущности для нескольких текстов.
+
+        Тексты векторизуются пачками (один вызов модели на пачку),
+        а не по одному вызову на текст, как в `query_text`.
+
+        Returns:
+            Список результатов в порядке текстов
+        """
+        if not self._entries or not texts:
+            return [[] for _ in texts]
+        results: List[List[Tuple[str, float]]] = []
+        for start in range(0, len(texts), _EMBED_BATCH_SIZE):
+            vectors = self._normalize(self._embed(list(texts[start:start + _EMBED_BATCH_SIZE])))
+            for vector in vectors:
+                results.append(self._search(vector, k, exclude or set(), min_score, approximate))
+        return results
+
+    def top_k_all(
+        self,
+        k: int = 5,
+        exclude: Optional[Dict[str, Set[str]]] = None,
+        min_score: float = 0.0,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Ближайшие соседи для всех сущностей индекса.
+
+        Матрица близостей считается блоками строк, чтобы не держать n×n целиком.
+
+        Args:
+            k: Количество соседей на сущность
+            exclude: {entity_id: множество ID, которые нужно исключить}
+            min_score: Минимальная косинусная близость
+
+        Returns:
+            {entity_id: [(neighbour_id, score), ...]}
+        """
+        if self._matrix is None or not self._entries:
+            return {}
+        exclude = exclude or {}
+        ids = list(self._entries)
+        position = {entity_id: index for index, entity_id in enumerate(ids)}
+        rows = np.fromiter((self._entries[eid][0] for eid in ids), dtype=np.int64, count=len(ids))
+        matrix = np.asarray(self._matrix[rows])
+
+        result: Dict[str, List[Tuple[str, float]]] = {}
+        for start in range(0, len(ids), _BLOCK_SIZE):
+            block_scores = matrix[start:start + _BLOCK_SIZE] @ matrix.T
+            for offset, scores in enumerate(block_scores):
+                entity_id = ids[start + offset]
+                for other in {entity_id} | exclude.get(entity_id, set()):
+                    if other in position:
+                        scores[position[other]] = -np.inf
+                result[entity_id] = [
+                    (ids[i], score) for i, score in self._best(scores, k, min_score)
+                ]
+        return result
+
+    # ------------------------------------------------------------------
+    # Внутреннее
+    # ------------------------------------------------------------------
+
+    def _search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        excluded: Set[str],
+        min_score: float,
+        approximate: bool,
+    ) -> List[Tuple[str, float]]:
+        if self._matrix is None or not self._entries:
+            return []
+
+        row_to_id = {row: eid for eid, (row, _) in self._entries.items() if eid not in excluded}
+        if approximate and len(self._entries) >= _APPROXIMATE_MIN_ROWS:
+            if self._lsh is None:
+                self._lsh = _LshIndex(np.asarray(self._matrix[: self._next_row]))
+            rows = np.array(
+                [row for row in self._lsh.candidates(vector).tolist() if row in row_to_id],
+                dtype=np.int64,
+            )
+        else:
+            rows = np.fromiter(row_to_id.keys(), dtype=np.int64, count=len(row_to_id))
+        if rows.size == 0:
+            return []
+
+        scores = np.asarray(self._matrix[rows]) @ vector
+        return [
+            (row_to_id[int(rows[i])], score) for i, score in self._best(scores, k, min_score)
+        ]
+
+    @staticmethod
+    def _best(scores: np.ndarray, k: int, min_score: float) -> List[Tuple[int, float]]:
+        """Позиции и значения top-k оценок больше `min_score` (по убыванию)."""
+        count = min(k, scores.size)
+        if count <= 0:
+            return []
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > min_score]
+
+    @staticmethod
+    def _normalize(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("Функция эмбеддингов должна вернуть список векторов")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        row = self._next_row
+        if row >= self._capacity:
+            self._resize(max(16, self._capacity * 2))
+        self._next_row = row + 1
+        return row
+
+    def _ensure_dim(self, dim: int) -> bool:
+        """Подготовить матрицу размерности `dim`; True, если старые векторы сброшены."""
+        if self.dim == dim and self._matrix is not None:
+            return False
+        cleared = bool(self.dim and self.dim != dim and self._entries)
+        if self.dim and self.dim != dim:
+            # Модель сменила размерность — старый кэш невалиден.
+            self._entries.clear()
+            self._free_rows.clear()
+        self._next_row = 0
+        self.dim = dim
+        self._capacity = 0
+        self._matrix = None
+        self._resize(16)
+        return cleared
+
+    def _resize(self, capacity: int) -> None:
+        ensure_cache_dir(self._dir.parent)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._matrix_path, "ab" if self._matrix_path.exists() else "wb") as handler:
+            handler.truncate(capacity * self.dim * 4)
+        self._capacity = capacity
+        self._matrix = np.memmap(
+            self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+
+    def _load(self) -> None:
+        if not self._meta_path.exists() or not self._matrix_path.exists():
+            return
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self.dim = int(meta["dim"])
+            self._capacity = int(meta["capacity"])
+            self._entries = {
+                eid: (int(row), digest) for eid, (row, digest) in meta["entries"].items()
+            }
+            self._free_rows = [int(row) for row in meta.get("free_rows", [])]
+            if "next_row" in meta:
+                self._next_row = int(meta["next_row"])
+            else:
+                # Кэш старого формата: счётчик восстанавливается один раз
+                self._next_row = max((row for row, _ in self._entries.values()), default=-1) + 1
+            self._matrix = np.memmap(
+                self._matrix_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dim)
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            # Повреждённый кэш просто пересобирается.
+            self.dim = 0
+            self._capacity = 0
+            self._entries = {}
+            self._free_rows = []
+            self._next_row = 0
+            self._matrix = None
+
+    def _save(self) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+        meta = {
+            "model": self.model_name,
+            "dim": self.dim,
+            "capacity": self._capacity,
+            "next_row": self._next_row,
+            "entries": {eid: [row, digest] for eid, (row, digest) in self._entries.items()},
+            "free_rows": self._free_rows,
+        }
+        self._meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,287 @@
+"""
+Чтение ревизий онтологии напрямую из объектного хранилища Git.
+
+Без checkout и без рабочего дерева:
+- `git ls-tree` даёт список файлов ревизии вместе с SHA их blob'ов;
+- один долгоживущий процесс `git cat-file --batch` отдаёт содержимое blob'ов.
+
+SHA blob'а — готовый хэш содержимого файла: одинаковые SHA в двух ревизиях
+означают, что файл не менялся, и его можно не читать и не разбирать.
+`BlobParseCache` хранит уже разобранные сущности по SHA, поэтому ревизии
+с общими файлами разбирают их один раз.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ontology_toolkit.core.concept import entity_from_markdown
+from ontology_toolkit.core.schema import BaseEntity, ConceptSchema
+
+__all__ = [
+    "BlobParseCache",
+    "GitError",
+    "GitObjectStore",
+    "TreeEntry",
+    "entity_id_from_path",
+    "index_tree",
+    "parse_cache",
+]
+
+_ENTITY_FILE_RE = re.compile(r"^([A-Z]+_\d+)(?:_.*)?\.md$")
+
+# (путь относительно корня онтологии, SHA blob'а)
+TreeEntry = Tuple[str, str]
+
+
+class GitError(RuntimeError):
+    """Ошибка обращения к Git."""
+
+
+def entity_id_from_path(path: str) -> Optional[str]:
+    """Извлекает ID сущности из имени файла (`C_12_nazvanie.md` → `C_12`)."""
+    match = _ENTITY_FILE_RE.match(PurePosixPath(path).name)
+    return match.group(1) if match else None
+
+
+class GitObjectStore:
+    """Доступ к деревьям и blob'ам репозитория, в котором лежит онтология."""
+
+    def __init__(self, ontology_root: Path):
+        """
+        Инициализация хранилища.
+
+        Args:
+            ontology_root: Путь к онтологии (.ontology/) внутри Git-репозитория
+        """
+        root = Path(ontology_root).resolve()
+        probe = root if root.exists() else root.parent
+        self.toplevel = Path(self._run(["rev-parse", "--show-toplevel"], cwd=probe).strip())
+        # Путь онтологии внутри репозитория (в формате Git)
+        relative = root.relative_to(self.toplevel.resolve()).as_posix()
+        self.prefix = "" if relative == "." else relative
+        self._batch: Optional[subprocess.Popen] = None
+
+    # ------------------------------------------------------------------
+    # Контекстный менеджер
+    # ------------------------------------------------------------------
+
+    def __enter__(self) -> "GitObjectStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Завершить процесс `git cat-file --batch`."""
+        if self._batch is not None:
+            assert self._batch.stdin is not None
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch = None
+
+    # ------------------------------------------------------------------
+    # Деревья и blob'ы
+    # ------------------------------------------------------------------
+
+    def resolve(self, rev: str) -> str:
+        """Привести ревизию (ветка, тег, HEAD~1, ...) к SHA коммита."""
+        return self._run(["rev-parse", "--verify", f"{rev}^{{commit}}"]).strip()
+
+    def list_tree(self, rev: str) -> List[TreeEntry]:
+        """
+        Список Markdown-файлов онтологии в ревизии.
+
+        Returns:
+            [(путь относительно корня онтологии, SHA blob'а), ...]
+        """
+        pathspec = [f"{self.prefix}/"] if self.prefix else []
+        output = self._run(["ls-tree", "-r", "-z", rev, "--", *pathspec])
+        entries: List[TreeEntry] = []
+        base = PurePosixPath(self.prefix)
+        for record in output.split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            _, object_type, sha = meta.split()
+            if object_type != "blob" or not path.endswith(".md"):
+                continue
+            entries.append((PurePosixPath(path).relative_to(base).as_posix(), sha))
+        return entries
+
+    def read_blob(self, sha: str) -> bytes:
+        """Прочитать содержимое одного blob'а."""
+        for _, data in self.read_blobs([sha]):
+            return data
+        raise GitError(f"Объект не найден: {sha}")
+
+    def read_blobs(self, shas: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Потоково прочитать blob'ы через один процесс `git cat-file --batch`.
+
+        Запрос и ответ идут поочерёдно: так буферы канала не переполняются
+        даже на больших ревизиях, а процесс переиспользуется между вызовами.
+        """
+        for sha in shas:
+            process = self._batch_process()
+            assert process.stdin is not None and process.stdout is not None
+            process.stdin.write(f"{sha}\n".encode("ascii"))
+            process.stdin.flush()
+
+            header = process.stdout.readline().decode("ascii").split()
+            if len(header) != 3:
+                raise GitError(f"Объект не найден: {sha}")
+            size = int(header[2])
+            data = process.stdout.read(size)
+            process.stdout.read(1)  # Завершающий перевод строки
+            yield sha, data
+
+    # ------------------------------------------------------------------
+    # Внутреннее
+    # ------------------------------------------------------------------
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._batch is None or self._batch.poll() is not None:
+            self._batch = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.toplevel,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._batch
+
+    def _run(self, args: List[str], cwd: Optional[Path] = None) -> str:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=cwd or self.toplevel,
+                capture_output=True,
+                check=True,
+            )
+        except FileNotFoundError as exc:
+            raise GitError("Git не найден в PATH") from exc
+        except subprocess.CalledProcessError as exc:
+            message = exc.stderr.decode("utf-8", errors="replace").strip()
+            raise GitError(message or f"git {' '.join(args)} завершился с ошибкой") from exc
+        return result.stdout.decode("utf-8")
+
+
+def index_tree(entries: Iterable[TreeEntry]) -> Dict[str, TreeEntry]:
+    """Сопоставить ID сущности с её файлом в дереве (файлы без ID пропускаются)."""
+    by_id: Dict[str, TreeEntry] = {}
+    for path, sha in entries:
+        entity_id = entity_id_from_path(path)
+        if entity_id is not None:
+            by_id[entity_id] = (path, sha)
+    return by_id
+
+
+class BlobParseCache:
+    """
+    Кэш разобранных сущностей по SHA blob'а (LRU).
+
+    Содержимое blob'а неизменно, поэтому разобранная сущность для SHA
+    никогда не устаревает; ограничен только размер кэша.
+    """
+
+    def __init__(self, max_size: int = 20000):
+        """
+        Инициализация кэша.
+
+        Args:
+            max_size: Максимум сущностей в кэше
+        """
+        self.max_size = max_size
+        self._entities: "OrderedDict[Tuple[str, str], BaseEntity]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        with self._lock:
+            self._entities.clear()
+
+    def load(
+        self,
+        store: GitObjectStore,
+        entries: Iterable[Tuple[str, str, str]],
+        copy: bool = True,
+        validate: bool = False,
+    ) -> Iterator[Tuple[str, str, Union[BaseEntity, Exception]]]:
+        """
+        Разобрать сущности ревизии, читая из Git только отсутствующие в кэше blob'ы.
+
+        Args:
+            store: Открытое хранилище Git
+            entries: [(ID сущности, путь, SHA blob'а), ...]
+            copy: Возвращать копии (изменение результата не портит кэш);
+                False — для сценариев только чтения
+            validate: Повторно валидировать попадания в кэш (режим strict);
+                по умолчанию копии собираются без валидации — данные уже проверены
+
+        Yields:
+            (ID, путь, сущность или исключение разбора) в порядке `entries`
+        """
+        entries = list(entries)
+        parsed: Dict[Tuple[str, str], Union[BaseEntity, Exception]] = {}
+        missing: Dict[str, List[Tuple[str, str]]] = {}
+        with self._lock:
+            for entity_id, _, sha in entries:
+                key = (sha, entity_id)
+                cached = self._entities.get(key)
+                if cached is not None:
+                    self._entities.move_to_end(key)
+                    parsed[key] = cached
+                    self.hits += 1
+                elif key not in parsed:
+                    missing.setdefault(sha, []).append(key)
+
+        for sha, data in store.read_blobs(list(missing)):
+            for key in missing[sha]:
+                self.misses += 1
+                try:
+                    entity = _parse_blob(key[1], data)
+                except Exception as exc:  # Некорректный файл не должен ломать загрузку
+                    parsed[key] = exc
+                    continue
+                parsed[key] = entity
+                self._store(key, entity)
+
+        for entity_id, path, sha in entries:
+            result = parsed[(sha, entity_id)]
+            if isinstance(result, BaseEntity) and (copy or validate):
+                result = _reconstruct(result, validate)
+            yield entity_id, path, result
+
+    def _store(self, key: Tuple[str, str], entity: BaseEntity) -> None:
+        with self._lock:
+            self._entities[key] = entity
+            while len(self._entities) > self.max_size:
+                self._entities.popitem(last=False)
+
+
+def _reconstruct(entity: BaseEntity, validate: bool) -> BaseEntity:
+    """Независимая копия сущности из кэша (доверенная или с полной валидацией)."""
+    if validate:
+        copy = type(entity).model_validate(entity.model_dump())
+        copy.mark_clean()
+        return copy
+    return entity.trusted_copy()
+
+
+def _parse_blob(entity_id: str, data: bytes) -> BaseEntity:
+    prefix, _ = ConceptSchema.parse_id(entity_id)
+    return entity_from_markdown(data.decode("utf-8"), ConceptSchema.get_entity_class(prefix))
+
+
+# Общий кэш процесса: его используют Ontology.load_at и diff_revisions.
+parse_cache = BlobParseCache()
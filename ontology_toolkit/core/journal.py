@@ -0,0 +1,229 @@
+"""
+Журнал упреждающей записи (write-ahead) для массовых AI-операций.
+
+Каждый запуск `fill-all`, `extract` и других пакетных команд пишет JSONL-файл
+в `.ontology/.journal/`:
+- `run`    — заголовок запуска (команда, параметры, время);
+- `plan`   — ключи всех запланированных операций (например, ID понятий);
+- `done`   — результат операции (то, что вернул AI), записывается до сохранения
+  сущностей, поэтому переживает сбой между пакетными сохранениями;
+- `failed` — ошибка операции (при возобновлении операция повторяется);
+- `finish` — запуск завершён.
+
+Возобновление: результаты `done` применяются повторно без обращения к AI,
+выполняются только оставшиеся операции.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ontology_toolkit.core.embeddings import ensure_cache_dir
+from ontology_toolkit.core.schema import BaseEntity
+
+__all__ = ["JOURNAL_DIR", "OperationJournal", "apply_fields"]
+
+JOURNAL_DIR = ".journal"
+
+
+class OperationJournal:
+    """Журнал одного запуска пакетной команды."""
+
+    def __init__(self, path: Path):
+        """
+        Открыть журнал (существующий файл читается целиком).
+
+        Args:
+            path: Файл журнала (`.ontology/.journal/<команда>-<run_id>.jsonl`)
+        """
+        self.path = Path(path)
+        self.run_id = ""
+        self.command = ""
+        self.params: Dict[str, Any] = {}
+        self.created: Optional[str] = None
+        self.planned: List[str] = []
+        self.results: Dict[str, Any] = {}
+        self.failures: Dict[str, str] = {}
+        self.finished = False
+        # Последняя строка оборвана сбоем: следующая запись начнётся с новой строки
+        self._torn_tail = False
+        if self.path.exists():
+            self._replay()
+
+    # ------------------------------------------------------------------
+    # Создание и поиск
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def start(
+        cls,
+        ontology_root: Path,
+        command: str,
+        keys: Iterable[str],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> "OperationJournal":
+        """
+        Начать новый запуск и записать план операций.
+
+        Args:
+            ontology_root: Корень онтологии (.ontology/)
+            command: Имя команды (`fill-all`, `extract`, ...)
+            keys: Ключи операций в порядке выполнения
+            params: Параметры запуска (для проверки при возобновлении)
+
+        Returns:
+            Журнал запуска
+        """
+        directory = ensure_cache_dir(Path(ontology_root) / JOURNAL_DIR)
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        journal = cls(directory / f"{command}-{run_id}.jsonl")
+        journal.run_id = run_id
+        journal.command = command
+        journal.params = dict(params or {})
+        journal.created = datetime.now().isoformat(timespec="seconds")
+        journal.planned = list(keys)
+        journal._append(
+            {
+                "event": "run",
+                "run_id": run_id,
+                "command": command,
+                "params": journal.params,
+                "created": journal.created,
+            },
+            {"event": "plan", "keys": journal.planned},
+        )
+        return journal
+
+    @classmethod
+    def unfinished(
+        cls,
+        ontology_root: Path,
+        command: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional["OperationJournal"]:
+        """
+        Последний незавершённый запуск команды.
+
+        Args:
+            ontology_root: Корень онтологии
+            command: Имя команды
+            params: Если задано — параметры запуска должны совпадать
+
+        Returns:
+            Журнал или None
+        """
+        directory = Path(ontology_root) / JOURNAL_DIR
+        if not directory.exists():
+            return None
+        # Имена файлов содержат время запуска, поэтому сортировка хронологическая
+        for path in sorted(directory.glob(f"{command}-*.jsonl"), reverse=True):
+            journal = cls(path)
+            if journal.command != command or journal.finished:
+                continue
+            if params is not None and journal.params != params:
+                continue
+            return journal
+        return None
+
+    # ------------------------------------------------------------------
+    # Состояние
+    # ------------------------------------------------------------------
+
+    def is_done(self, key: str) -> bool:
+        """Операция выполнена успешно."""
+        return key in self.results
+
+    def pending(self) -> List[str]:
+        """Запланированные операции без успешного результата (в порядке плана)."""
+        return [key for key in self.planned if key not in self.results]
+
+    # ------------------------------------------------------------------
+    # Запись
+    # ------------------------------------------------------------------
+
+    def record(self, key: str, result: Any = None) -> None:
+        """
+        Записать результат операции (до применения к файлам онтологии).
+
+        Args:
+            key: Ключ операции
+            result: JSON-совместимый результат
+        """
+        self._append({"event": "done", "key": key, "result": result})
+        self.results[key] = result
+        self.failures.pop(key, None)
+
+    def record_failure(self, key: str, error: str) -> None:
+        """Записать ошибку операции (при возобновлении она будет повторена)."""
+        self._append({"event": "failed", "key": key, "error": error})
+        self.failures[key] = error
+
+    def finish(self) -> None:
+        """Отметить запуск завершённым."""
+        if not self.finished:
+            self._append({"event": "finish", "at": datetime.now().isoformat(timespec="seconds")})
+            self.finished = True
+
+    # ------------------------------------------------------------------
+    # Внутреннее
+    # ------------------------------------------------------------------
+
+    def _append(self, *records: Dict[str, Any]) -> None:
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        if self._torn_tail:
+            lines = "\n" + lines
+            self._torn_tail = False
+        with open(self.path, "a", encoding="utf-8") as handler:
+            handler.write(lines)
+            handler.flush()
+            os.fsync(handler.fileno())
+
+    def _replay(self) -> None:
+        with open(self.path, encoding="utf-8") as handler:
+            for line in handler:
+                self._torn_tail = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Строка, оборванная сбоем при записи
+                event = record.get("event")
+                if event == "run":
+                    self.run_id = record.get("run_id", "")
+                    self.command = record.get("command", "")
+                    self.params = record.get("params", {})
+                    self.created = record.get("created")
+                elif event == "plan":
+                    self.planned = list(record.get("keys", []))
+                elif event == "done":
+                    self.results[record["key"]] = record.get("result")
+                    self.failures.pop(record["key"], None)
+                elif event == "failed":
+                    self.failures[record["key"]] = record.get("error", "")
+                elif event == "finish":
+                    self.finished = True
+
+
+def apply_fields(entity: BaseEntity, fields: Dict[str, Any]) -> bool:
+    """
+    Применить к сущности значения полей из журнала (с валидацией модели).
+
+    Args:
+        entity: Сущность
+        fields: {поле: значение в JSON-виде}
+
+    Returns:
+        True, если хотя бы одно поле изменилось
+    """
+    restored = type(entity).model_validate({**entity.model_dump(), **fields})
+    changed = False
+    for name in fields:
+        value = getattr(restored, name)
+        if getattr(entity, name) != value:
+            setattr(entity, name, value)
+            changed = True
+    return changed
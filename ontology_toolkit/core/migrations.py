@@ -0,0 +1,405 @@
+"""
+Миграции схемы файлов сущностей (`ontology migrate`).
+
+Миграция — номер версии и список декларативных шагов над «сырым» файлом
+(frontmatter + секции Markdown), а не над моделью: файл старой схемы может
+не проходить валидацию текущей. После шагов сущность строится текущей моделью
+и отрисовывается заново; переписываются только файлы, где шаги что-то изменили
+и байты действительно отличаются.
+
+Версия схемы проекта хранится в `ontology.yaml` (`schema_version`);
+применяются миграции с номером больше записанного.
+
+Шаги:
+- `RenameField(old, new)`       — переименовать поле frontmatter или секцию;
+- `SetDefault(field, value)`    — добавить отсутствующее поле;
+- `MapValues(field, mapping)`   — заменить устаревшие значения;
+- `RemoveField(field)`          — удалить поле;
+- `FoldSections(into, known)`   — перенести неизвестные секции в поле-секцию;
+- `Transform(func)`             — произвольная функция (для нестандартных случаев).
+
+У каждого шага есть `types` — ключи `ENTITY_REGISTRY` ("concept", "method", ...),
+к которым он применяется (по умолчанию — ко всем).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.concept import entity_from_parts, entity_to_markdown, split_markdown
+from ontology_toolkit.core.config import load_config, save_config
+from ontology_toolkit.core.storage import BulkWriteError, BulkWriter
+
+__all__ = [
+    "CURRENT_SCHEMA_VERSION",
+    "EntityDocument",
+    "FoldSections",
+    "MIGRATIONS",
+    "MapValues",
+    "Migration",
+    "MigrationReport",
+    "MigrationStep",
+    "RemoveField",
+    "RenameField",
+    "SetDefault",
+    "Transform",
+    "migrate_ontology",
+    "pending_migrations",
+]
+
+# Ниже этого числа файлов пул процессов не запускается
+PARALLEL_THRESHOLD = 200
+
+# Секции, которые понимает `entity_from_parts`
+KNOWN_SECTIONS = ("definition", "purpose", "examples", "notes")
+
+
+class EntityDocument:
+    """Файл сущности в «сыром» виде: frontmatter и секции."""
+
+    def __init__(self, entity_type: str, metadata: Dict[str, Any], sections: Dict[str, str]):
+        """
+        Args:
+            entity_type: Ключ ENTITY_REGISTRY ("concept", "method", ...)
+            metadata: Поля frontmatter
+            sections: {заголовок секции в нижнем регистре: текст}
+        """
+        self.entity_type = entity_type
+        self.metadata = metadata
+        self.sections = sections
+
+    def has(self, field: str) -> bool:
+        return field in self.metadata or field in self.sections
+
+
+class MigrationStep(ABC):
+    """
+    Шаг миграции. `apply` возвращает True, если документ изменён.
+
+    Шаг без `apply` нельзя создать: ошибка возникает при объявлении
+    списка миграций, а не посреди прогона по файлам.
+    """
+
+    types: Optional[Tuple[str, ...]] = None
+
+    def applies_to(self, entity_type: str) -> bool:
+        return self.types is None or entity_type in self.types
+
+    @abstractmethod
+    def apply(self, document: EntityDocument) -> bool:
+        """Применить шаг к документу. Returns: True, если документ изменён."""
+
+    def __repr__(self) -> str:
+        params = ", ".join(
+            f"{key}={value!r}" for key, value in vars(self).items() if key != "types"
+        )
+        return f"{type(self).__name__}({params})"
+
+
+class RenameField(MigrationStep):
+    """Переименовать поле (во frontmatter или секцию)."""
+
+    def __init__(self, old: str, new: str, types: Optional[Sequence[str]] = None):
+        self.old, self.new = old, new
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        for container in (document.metadata, document.sections):
+            if self.old in container:
+                value = container.pop(self.old)
+                # Значение под новым именем (если уже есть) главнее устаревшего
+                container.setdefault(self.new, value)
+                return True
+        return False
+
+
+class SetDefault(MigrationStep):
+    """Добавить поле frontmatter со значением по умолчанию, если его нет."""
+
+    def __init__(self, field: str, value: Any, types: Optional[Sequence[str]] = None):
+        self.field, self.value = field, value
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        if document.has(self.field):
+            return False
+        document.metadata[self.field] = self.value
+        return True
+
+
+class MapValues(MigrationStep):
+    """Заменить значения поля frontmatter по словарю (например, устаревшие статусы)."""
+
+    def __init__(
+        self, field: str, mapping: Dict[Any, Any], types: Optional[Sequence[str]] = None
+    ):
+        self.field, self.mapping = field, dict(mapping)
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        value = document.metadata.get(self.field)
+        try:
+            if value not in self.mapping:
+                return False
+        except TypeError:  # Нехэшируемое значение (список, словарь)
+            return False
+        document.metadata[self.field] = self.mapping[value]
+        return True
+
+
+class RemoveField(MigrationStep):
+    """Удалить поле frontmatter (или секцию)."""
+
+    def __init__(self, field: str, types: Optional[Sequence[str]] = None):
+        self.field = field
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        if not document.has(self.field):
+            return False
+        document.metadata.pop(self.field, None)
+        document.sections.pop(self.field, None)
+        return True
+
+
+class FoldSections(MigrationStep):
+    """Перенести неизвестные секции в поле-секцию (иначе они теряются при сохранении)."""
+
+    def __init__(
+        self,
+        into: str = "notes",
+        known: Sequence[str] = KNOWN_SECTIONS,
+        types: Optional[Sequence[str]] = None,
+    ):
+        self.into, self.known = into, tuple(known)
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        extra = [title for title in document.sections if title not in self.known]
+        if not extra:
+            return False
+        parts = [document.sections[self.into]] if document.sections.get(self.into) else []
+        for title in extra:
+            text = document.sections.pop(title)
+            parts.append(f"### {title.capitalize()}\n{text}".rstrip())
+        document.sections[self.into] = "\n\n".join(parts)
+        return True
+
+
+class Transform(MigrationStep):
+    """
+    Произвольный шаг: функция получает EntityDocument и возвращает True при изменении.
+
+    Функция должна быть определена на уровне модуля (передаётся в процессы пула).
+    """
+
+    def __init__(
+        self, func: Callable[[EntityDocument], bool], types: Optional[Sequence[str]] = None
+    ):
+        self.func = func
+        self.types = tuple(types) if types else None
+
+    def apply(self, document: EntityDocument) -> bool:
+        return bool(self.func(document))
+
+
+class Migration:
+    """Версия схемы и шаги перехода к ней."""
+
+    def __init__(self, version: int, description: str, steps: Sequence[MigrationStep]):
+        self.version = version
+        self.description = description
+        self.steps = tuple(steps)
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.description!r})"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Неизвестные секции (например, «## Context») переносятся в Notes — "
+        "раньше они молча терялись при первом сохранении",
+        [FoldSections(into="notes")],
+    ),
+]
+
+CURRENT_SCHEMA_VERSION = max(migration.version for migration in MIGRATIONS)
+
+
+class MigrationReport(BaseModel):
+    """Результат миграции."""
+
+    from_version: int
+    to_version: int
+    applied: List[str] = Field(default_factory=list)
+    files_checked: int = 0
+    changed: List[str] = Field(default_factory=list)
+    errors: List[str] = Field(default_factory=list)
+    dry_run: bool = False
+    duration_seconds: float = 0.0
+
+
+def pending_migrations(
+    from_version: int, migrations: Optional[Sequence[Migration]] = None
+) -> List[Migration]:
+    """Миграции новее указанной версии, по возрастанию."""
+    return sorted(
+        (m for m in (MIGRATIONS if migrations is None else migrations) if m.version > from_version),
+        key=lambda migration: migration.version,
+    )
+
+
+# Результат по файлу: (относительный путь, новые байты или None, ошибка или None)
+_FileResult = Tuple[str, Optional[bytes], Optional[str]]
+
+
+def _migrate_files(
+    items: Sequence[Tuple[str, str, str, type]], migrations: Sequence[Migration]
+) -> List[_FileResult]:
+    """Применить миграции к пачке файлов (выполняется в процессе пула)."""
+    results: List[_FileResult] = []
+    for file_path, relative, entity_type, entity_cls in items:
+        try:
+            original = Path(file_path).read_bytes()
+            metadata, sections = split_markdown(original.decode("utf-8"))
+            document = EntityDocument(entity_type, metadata, sections)
+            changed = False
+            for migration in migrations:
+                for step in migration.steps:
+                    if step.applies_to(entity_type) and step.apply(document):
+                        changed = True
+            if not changed:
+                results.append((relative, None, None))
+                continue
+            entity = entity_from_parts(document.metadata, document.sections, entity_cls)
+            payload = entity_to_markdown(entity).encode("utf-8")
+            results.append((relative, payload if payload != original else None, None))
+        except Exception as exc:  # Один некорректный файл не должен останавливать миграцию
+            results.append((relative, None, str(exc)))
+    return results
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _bounded_map(
+    executor: ProcessPoolExecutor,
+    chunks: Iterator[List],
+    migrations: Sequence[Migration],
+    window: int,
+) -> Iterator[List[_FileResult]]:
+    """Как executor.map, но в работе не больше `window` пачек (память не растёт)."""
+    queue: Deque[Future] = deque()
+    for chunk in chunks:
+        queue.append(executor.submit(_migrate_files, chunk, migrations))
+        if len(queue) >= window:
+            yield queue.popleft().result()
+    while queue:
+        yield queue.popleft().result()
+
+
+def migrate_ontology(
+    root: Path,
+    migrations: Optional[Sequence[Migration]] = None,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = 100,
+) -> MigrationReport:
+    """
+    Привести файлы онтологии к текущей версии схемы.
+
+    Файлы обрабатываются пачками в пуле процессов; результаты по мере готовности
+    передаются в `BulkWriter` (атомарная запись, переименование после записи всех).
+    Версия схемы в `ontology.yaml` обновляется, только если ошибок не было.
+
+    Args:
+        root: Корень онтологии (.ontology/)
+        migrations: Список миграций (по умолчанию — встроенные `MIGRATIONS`)
+        dry_run: Только определить файлы, которые изменятся
+        workers: Количество процессов (по умолчанию — число ядер; 1 — без пула)
+        chunk_size: Файлов в одной пачке
+
+    Returns:
+        Отчёт миграции
+    """
+    # Импорт здесь: ontology.py использует CURRENT_SCHEMA_VERSION из этого модуля
+    from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+
+    started = time.perf_counter()
+    root = Path(root)
+    config = load_config(root)
+    all_migrations = MIGRATIONS if migrations is None else list(migrations)
+    pending = pending_migrations(config.schema_version, all_migrations)
+    target = max((m.version for m in all_migrations), default=config.schema_version)
+    report = MigrationReport(
+        from_version=config.schema_version,
+        to_version=max(target, config.schema_version),
+        applied=[f"v{m.version}: {m.description}" for m in pending],
+        dry_run=dry_run,
+    )
+    if not pending:
+        report.duration_seconds = round(time.perf_counter() - started, 3)
+        return report
+
+    items: List[Tuple[str, str, str, type]] = []
+    for entity_type, registry in ENTITY_REGISTRY.items():
+        directory = root / registry["dir"]
+        if directory.exists():
+            for file_path in Ontology._entity_files(directory):
+                relative = file_path.relative_to(root).as_posix()
+                items.append((str(file_path), relative, entity_type, registry["model"]))
+    items.sort(key=lambda item: item[1])
+    report.files_checked = len(items)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(items, chunk_size)
+    executor = (
+        ProcessPoolExecutor(max_workers=workers)
+        if workers > 1 and len(items) >= PARALLEL_THRESHOLD
+        else None
+    )
+    writer = None if dry_run else BulkWriter()
+    try:
+        batches = (
+            _bounded_map(executor, chunks, pending, window=workers * 2)
+            if executor is not None
+            else (_migrate_files(chunk, pending) for chunk in chunks)
+        )
+        # Пачки обрабатываются по мере готовности и сразу уходят в очередь записи
+        for batch in batches:
+            for relative, payload, error in batch:
+                if error is not None:
+                    report.errors.append(f"{relative}: {error}")
+                elif payload is not None:
+                    report.changed.append(relative)
+                    if writer is not None:
+                        writer.write(root / relative, payload)
+        if writer is not None:
+            writer.commit()
+    except BulkWriteError as exc:
+        failed = {str(path) for path, _ in exc.errors}
+        report.changed = [path for path in report.changed if str(root / path) not in failed]
+        report.errors.extend(f"{path}: {error}" for path, error in exc.errors)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if not dry_run and not report.errors:
+        save_config(root, config.model_copy(update={"schema_version": report.to_version}))
+    report.duration_seconds = round(time.perf_counter() - started, 3)
+    return report
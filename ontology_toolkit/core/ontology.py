@@ -2,14 +2,18 @@
 Класс Ontology для управления всей онтологией проекта.
 
 Функции:
-- Загрузка всех объектов из файлов
+- Загрузка всех объектов из файлов или из ревизии Git (без checkout)
 - Индексация по ID и name
+- Индекс ID → файл (без обхода каталогов при сохранении/удалении)
+- Плоская или шардированная раскладка файлов (concepts/00/C_100_*.md)
 - Построение графа связей
 - Валидация связей (broken links)
 - Добавление/удаление объектов
 - Поиск по различным критериям
+- Предложение связей по текстовой близости (TF-IDF)
 """
 
+import os
 from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Type
@@ -27,19 +31,31 @@ from ontology_toolkit.core.schema import (
     BaseEntity,
     ConceptStatus,
     ConceptSchema,
+    RelationChange,
 )
 from ontology_toolkit.core.concept import (
     ConceptFactory,
     load_entity_from_file,
     save_entity_to_file,
 )
+from ontology_toolkit.core.config import CONFIG_FILE, load_config, save_config, shard_name
+from ontology_toolkit.core.embeddings import EmbedFunction, EmbeddingIndex
+from ontology_toolkit.core.gitstore import GitObjectStore, index_tree, parse_cache
+from ontology_toolkit.core.migrations import CURRENT_SCHEMA_VERSION
+from ontology_toolkit.core.similarity import TfidfIndex
+from ontology_toolkit.core.storage import AtomicWriteBatch, BulkWriter, EntityPathIndex
 
 ENTITY_REGISTRY: Dict[str, Dict[str, Any]] = {
-    "concept": {"model": ConceptModel, "dir_attr": "concepts_dir", "prefix": "C"},
-    "method": {"model": Method, "dir_attr": "methods_dir", "prefix": "M"},
-    "system": {"model": System, "dir_attr": "systems_dir", "prefix": "S"},
-    "problem": {"model": Problem, "dir_attr": "problems_dir", "prefix": "P"},
-    "artifact": {"model": Artifact, "dir_attr": "artifacts_dir", "prefix": "A"},
+    "concept": {
+        "model": ConceptModel,
+        "dir_attr": "concepts_dir",
+        "dir": "concepts",
+        "prefix": "C",
+    },
+    "method": {"model": Method, "dir_attr": "methods_dir", "dir": "methods", "prefix": "M"},
+    "system": {"model": System, "dir_attr": "systems_dir", "dir": "systems", "prefix": "S"},
+    "problem": {"model": Problem, "dir_attr": "problems_dir", "dir": "problems", "prefix": "P"},
+    "artifact": {"model": Artifact, "dir_attr": "artifacts_dir", "dir": "artifacts", "prefix": "A"},
 }
 
 PREFIX_TO_DIR: Dict[str, str] = {
@@ -56,10 +72,16 @@ class OntologyIndex:
         self.by_name: Dict[str, List[BaseEntity]] = defaultdict(list)
         self.by_prefix: Dict[str, List[BaseEntity]] = defaultdict(list)
         self.by_status: Dict[str, List[ConceptModel]] = defaultdict(list)
+        # Обратные ссылки: ID цели → ID объектов, ссылающихся на неё
+        # (обновляются по событиям изменения связей сущностей)
+        self.backlinks: Dict[str, Set[str]] = defaultdict(set)
 
     def add(self, entity: BaseEntity) -> None:
         """Добавить объект в индекс."""
         self.by_id[entity.id] = entity
+        for relation in entity.relations:
+            self.backlinks[relation.target].add(entity.id)
+        entity.subscribe_relations(self._on_relations_changed)
         
         # Нормализованное имя для поиска
         normalized_name = self._normalize_name(entity.name)
@@ -79,8 +101,11 @@ class OntologyIndex:
             return None
 
         entity = self.by_id.pop(entity_id)
+        entity.unsubscribe_relations(self._on_relations_changed)
 
         # Удаляем из других индексов
+        for relation in entity.relations:
+            self.backlinks[relation.target].discard(entity_id)
         normalized_name = self._normalize_name(entity.name)
         if normalized_name in self.by_name:
             self.by_name[normalized_name] = [
@@ -97,6 +122,20 @@ class OntologyIndex:
 
         return entity
 
+    def _on_relations_changed(self, change: RelationChange) -> None:
+        entity = self.by_id.get(change.entity_id)
+        if entity is None:
+            return
+        for relation in change.removed:
+            if not entity.has_relation(relation.target):
+                self.backlinks[relation.target].discard(change.entity_id)
+        for relation in change.added:
+            self.backlinks[relation.target].add(change.entity_id)
+
+    def linked_from(self, target_id: str) -> Set[str]:
+        """ID объектов, ссылающихся на объект (включая ссылки на отсутствующие ID)."""
+        return set(self.backlinks.get(target_id, ()))
+
     def get(self, entity_id: str) -> Optional[BaseEntity]:
         """Получить объект по ID."""
         return self.by_id.get(entity_id)
@@ -106,6 +145,26 @@ class OntologyIndex:
         normalized = self._normalize_name(name)
         return self.by_name.get(normalized, [])
 
+    def fingerprints(self) -> Dict[str, str]:
+        """Отпечатки содержимого всех объектов {ID: fingerprint} (для поиска изменений)."""
+        return {entity_id: entity.fingerprint for entity_id, entity in self.by_id.items()}
+
+    def changed_since(self, fingerprints: Dict[str, str]) -> List[str]:
+        """
+        ID объектов, добавленных или изменённых по сравнению со снимком отпечатков.
+        
+        Args:
+            fingerprints: Ранее сохранённый результат `fingerprints()`
+            
+        Returns:
+            Список ID (удалённые объекты — те, что есть в снимке, но не в индексе)
+        """
+        return [
+            entity_id
+            for entity_id, entity in self.by_id.items()
+            if fingerprints.get(entity_id) != entity.fingerprint
+        ]
+
     def get_next_id(self, prefix: str) -> str:
         """Получить следующий свободный ID для префикса."""
         entities = self.by_prefix.get(prefix, [])
@@ -140,6 +199,9 @@ class Ontology:
         self.index = OntologyIndex()
         self.graph = nx.DiGraph()  # Направленный граф связей
         self.console = Console()
+        self._similarity: Optional[TfidfIndex] = None  # Строится лениво
+        # Опциональный слой эмбеддингов (подключается через use_embeddings)
+        self.embeddings: Optional[EmbeddingIndex] = None
 
         # Пути к папкам
         self.concepts_dir = self.root_path / "concepts"
@@ -147,10 +209,19 @@ class Ontology:
         self.systems_dir = self.root_path / "systems"
         self.problems_dir = self.root_path / "problems"
         self.artifacts_dir = self.root_path / "artifacts"
+        self.cache_dir = self.root_path / ".cache"
+        # Конфигурация проекта (ontology.yaml): раскладка файлов и т.п.
+        self.config = load_config(self.root_path)
+        # ID → файл сущности; заполняется в load_all и обновляется при сохранении
+        self.paths = EntityPathIndex(self.root_path, self.cache_dir / "paths.json")
+        # SHA коммита, если онтология загружена из Git (load_at)
+        self.revision: Optional[str] = None
 
     def load_all(self) -> None:
         """Загружает все сущности из файловой структуры проекта."""
         self.console.print("[bold blue]Загрузка онтологии из файлов...[/bold blue]")
+        self.paths.reset()
+        self.revision = None
 
         for config in ENTITY_REGISTRY.values():
             directory: Path = getattr(self, config["dir_attr"])
@@ -158,15 +229,78 @@ class Ontology:
             if not directory.exists():
                 continue
 
-            for file_path in directory.glob("*.md"):
+            # Файлы в корне каталога типа и в подкаталогах-шардах:
+            # загрузка не зависит от раскладки (и от незавершённой миграции)
+            for file_path in self._entity_files(directory):
                 try:
                     entity = load_entity_from_file(file_path, entity_cls)
+                    duplicate = self.paths.get(entity.id)
+                    if duplicate is not None:
+                        self.console.print(
+                            f"[yellow]ID {entity.id} встречается в двух файлах: "
+                            f"{duplicate.name}, {file_path.name}[/yellow]"
+                        )
                     self.add_entity(entity)
+                    self.paths.set(entity.id, file_path)
                 except Exception as exc:
                     self.console.print(f"[red]?????? ??? ???????? {file_path}: {exc}[/red]")
 
         self.console.print(f"[green]Загружено объектов: {len(self.index.by_id)}[/green]")
+        if (
+            (self.root_path / CONFIG_FILE).exists()
+            and self.config.schema_version < CURRENT_SCHEMA_VERSION
+        ):
+            self.console.print(
+                f"[yellow]Схема файлов v{self.config.schema_version} устарела "
+                f"(текущая v{CURRENT_SCHEMA_VERSION}). Выполните: ontology migrate[/yellow]"
+            )
+        self.paths.save()
+        self._build_graph()
+
+    @staticmethod
+    def _entity_files(directory: Path) -> List[Path]:
+        return [*directory.glob("*.md"), *directory.glob("*/*.md")]
+
+    def load_at(self, rev: str, store: Optional[GitObjectStore] = None) -> str:
+        """
+        Загрузить онтологию в состоянии ревизии Git (без checkout и рабочего дерева).
+        
+        Blob'ы `.ontology/**.md` читаются одним процессом `git cat-file --batch`,
+        разобранные сущности кэшируются по SHA blob'а: файлы, общие для
+        нескольких ревизий, разбираются один раз. Индекс путей рабочего дерева
+        не меняется.
+        
+        Args:
+            rev: Ревизия (ветка, тег, HEAD~3, SHA)
+            store: Открытое хранилище (для серии загрузок; иначе создаётся внутри)
+            
+        Returns:
+            SHA загруженного коммита
+        """
+        own_store = store is None
+        git = store or GitObjectStore(self.root_path)
+        try:
+            commit = git.resolve(rev)
+            tree = index_tree(git.list_tree(commit))
+            entries = [(entity_id, path, sha) for entity_id, (path, sha) in tree.items()]
+            loaded = list(
+                parse_cache.load(git, entries, validate=self.config.validation == "strict")
+            )
+        finally:
+            if own_store:
+                git.close()
+        
+        self.index = OntologyIndex()
+        self._similarity = None
+        for _, path, result in loaded:
+            if isinstance(result, Exception):
+                self.console.print(f"[red]Ошибка при загрузке {path} ({rev}): {result}[/red]")
+                continue
+            self.add_entity(result)
+        
+        self.revision = commit
         self._build_graph()
+        return commit
 
     def add_entity(self, entity: BaseEntity) -> None:
         """
@@ -176,22 +310,34 @@ class Ontology:
             entity: Объект (Concept, Method, System, ...)
         """
         self.index.add(entity)
+        entity.subscribe_relations(self._on_relations_changed)
+        if self._similarity is not None:
+            self._similarity.update(entity)
 
-    def remove_entity(self, entity_id: str) -> Optional[BaseEntity]:
+    def remove_entity(self, entity_id: str, delete_file: bool = False) -> Optional[BaseEntity]:
         """
         Удалить объект из онтологии.
         
         Args:
             entity_id: ID объекта
+            delete_file: Удалить и файл сущности (по индексу путей, без обхода каталога)
             
         Returns:
             Удалённый объект или None
         """
         entity = self.index.remove(entity_id)
+        if delete_file:
+            path = self.paths.get(entity_id)
+            if path is not None:
+                path.unlink(missing_ok=True)
+                self.paths.record(entity_id, None)
         if entity:
+            entity.unsubscribe_relations(self._on_relations_changed)
             # Удаляем из графа
             if self.graph.has_node(entity_id):
                 self.graph.remove_node(entity_id)
+            if self._similarity is not None:
+                self._similarity.remove(entity_id)
         return entity
 
     def add_concept(
@@ -260,15 +406,152 @@ class Ontology:
         """Сохраняет концепт в файловой системе."""
         return self.save_entity(concept, overwrite=overwrite)
 
-    def save_entity(self, entity: BaseEntity, overwrite: bool = True) -> Path:
-        """Сохраняет сущность любого типа в соответствующую директорию."""
-        prefix, _ = ConceptSchema.parse_id(entity.id)
+    def save_entity(
+        self,
+        entity: BaseEntity,
+        overwrite: bool = True,
+        batch: Optional[AtomicWriteBatch] = None,
+    ) -> Path:
+        """
+        Сохраняет сущность любого типа в соответствующую директорию.
+        
+        Если имя сущности изменилось, файл переименовывается: прежний путь
+        берётся из индекса путей, старый файл удаляется.
+        """
+        if self._similarity is not None and entity.is_dirty:
+            # После записи сущность станет чистой — индекс близости обновляется сейчас
+            self._similarity.update(entity)
+        directory = self.entity_directory(entity.id)
+        path = save_entity_to_file(
+            entity,
+            directory,
+            overwrite=overwrite,
+            batch=batch,
+            previous_path=self.paths.get(entity.id),
+        )
+        if batch is not None:
+            # Индекс путей меняется, только если файл записан
+            batch.after_commit(lambda: self.paths.set(entity.id, path), after=path)
+        else:
+            # Одна строка в журнал индекса, а не перезапись всего paths.json
+            self.paths.record(entity.id, path)
+        return path
+
+    def entity_directory(self, entity_id: str, layout: Optional[str] = None) -> Path:
+        """
+        Каталог файла сущности с учётом раскладки.
+        
+        Args:
+            entity_id: ID сущности
+            layout: Раскладка (по умолчанию — из конфигурации проекта)
+            
+        Returns:
+            `concepts/` (flat) или `concepts/00/` (sharded)
+        """
+        prefix, number = ConceptSchema.parse_id(entity_id)
         directory_attr = PREFIX_TO_DIR.get(prefix)
         if not directory_attr:
-            raise ValueError(f"Неизвестный префикс '{prefix}' для сущности {entity.id}")
+            raise ValueError(f"Неизвестный префикс '{prefix}' для сущности {entity_id}")
 
         directory: Path = getattr(self, directory_attr)
-        return save_entity_to_file(entity, directory, overwrite=overwrite)
+        if (layout or self.config.layout) == "sharded":
+            directory = directory / shard_name(number, self.config.shard_size)
+        return directory
+
+    def relayout(
+        self, layout: str, shard_size: Optional[int] = None, dry_run: bool = False
+    ) -> List[Tuple[Path, Path]]:
+        """
+        Перенести файлы сущностей в другую раскладку (flat ↔ sharded).
+        
+        Файлы переименовываются (`os.replace`, без перезаписи содержимого),
+        пустые подкаталоги-шарды удаляются, раскладка сохраняется в ontology.yaml.
+        Онтология должна быть загружена (`load_all`).
+        
+        Args:
+            layout: "flat" или "sharded"
+            shard_size: Сущностей на подкаталог (для sharded)
+            dry_run: Только вернуть план переносов
+            
+        Returns:
+            Список переносов (старый путь, новый путь)
+        """
+        if layout not in ("flat", "sharded"):
+            raise ValueError(f"Неизвестная раскладка: {layout} (flat/sharded)")
+        config = self.config.model_copy(
+            update={"layout": layout, "shard_size": shard_size or self.config.shard_size}
+        )
+        previous_config, self.config = self.config, config
+
+        planned: List[Tuple[str, Path, Path]] = []
+        try:
+            for entity_id in sorted(self.paths, key=_id_sort_key):
+                source = self.paths.get(entity_id)
+                if source is None or not source.exists():
+                    continue
+                target = self.entity_directory(entity_id) / source.name
+                if target != source:
+                    planned.append((entity_id, source, target))
+        finally:
+            if dry_run:
+                self.config = previous_config
+        moves = [(source, target) for _, source, target in planned]
+        if dry_run:
+            return moves
+
+        directories = set()
+        for entity_id, source, target in planned:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+            directories.update((source.parent, target.parent))
+            self.paths.set(entity_id, target)
+
+        # Пустые шарды больше не нужны
+        for directory in directories:
+            if directory.exists() and directory.name.isdigit() and not any(directory.iterdir()):
+                directory.rmdir()
+
+        save_config(self.root_path, self.config)
+        self.paths.save()
+        return moves
+
+    def path_for(self, entity_id: str) -> Optional[Path]:
+        """Путь к файлу сущности по индексу (без обхода каталогов)."""
+        return self.paths.get(entity_id)
+
+    def dirty_entities(self) -> List[BaseEntity]:
+        """Сущности с несохранёнными изменениями."""
+        return [entity for entity in self.index.by_id.values() if entity.is_dirty]
+
+    def save_all(self, dirty_only: bool = True, workers: int = 4) -> List[Path]:
+        """
+        Сохранить сущности онтологии одним атомарным пакетом.
+        
+        Сущности отрисовываются на текущем потоке, а запись и fsync файлов
+        идут в фоновом пуле (`BulkWriter`); переименование — после записи всех.
+        
+        Args:
+            dirty_only: Сохранять только изменённые сущности
+            workers: Количество потоков записи
+            
+        Returns:
+            Пути сохранённых сущностей (файлы с неизменившимися байтами
+            не перезаписываются)
+            
+        Raises:
+            BulkWriteError: Часть файлов не записалась (остальные сохранены)
+        """
+        entities = self.dirty_entities() if dirty_only else list(self.index.by_id.values())
+        if not entities:
+            return []
+        try:
+            with BulkWriter(workers=workers) as batch:
+                saved = [self.save_entity(entity, batch=batch) for entity in entities]
+        finally:
+            # Пути успешно записанных файлов фиксируются и при частичной ошибке
+            self.paths.save()
+        return saved
+
     def _build_graph(self) -> None:
         """Построить граф связей между объектами."""
         self.graph.clear()
@@ -288,6 +571,27 @@ class Ontology:
                         description=relation.description,
                     )
 
+    def _on_relations_changed(self, change: RelationChange) -> None:
+        """Обновить рёбра графа по событию изменения связей (без перестройки графа)."""
+        source = change.entity_id
+        entity = self.index.get(source)
+        if entity is None or source not in self.graph:
+            return  # Граф ещё не построен или объект в него не входит
+        for target in {relation.target for relation in (*change.added, *change.removed)}:
+            if target not in self.graph:
+                continue  # Связь с отсутствующим объектом в граф не входит
+            relations = entity.relations_to(target)
+            if relations:
+                # Как в _build_graph: при нескольких типах ребро несёт последний
+                self.graph.add_edge(
+                    source,
+                    target,
+                    type=relations[-1].type.value,
+                    description=relations[-1].description,
+                )
+            elif self.graph.has_edge(source, target):
+                self.graph.remove_edge(source, target)
+
     def validate_relations(self) -> List[Tuple[str, str, str]]:
         """
         Валидация связей (поиск broken links).
@@ -324,18 +628,19 @@ class Ontology:
         if not errors:
             return 0
 
-        fixed = 0
+        broken: Dict[str, List[str]] = defaultdict(list)
         for source_id, target_id, _ in errors:
-            entity = self.index.get(source_id)
-            if entity:
-                if not dry_run:
-                    entity.remove_relation(target_id)
-                fixed += 1
+            if source_id in self.index.by_id:
+                broken[source_id].append(target_id)
 
         if not dry_run:
-            self._build_graph()
+            # Одна пачка на объект; граф обновляется по событиям
+            for source_id, targets in broken.items():
+                self.index.by_id[source_id].remove_relations(
+                    (target_id, None) for target_id in targets
+                )
 
-        return fixed
+        return sum(len(targets) for targets in broken.values())
 
     def get_related(self, entity_id: str, depth: int = 1) -> Set[str]:
         """
@@ -426,23 +731,107 @@ class Ontology:
         """
         return self.index.get_next_id(prefix)
 
-    def suggest_relations(self, entity_id: str, max_suggestions: int = 5) -> List[str]:
+    @property
+    def similarity(self) -> TfidfIndex:
+        """
+        TF-IDF индекс текстовой близости.
+
+        Строится при первом обращении. Дальше проверяются только
+        несохранённые сущности: добавление, удаление и сохранение объекта
+        обновляют индекс сразу, так что у чистых сущностей вектор актуален.
+        """
+        if self._similarity is None:
+            self._similarity = TfidfIndex()
+            self._similarity.build(self.index.by_id.values())
+        else:
+            for entity in self.dirty_entities():
+                self._similarity.update(entity)
+        return self._similarity
+
+    def use_embeddings(self, embed: EmbedFunction, model_name: str) -> EmbeddingIndex:
+        """
+        Подключить семантический индекс эмбеддингов.
+        
+        После подключения `suggest_relations` ищет соседей по эмбеддингам
+        вместо TF-IDF. Векторы кэшируются в `.cache/embeddings/`.
+        
+        Args:
+            embed: Функция модели (локальная модель или `AIClient.embed`)
+            model_name: Имя модели (ключ кэша)
+            
+        Returns:
+            Индекс эмбеддингов
+        """
+        self.embeddings = EmbeddingIndex(self.cache_dir, embed, model_name)
+        return self.embeddings
+
+    def _related_pairs(self) -> Dict[str, Set[str]]:
+        """Уже связанные пары (в обе стороны) для исключения из предложений."""
+        related: Dict[str, Set[str]] = defaultdict(set)
+        for entity_id, entity in self.index.by_id.items():
+            for relation in entity.relations:
+                related[entity_id].add(relation.target)
+                related[relation.target].add(entity_id)
+        return related
+
+    def suggest_relations(
+        self, entity_id: str, max_suggestions: int = 5, min_score: float = 0.05
+    ) -> List[str]:
         """
         Предложить возможные связи для объекта на основе текстовой близости.
         
+        Используется индекс эмбеддингов, если он подключён, иначе TF-IDF.
+        
         Args:
             entity_id: ID объекта
             max_suggestions: Максимум предложений
+            min_score: Минимальная косинусная близость
             
         Returns:
-            Список ID потенциально связанных объектов
+            Список ID потенциально связанных объектов (по убыванию близости)
         """
-        # TODO: Реализовать анализ текстовой близости
-        # Простая версия: предлагаем объекты из того же "кластера" в графе
-        related = self.get_related(entity_id, depth=2)
-        return list(related)[:max_suggestions]
-
-
+        entity = self.index.get(entity_id)
+        if entity is None:
+            return []
+
+        exclude = self._related_pairs().get(entity_id, set())
+        if self.embeddings is not None:
+            self.embeddings.sync(self.index.by_id.values())
+            suggestions = self.embeddings.top_k(
+                entity_id, k=max_suggestions, exclude=exclude, min_score=min_score
+            )
+        else:
+            suggestions = self.similarity.top_k(
+                entity_id, k=max_suggestions, exclude=exclude, min_score=min_score
+            )
+        return [target for target, _ in suggestions]
 
+    def suggest_all_relations(
+        self, max_suggestions: int = 5, min_score: float = 0.05
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Предложить связи сразу для всех объектов (один проход по индексу близости).
+        
+        Используется индекс эмбеддингов, если он подключён, иначе TF-IDF.
+        
+        Args:
+            max_suggestions: Максимум предложений на объект
+            min_score: Минимальная косинусная близость
+            
+        Returns:
+            {entity_id: [(target_id, score), ...]} без уже связанных пар
+        """
+        exclude = self._related_pairs()
+        if self.embeddings is not None:
+            self.embeddings.sync(self.index.by_id.values())
+            return self.embeddings.top_k_all(
+                k=max_suggestions, exclude=exclude, min_score=min_score
+            )
+        return self.similarity.top_k_all(k=max_suggestions, exclude=exclude, min_score=min_score)
 
 
+def _id_sort_key(entity_id: str) -> Tuple[str, int]:
+    try:
+        return ConceptSchema.parse_id(entity_id)
+    except ValueError:
+        return entity_id, 0
@@ -10,11 +10,27 @@ Pydantic-схемы для валидации объектов онтологи
 - Relation (связь)
 """
 
+import hashlib
+import json
+import weakref
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any
-
-from pydantic import BaseModel, Field, field_validator
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 
 class ConceptStatus(str, Enum):
@@ -65,6 +81,168 @@ class Relation(BaseModel):
         return f"{self.type.value} → {self.target}"
 
 
+class RelationChange:
+    """Событие изменения связей сущности (для графа и индекса обратных ссылок)."""
+
+    __slots__ = ("entity_id", "added", "removed")
+
+    def __init__(
+        self, entity_id: str, added: Sequence[Relation] = (), removed: Sequence[Relation] = ()
+    ):
+        self.entity_id = entity_id
+        self.added: Tuple[Relation, ...] = tuple(added)
+        self.removed: Tuple[Relation, ...] = tuple(removed)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def __repr__(self) -> str:
+        return f"RelationChange({self.entity_id!r}, +{len(self.added)}, -{len(self.removed)})"
+
+
+RelationListener = Callable[[RelationChange], None]
+
+
+def _relation_key(relation: Relation) -> Tuple[str, str, Optional[str]]:
+    return relation.type.value, relation.target, relation.description
+
+
+def _relation_diff(
+    entity_id: str, old: Sequence[Relation], new: Sequence[Relation]
+) -> RelationChange:
+    """Разница двух списков связей по ключу (тип, цель, описание)."""
+    old_keys = {_relation_key(relation) for relation in old}
+    new_keys = {_relation_key(relation) for relation in new}
+    return RelationChange(
+        entity_id,
+        added=[r for r in new if _relation_key(r) not in old_keys],
+        removed=[r for r in old if _relation_key(r) not in new_keys],
+    )
+
+
+class OwnedList(list):
+    """
+    Список-поле, принадлежащий сущности.
+    
+    Любая правка на месте (append, `examples[0] = ...`, del, sort, ...)
+    помечает владельца изменённым и сбрасывает его отпечаток — так
+    `save_all(dirty_only=True)` не теряет правки списков. Копии и pickle —
+    обычные списки: владелец заново оборачивает их в свои списки.
+    """
+
+    __slots__ = ("_owner", "_field")
+
+    def __init__(self, owner: "BaseEntity", field: str, items: Iterable[Any] = ()):
+        super().__init__(items)
+        self._owner = weakref.ref(owner)
+        self._field = field
+
+    def owned_by(self, entity: "BaseEntity") -> bool:
+        return self._owner() is entity
+
+    def _snapshot(self) -> Optional[List[Any]]:
+        """Состояние до правки (нужно только спискам, которые рассылают разницу)."""
+        return None
+
+    def _edited(self, old: Optional[List[Any]]) -> None:
+        owner = self._owner()
+        if owner is not None and owner.__dict__.get(self._field) is self:
+            owner._list_edited(self._field, old)
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        return list, (list(self),)
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        from copy import deepcopy
+
+        return [deepcopy(item, memo) for item in self]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        old = self._snapshot()
+        super().__setitem__(index, value)
+        self._edited(old)
+
+    def __delitem__(self, index: Any) -> None:
+        old = self._snapshot()
+        super().__delitem__(index)
+        self._edited(old)
+
+    def __iadd__(self, items: Iterable[Any]) -> "OwnedList":  # type: ignore[override]
+        self.extend(items)
+        return self
+
+    def __imul__(self, count: int) -> "OwnedList":  # type: ignore[override]
+        old = self._snapshot()
+        super().__imul__(count)
+        self._edited(old)
+        return self
+
+    def append(self, item: Any) -> None:
+        old = self._snapshot()
+        super().append(item)
+        self._edited(old)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        old = self._snapshot()
+        super().extend(items)
+        self._edited(old)
+
+    def insert(self, index: int, item: Any) -> None:  # type: ignore[override]
+        old = self._snapshot()
+        super().insert(index, item)
+        self._edited(old)
+
+    def pop(self, index: int = -1) -> Any:  # type: ignore[override]
+        old = self._snapshot()
+        item = super().pop(index)
+        self._edited(old)
+        return item
+
+    def remove(self, item: Any) -> None:
+        old = self._snapshot()
+        super().remove(item)
+        self._edited(old)
+
+    def clear(self) -> None:
+        old = self._snapshot()
+        super().clear()
+        self._edited(old)
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        old = self._snapshot()
+        super().sort(*args, **kwargs)
+        self._edited(old)
+
+    def reverse(self) -> None:
+        old = self._snapshot()
+        super().reverse()
+        self._edited(old)
+
+
+class RelationList(OwnedList):
+    """
+    Список связей, принадлежащий сущности.
+    
+    Кроме пометки владельца (см. `OwnedList`) правка на месте сбрасывает
+    индекс связей и рассылает подписчикам `RelationChange` с разницей —
+    так граф и обратные ссылки не расходятся со списком.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, owner: "BaseEntity", relations: Iterable[Relation] = ()):
+        super().__init__(owner, "relations", relations)
+
+    def _snapshot(self) -> List[Relation]:
+        return list(self)
+
+
+TEntity = TypeVar("TEntity", bound="BaseEntity")
+
+
 class BaseEntity(BaseModel):
     """Базовая сущность онтологии."""
 
@@ -82,6 +260,152 @@ class BaseEntity(BaseModel):
     updated: datetime = Field(default_factory=datetime.now, description="Дата обновления")
     notes: Optional[str] = Field(None, description="Дополнительные заметки")
 
+    # Флаг «есть несохранённые изменения». Новые сущности грязные,
+    # загруженные с диска и только что сохранённые — чистые.
+    _dirty: bool = PrivateAttr(default=True)
+    # Отпечаток содержимого (вычисляется лениво, сбрасывается при изменении полей)
+    _fingerprint: Optional[str] = PrivateAttr(default=None)
+
+    # Связи по ключу: цель → {тип → связь}, в порядке списка `relations`.
+    # Строится лениво; сбрасывается при любом изменении списка (см. RelationList)
+    _relation_keys: Optional[Dict[str, Dict[RelationType, Relation]]] = PrivateAttr(default=None)
+    # Подписчики на изменения связей (граф и обратные ссылки онтологии)
+    _relation_listeners: List[RelationListener] = PrivateAttr(default_factory=list)
+
+    # Поля, не входящие в отпечаток: отметки времени меняются при любом касании
+    # (а при загрузке без даты подставляется текущее время)
+    FINGERPRINT_EXCLUDE: ClassVar[FrozenSet[str]] = frozenset({"created", "updated"})
+
+    def model_post_init(self, context: Any) -> None:
+        self._own_lists()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "relations":
+            self._assign_relations(value)
+            return
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            if isinstance(self.__dict__.get(name), list):
+                self.__dict__[name] = OwnedList(self, name, self.__dict__[name])
+            self._dirty = True
+            self._fingerprint = None
+
+    # Служебные кэши и подписчики не участвуют в сравнении сущностей
+    _CACHE_ATTRS: ClassVar[FrozenSet[str]] = frozenset(
+        {
+            "_fingerprint",
+            "_relation_keys",
+            "_relation_listeners",
+        }
+    )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, BaseEntity):
+            return super().__eq__(other)
+
+        def state(entity: BaseEntity) -> Dict[str, Any]:
+            private = entity.__pydantic_private__ or {}
+            return {k: v for k, v in private.items() if k not in self._CACHE_ATTRS}
+
+        return (
+            type(self) is type(other)
+            and self.__dict__ == other.__dict__
+            and state(self) == state(other)
+        )
+
+    def __copy__(self: TEntity) -> TEntity:
+        # Копия (model_copy, trusted_copy) не наследует подписчиков и индекс связей
+        copy = super().__copy__()
+        copy._relation_listeners = []
+        copy._relation_keys = None
+        copy._own_lists()
+        return copy
+
+    def __deepcopy__(self: TEntity, memo: Optional[Dict[int, Any]] = None) -> TEntity:
+        memo = {} if memo is None else memo
+        memo[id(self._relation_listeners)] = []
+        copy = super().__deepcopy__(memo)
+        copy._relation_keys = None
+        copy._own_lists()
+        return copy
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        # Подписчики — методы онтологии, в pickle (пул процессов) не передаются
+        state = super().__getstate__()
+        private = state.get("__pydantic_private__")
+        if private:
+            state["__pydantic_private__"] = {
+                **private,
+                "_relation_listeners": [],
+                "_relation_keys": None,
+            }
+        return state
+
+    def __setstate__(self, state: Dict[Any, Any]) -> None:
+        super().__setstate__(state)
+        self._own_lists()
+
+    @property
+    def is_dirty(self) -> bool:
+        """Есть ли изменения, не записанные на диск."""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """Пометить сущность как изменённую (например, после правки вложенной модели)."""
+        self._dirty = True
+        self._fingerprint = None
+
+    def mark_clean(self) -> None:
+        """Пометить сущность как совпадающую с файлом на диске."""
+        self._dirty = False
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Отпечаток смыслового содержимого (blake2b, 32 hex-символа).
+        
+        Считается по каноническому JSON всех полей, кроме `created`/`updated`;
+        связи упорядочиваются, так что перестановка связей — не изменение.
+        Кэшируется в сущности и сбрасывается при присваивании любого поля,
+        правке списка-поля на месте (`OwnedList`) или `mark_dirty()`.
+        """
+        if self._fingerprint is None:
+            data = self.model_dump(mode="json", exclude=set(self.FINGERPRINT_EXCLUDE))
+            if "relations" in data:
+                data["relations"] = sorted(
+                    data["relations"],
+                    key=lambda rel: (rel["type"], rel["target"], rel.get("description") or ""),
+                )
+            canonical = json.dumps(
+                [type(self).__name__, data],
+                ensure_ascii=False,
+                sort_keys=True,
+                separators=(",", ":"),
+            )
+            self._fingerprint = hashlib.blake2b(
+                canonical.encode("utf-8"), digest_size=16
+            ).hexdigest()
+        return self._fingerprint
+
+    def trusted_copy(self: TEntity) -> TEntity:
+        """
+        Независимая копия уже валидной сущности (без валидации и deepcopy).
+        
+        Для попаданий в собственные кэши (кэш разбора blob'ов Git): данные
+        уже прошли валидацию при разборе. Копируются списки и вложенные модели;
+        строки, даты и перечисления неизменяемы и переиспользуются. Копия чистая.
+        """
+        copy = self.model_copy()
+        values = copy.__dict__
+        for key, value in list(values.items()):
+            if isinstance(value, list):
+                values[key] = [
+                    item.model_copy() if isinstance(item, BaseModel) else item for item in value
+                ]
+        copy._own_lists()
+        copy.mark_clean()
+        return copy
+
     @field_validator("name")
     @classmethod
     def validate_name(cls, v: str) -> str:
@@ -99,34 +423,174 @@ class BaseEntity(BaseModel):
             raise ValueError("Поле не может быть пустым")
         return v.strip()
 
+    def subscribe_relations(self, listener: RelationListener) -> None:
+        """Подписаться на изменения связей (`RelationChange` после каждой операции)."""
+        if listener not in self._relation_listeners:
+            self._relation_listeners.append(listener)
+
+    def unsubscribe_relations(self, listener: RelationListener) -> None:
+        """Отписаться от изменений связей."""
+        if listener in self._relation_listeners:
+            self._relation_listeners.remove(listener)
+
+    def _own_lists(self) -> None:
+        """Обернуть списки-поля в собственные `OwnedList` (после валидации и копий)."""
+        values = self.__dict__
+        for name in type(self).model_fields:
+            items = values.get(name)
+            if not isinstance(items, list):
+                continue
+            if isinstance(items, OwnedList) and items.owned_by(self):
+                continue
+            if name == "relations":
+                values[name] = RelationList(self, items)
+                self._relation_keys = None
+            else:
+                values[name] = OwnedList(self, name, items)
+
+    def _list_edited(self, field: str, old: Optional[List[Any]]) -> None:
+        """Список-поле изменён на месте."""
+        if field == "relations":
+            self._relations_edited(old or [])
+        else:
+            self.mark_dirty()
+
+    def _relation_map(self) -> Dict[str, Dict[RelationType, Relation]]:
+        """Индекс связей по ключу (строится лениво)."""
+        if self._relation_keys is None:
+            keys: Dict[str, Dict[RelationType, Relation]] = {}
+            for relation in self.relations:
+                keys.setdefault(relation.target, {}).setdefault(relation.type, relation)
+            self._relation_keys = keys
+        return self._relation_keys
+
+    def _notify(self, change: RelationChange) -> RelationChange:
+        if change:
+            for listener in list(self._relation_listeners):
+                listener(change)
+        return change
+
+    def _relations_edited(self, old: List[Relation]) -> RelationChange:
+        """Список связей изменён на месте: сбросить индекс и разослать разницу."""
+        self._dirty = True
+        self._fingerprint = None
+        self._relation_keys = None
+        return self._notify(_relation_diff(self.id, old, self.relations))
+
+    def _assign_relations(self, relations: Iterable[Relation]) -> RelationChange:
+        """Присваивание `relations`: новый список и событие с разницей."""
+        old = self.__dict__.get("relations") or []
+        super().__setattr__("relations", RelationList(self, relations))
+        self._dirty = True
+        self._fingerprint = None
+        self._relation_keys = None
+        return self._notify(_relation_diff(self.id, old, self.relations))
+
+    def has_relation(self, target: str, relation_type: Optional[RelationType] = None) -> bool:
+        """Есть ли связь с объектом (любого типа, если тип не указан)."""
+        by_type = self._relation_map().get(target)
+        if not by_type:
+            return False
+        return relation_type is None or relation_type in by_type
+
+    def relations_to(self, target: str) -> List[Relation]:
+        """Связи с объектом в порядке списка `relations`."""
+        return list(self._relation_map().get(target, {}).values())
+
+    def add_relations(self, relations: Iterable[Relation]) -> List[Relation]:
+        """
+        Добавить связи пачкой (дубликаты по ключу (тип, цель) пропускаются).
+        
+        Args:
+            relations: Новые связи
+            
+        Returns:
+            Фактически добавленные связи
+        """
+        keys = self._relation_map()
+        added: List[Relation] = []
+        for relation in relations:
+            by_type = keys.setdefault(relation.target, {})
+            if relation.type in by_type:
+                continue  # Связь уже существует
+            by_type[relation.type] = relation
+            added.append(relation)
+        if not added:
+            return added
+
+        # В обход RelationList: индекс уже обновлён, событие — ниже
+        list.extend(self.relations, added)
+        self.updated = datetime.now()
+        self._notify(RelationChange(self.id, added=added))
+        return added
+
+    def remove_relations(
+        self, keys: Iterable[Tuple[str, Optional[RelationType]]]
+    ) -> List[Relation]:
+        """
+        Удалить связи пачкой за один проход по списку.
+        
+        Args:
+            keys: Пары (цель, тип); тип None — все связи с целью
+            
+        Returns:
+            Удалённые связи
+        """
+        relation_map = self._relation_map()
+        removed: List[Relation] = []
+        for target, relation_type in keys:
+            by_type = relation_map.get(target)
+            if not by_type:
+                continue
+            if relation_type is None:
+                removed.extend(by_type.values())
+                by_type.clear()
+            elif relation_type in by_type:
+                removed.append(by_type.pop(relation_type))
+            if not by_type:
+                del relation_map[target]
+        if not removed:
+            return removed
+
+        gone = {(relation.type, relation.target) for relation in removed}
+        # В обход RelationList: индекс уже обновлён, событие — ниже
+        list.__setitem__(
+            self.relations,
+            slice(None),
+            [r for r in self.relations if (r.type, r.target) not in gone],
+        )
+        self.updated = datetime.now()
+        self._notify(RelationChange(self.id, removed=removed))
+        return removed
+
+    def replace_relations(self, relations: Iterable[Relation]) -> RelationChange:
+        """
+        Заменить все связи (дубликаты по ключу отбрасываются, первая побеждает).
+        
+        Returns:
+            Изменение: добавленные и удалённые связи
+        """
+        unique: Dict[Tuple[RelationType, str], Relation] = {}
+        for relation in relations:
+            unique.setdefault((relation.type, relation.target), relation)
+        change = self._assign_relations(list(unique.values()))
+        if change:
+            self.updated = datetime.now()
+        return change
+
     def add_relation(
         self, target: str, relation_type: RelationType, description: Optional[str] = None
-    ) -> None:
-        """Добавить связь с другим объектом."""
-        # Проверка на дубликаты
-        for rel in self.relations:
-            if rel.target == target and rel.type == relation_type:
-                return  # Связь уже существует
-
-        self.relations.append(
-            Relation(type=relation_type, target=target, description=description)
+    ) -> bool:
+        """Добавить связь с другим объектом. Возвращает True если добавлено."""
+        return bool(
+            self.add_relations(
+                [Relation(type=relation_type, target=target, description=description)]
+            )
         )
-        self.updated = datetime.now()
 
     def remove_relation(self, target: str, relation_type: Optional[RelationType] = None) -> bool:
         """Удалить связь с объектом. Возвращает True если удалено."""
-        initial_len = len(self.relations)
-        if relation_type:
-            self.relations = [
-                r for r in self.relations if not (r.target == target and r.type == relation_type)
-            ]
-        else:
-            self.relations = [r for r in self.relations if r.target != target]
-
-        if len(self.relations) < initial_len:
-            self.updated = datetime.now()
-            return True
-        return False
+        return bool(self.remove_relations([(target, relation_type)]))
 
 
 class Concept(BaseEntity):
@@ -213,6 +677,11 @@ class Artifact(BaseEntity):
         return "A"
 
 
+# Словарь `ot:` экспорта RDF по умолчанию. URN не зависит от домена и хостинга
+# проекта; опубликованный словарь задаётся в ontology.yaml (`rdf_vocabulary`)
+DEFAULT_RDF_VOCABULARY = "urn:ontology-toolkit:vocab#"
+
+
 class OntologyConfig(BaseModel):
     """Конфигурация онтологического проекта."""
 
@@ -233,6 +702,27 @@ class OntologyConfig(BaseModel):
         }
     )
 
+    # Раскладка файлов: flat — все файлы типа в одном каталоге,
+    # sharded — подкаталоги по номеру ID (concepts/00/C_100_*.md)
+    layout: Literal["flat", "sharded"] = Field(default="flat", description="Раскладка файлов")
+    shard_size: int = Field(default=1000, ge=1, description="Сущностей на подкаталог (sharded)")
+
+    # Версия схемы файлов сущностей (см. core/migrations.py, `ontology migrate`);
+    # 0 — проект создан до появления миграций
+    schema_version: int = Field(default=0, ge=0, description="Версия схемы файлов")
+
+    # Попадания в собственные кэши (кэш разбора blob'ов Git): trusted —
+    # копия без повторной валидации pydantic, strict — полная валидация.
+    # Файлы Markdown валидируются всегда; полная проверка — `ontology validate`.
+    validation: Literal["trusted", "strict"] = Field(
+        default="trusted", description="Режим валидации кэшированных данных"
+    )
+
+    # IRI словаря `ot:` (классы, типы и связи) в экспорте Turtle/JSON-LD
+    rdf_vocabulary: str = Field(
+        default=DEFAULT_RDF_VOCABULARY, description="IRI словаря ot: в экспорте RDF"
+    )
+
     # Настройки AI
     ai_provider: str = Field(default="anthropic", description="Провайдер AI")
     ai_model: str = Field(default="claude-sonnet-4", description="Модель AI")
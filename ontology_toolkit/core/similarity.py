@@ -0,0 +1,302 @@
+"""
+Текстовая близость сущностей онтологии (TF-IDF + косинусная мера).
+
+Содержит:
+- токенизацию текстовых полей сущности (name, definition, purpose, examples);
+- инкрементальный индекс `TfidfIndex` с разреженными TF-IDF векторами
+  ({терм: вес} на сущность) и инвертированным индексом терм → сущности,
+  пересчитывающий только изменившиеся векторы;
+- поиск top-k соседей для всех сущностей сразу.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ontology_toolkit.core.schema import BaseEntity
+
+__all__ = ["TfidfIndex", "entity_text", "tokenize"]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Грубый стемминг: для русского языка обрезка до первых символов
+# склеивает словоформы («агентность», «агентности») без морфологии.
+_STEM_LENGTH = 6
+_MIN_TOKEN_LENGTH = 3
+
+# IDF фиксируется при построении. Если корпус вырос больше чем на эту долю,
+# веса устаревают и все векторы пересчитываются.
+_IDF_DRIFT_LIMIT = 0.2
+
+SparseVector = Dict[str, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на нормализованные токены (lowercase, ё→е, стемминг)."""
+    tokens: List[str] = []
+    for raw in _TOKEN_RE.findall(text.lower().replace("ё", "е")):
+        if len(raw) < _MIN_TOKEN_LENGTH or raw.isdigit():
+            continue
+        tokens.append(raw[:_STEM_LENGTH])
+    return tokens
+
+
+def entity_text(entity: BaseEntity) -> str:
+    """Собирает текст сущности для векторизации."""
+    parts = [entity.name, entity.definition, entity.purpose, *entity.examples]
+    return "\n".join(part for part in parts if part and part != "[пусто]")
+
+
+def _text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TfidfIndex:
+    """
+    Инкрементальный TF-IDF индекс по сущностям.
+
+    Вектор сущности — словарь {терм: вес}, нормированный по L2, поэтому
+    косинусная близость — сумма произведений весов общих термов. Рядом
+    хранится инвертированный индекс терм → {сущность: вес}: соседи ищутся
+    только среди сущностей с общими термами, а память растёт с числом
+    ненулевых весов, а не как «сущности × словарь». При изменении текста
+    сущности пересчитывается только её вектор; все векторы пересчитываются
+    лишь при заметном дрейфе IDF.
+    """
+
+    def __init__(self, text_getter: Callable[[BaseEntity], str] = entity_text):
+        """
+        Инициализация индекса.
+
+        Args:
+            text_getter: Функция, возвращающая текст сущности для векторизации
+        """
+        self._text_getter = text_getter
+        self._idf_weights: Dict[str, float] = {}
+        self._tokens: Dict[str, Counter[str]] = {}
+        self._digests: Dict[str, str] = {}
+        self._vectors: Dict[str, SparseVector] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # Порядок добавления: при равной близости выше та сущность, что добавлена раньше
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._idf_docs = 0
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._vectors
+
+    # ------------------------------------------------------------------
+    # Построение и обновление
+    # ------------------------------------------------------------------
+
+    def build(self, entities: Iterable[BaseEntity]) -> None:
+        """Полностью построить индекс по набору сущностей."""
+        self._tokens.clear()
+        self._digests.clear()
+        for entity in entities:
+            text = self._text_getter(entity)
+            self._tokens[entity.id] = Counter(tokenize(text))
+            self._digests[entity.id] = _text_digest(text)
+        self.build_from_tokens()
+
+    def update(self, entity: BaseEntity) -> bool:
+        """
+        Добавить или обновить сущность в индексе.
+
+        Returns:
+            True, если вектор сущности был пересчитан
+        """
+        text = self._text_getter(entity)
+        digest = _text_digest(text)
+        if self._digests.get(entity.id) == digest:
+            return False
+
+        counts = Counter(tokenize(text))
+        self._tokens[entity.id] = counts
+        self._digests[entity.id] = digest
+
+        if self._idf_is_stale():
+            self.build_from_tokens()
+            return True
+
+        for term in counts:
+            # Новый терм до перестройки считаем встреченным в одном документе.
+            self._idf_weights.setdefault(term, self._smoothed_idf(1))
+        self._store(entity.id, self._vectorize(counts))
+        return True
+
+    def remove(self, entity_id: str) -> bool:
+        """Удалить сущность из индекса. Возвращает True если удалено."""
+        vector = self._vectors.pop(entity_id, None)
+        if vector is None:
+            return False
+        self._drop_postings(entity_id, vector)
+        self._tokens.pop(entity_id, None)
+        self._digests.pop(entity_id, None)
+        self._order.pop(entity_id, None)
+        return True
+
+    def refresh(self, entities: Iterable[BaseEntity]) -> int:
+        """
+        Синхронизировать индекс с актуальным набором сущностей.
+
+        Пересчитываются только сущности, текст которых изменился.
+
+        Returns:
+            Количество пересчитанных векторов
+        """
+        seen: Set[str] = set()
+        changed = 0
+        for entity in entities:
+            seen.add(entity.id)
+            if self.update(entity):
+                changed += 1
+        for entity_id in [eid for eid in self._vectors if eid not in seen]:
+            self.remove(entity_id)
+            changed += 1
+        return changed
+
+    def build_from_tokens(self) -> None:
+        """Пересчитать все векторы из уже токенизированных текстов (пересчёт IDF)."""
+        document_frequency = Counter(t for counts in self._tokens.values() for t in counts)
+        self._idf_docs = len(self._tokens)
+        self._idf_weights = {
+            term: self._smoothed_idf(df) for term, df in document_frequency.items()
+        }
+        self._vectors.clear()
+        self._postings.clear()
+        self._order.clear()
+        self._next_order = 0
+        for entity_id, counts in self._tokens.items():
+            self._store(entity_id, self._vectorize(counts))
+
+    # ------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------
+
+    def vector(self, entity_id: str) -> Optional[SparseVector]:
+        """Нормированный TF-IDF вектор сущности {терм: вес} (или None)."""
+        return self._vectors.get(entity_id)
+
+    def similarity(self, first_id: str, second_id: str) -> float:
+        """Косинусная близость двух сущностей."""
+        first = self.vector(first_id)
+        second = self.vector(second_id)
+        if first is None or second is None:
+            return 0.0
+        if len(first) > len(second):
+            first, second = second, first
+        return sum(weight * second.get(term, 0.0) for term, weight in first.items())
+
+    def top_k(
+        self,
+        entity_id: str,
+        k: int = 5,
+        exclude: Optional[Set[str]] = None,
+        min_score: float = 0.0,
+    ) -> List[Tuple[str, float]]:
+        """Top-k ближайших соседей одной сущности."""
+        vector = self.vector(entity_id)
+        if vector is None:
+            return []
+        excluded = {entity_id} | (exclude or set())
+        return self._select(self._scores(vector), excluded, k, min_score)
+
+    def top_k_all(
+        self,
+        k: int = 5,
+        exclude: Optional[Dict[str, Set[str]]] = None,
+        min_score: float = 0.0,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Top-k соседей для всех сущностей.
+
+        Близости каждой сущности набираются по инвертированному индексу,
+        то есть только для сущностей с общими термами (без матрицы n×n).
+
+        Args:
+            k: Количество соседей на сущность
+            exclude: {entity_id: множество ID, которые нужно исключить}
+            min_score: Минимальная косинусная близость
+
+        Returns:
+            {entity_id: [(neighbour_id, score), ...]}
+        """
+        exclude = exclude or {}
+        return {
+            entity_id: self._select(
+                self._scores(vector), {entity_id} | exclude.get(entity_id, set()), k, min_score
+            )
+            for entity_id, vector in self._vectors.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Внутреннее
+    # ------------------------------------------------------------------
+
+    def _scores(self, vector: SparseVector) -> Dict[str, float]:
+        scores: Dict[str, float] = defaultdict(float)
+        for term, weight in vector.items():
+            for entity_id, other in self._postings.get(term, {}).items():
+                scores[entity_id] += weight * other
+        return scores
+
+    def _select(
+        self, scores: Dict[str, float], excluded: Set[str], k: int, min_score: float
+    ) -> List[Tuple[str, float]]:
+        if k <= 0:
+            return []
+        candidates = (
+            (entity_id, score)
+            for entity_id, score in scores.items()
+            if score > min_score and entity_id not in excluded
+        )
+        return heapq.nlargest(k, candidates, key=lambda item: (item[1], -self._order[item[0]]))
+
+    def _store(self, entity_id: str, vector: SparseVector) -> None:
+        previous = self._vectors.get(entity_id)
+        if previous is not None:
+            self._drop_postings(entity_id, previous)
+        else:
+            self._order[entity_id] = self._next_order
+            self._next_order += 1
+        self._vectors[entity_id] = vector
+        for term, weight in vector.items():
+            self._postings[term][entity_id] = weight
+
+    def _drop_postings(self, entity_id: str, vector: SparseVector) -> None:
+        for term in vector:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(entity_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _smoothed_idf(self, document_frequency: int) -> float:
+        # Сглаженный IDF: log((1 + N) / (1 + df)) + 1
+        return math.log((1 + self._idf_docs) / (1 + document_frequency)) + 1.0
+
+    def _idf_is_stale(self) -> bool:
+        current = len(self._tokens)
+        if self._idf_docs == 0:
+            return current > 0
+        return abs(current - self._idf_docs) / self._idf_docs > _IDF_DRIFT_LIMIT
+
+    def _vectorize(self, counts: Counter[str]) -> SparseVector:
+        vector = {
+            term: (1.0 + math.log(count)) * self._idf_weights[term]
+            for term, count in counts.items()
+            if term in self._idf_weights
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm > 0:
+            vector = {term: weight / norm for term, weight in vector.items()}
+        return vector
@@ -0,0 +1,558 @@
+"""
+Надёжная запись файлов онтологии.
+
+Содержит:
+- `atomic_write_bytes` — запись во временный файл рядом с целевым и атомарная
+  замена через `os.replace`: прерванная запись никогда не оставляет
+  наполовину записанный файл сущности;
+- `AtomicWriteBatch` — пакетный режим для массовых сохранений: все файлы
+  сначала пишутся во временные, затем синхронизируются (fsync) одной группой,
+  переименовываются и фиксируются одним fsync на каталог;
+- `BulkWriter` — тот же пакет, но временные файлы пишутся и синхронизируются
+  пулом потоков с ограниченной очередью (рендеринг на основном потоке идёт
+  параллельно с дисковым вводом-выводом), ошибки собираются и сообщаются в конце;
+- `EntityPathIndex` — соответствие ID сущности → файл, сохраняемое в кэше:
+  операции над одной сущностью обращаются ровно к одному пути без обхода каталогов.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+__all__ = [
+    "AtomicWriteBatch",
+    "BulkWriteError",
+    "BulkWriter",
+    "EntityPathIndex",
+    "atomic_write_bytes",
+]
+
+# Временные файлы начинаются с точки и оканчиваются на .tmp,
+# поэтому не попадают в `glob("*.md")` при загрузке онтологии.
+_TEMP_SUFFIX = ".tmp"
+
+# Журнал индекса путей сливается в кэш, когда длиннее индекса (но не раньше)
+_LOG_COMPACT_MIN = 256
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp создаёт файлы с правами 0600; после замены файл должен
+# получить обычные права, как при open(path, "w").
+_DEFAULT_MODE = 0o666 & ~_current_umask()
+
+
+def _stage(path: Path, data: bytes) -> Path:
+    """Записать данные во временный файл в каталоге назначения."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=_TEMP_SUFFIX
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as handler:
+            handler.write(data)
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = _DEFAULT_MODE
+        os.chmod(temp_name, mode)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name)
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, "rb") as handler:
+        os.fsync(handler.fileno())
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Зафиксировать переименования в каталоге (на Windows не поддерживается)."""
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def atomic_write_bytes(path: Path, data: bytes, fsync: bool = True) -> None:
+    """
+    Атомарно записать файл: временный файл + `os.replace`.
+
+    Args:
+        path: Целевой файл
+        data: Содержимое
+        fsync: Синхронизировать данные и каталог с диском
+    """
+    temp_path = _stage(path, data)
+    try:
+        if fsync:
+            _fsync_file(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_directory(path.parent)
+
+
+class AtomicWriteBatch:
+    """
+    Пакет атомарных записей с групповым fsync.
+
+    Использование:
+
+        with AtomicWriteBatch() as batch:
+            for entity in entities:
+                batch.write(path_for(entity), render(entity))
+
+    При выходе без исключения пакет фиксируется (`commit`), при исключении
+    временные файлы удаляются (`abort`) и целевые файлы остаются прежними.
+    """
+
+    def __init__(self, fsync: bool = True):
+        """
+        Инициализация пакета.
+
+        Args:
+            fsync: Синхронизировать данные с диском при фиксации
+        """
+        self.fsync = fsync
+        self._staged: Dict[Path, Tuple[Path, Optional[Callable[[], None]]]] = {}
+        # Удаление и действие после фиксации могут зависеть от записи файла
+        # (`after`): если она не удалась, они не выполняются
+        self._removals: Dict[Path, Optional[Path]] = {}
+        self._after_commit: List[Tuple[Callable[[], None], Optional[Path]]] = []
+
+    def __enter__(self) -> "AtomicWriteBatch":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def __len__(self) -> int:
+        return len(self._staged) + len(self._removals)
+
+    def write(
+        self, path: Path, data: bytes, on_commit: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Подготовить запись файла (видна только после `commit`).
+
+        Args:
+            path: Целевой файл
+            data: Содержимое
+            on_commit: Вызывается после успешной фиксации этого файла
+        """
+        previous = self._staged.pop(path, None)
+        if previous is not None:
+            previous[0].unlink(missing_ok=True)
+        self._removals.pop(path, None)
+        self._staged[path] = (_stage(path, data), on_commit)
+
+    def remove(self, path: Path, after: Optional[Path] = None) -> None:
+        """
+        Удалить файл после фиксации записей (например, старое имя при переименовании).
+
+        Args:
+            path: Удаляемый файл
+            after: Удалять, только если запись этого файла удалась
+                (новое имя при переименовании)
+        """
+        if path not in self._staged:
+            self._removals[path] = after
+
+    def after_commit(self, callback: Callable[[], None], after: Optional[Path] = None) -> None:
+        """
+        Выполнить действие после успешной фиксации пакета.
+
+        Args:
+            callback: Действие
+            after: Выполнять, только если запись этого файла удалась
+        """
+        self._after_commit.append((callback, after))
+
+    def commit(self) -> List[Path]:
+        """
+        Зафиксировать пакет: fsync временных файлов, переименование, fsync каталогов.
+
+        Returns:
+            Записанные файлы
+        """
+        if self.fsync:
+            try:
+                for temp_path, _ in self._staged.values():
+                    _fsync_file(temp_path)
+            except BaseException:
+                self.abort()
+                raise
+        return self._publish()
+
+    def _publish(self, failed: Optional[Set[Path]] = None) -> List[Path]:
+        """
+        Переименовать подготовленные файлы, выполнить удаления и обратные вызовы.
+
+        Args:
+            failed: Файлы, запись которых не удалась: зависящие от них
+                удаления и действия (`after`) пропускаются
+        """
+        failed = failed or set()
+        staged = self._staged
+        removals = self._removals
+        after_commit = self._after_commit
+        self._staged = {}
+        self._removals = {}
+        self._after_commit = []
+        directories: Set[Path] = set()
+        written: List[Path] = []
+        callbacks: List[Callable[[], None]] = []
+        try:
+            for path in list(staged):
+                temp_path, on_commit = staged.pop(path)
+                os.replace(temp_path, path)
+                directories.add(path.parent)
+                written.append(path)
+                if on_commit is not None:
+                    callbacks.append(on_commit)
+        except BaseException:
+            for temp_path, _ in staged.values():
+                temp_path.unlink(missing_ok=True)
+            raise
+
+        # Удаления — только после замены, чтобы не потерять данные при сбое
+        for path, after in removals.items():
+            if after in failed:
+                continue  # Новый файл не записан — старый остаётся
+            try:
+                path.unlink()
+                directories.add(path.parent)
+            except FileNotFoundError:
+                pass
+
+        if self.fsync:
+            for directory in directories:
+                _fsync_directory(directory)
+        callbacks.extend(callback for callback, after in after_commit if after not in failed)
+        for callback in callbacks:
+            callback()
+        return written
+
+    def abort(self) -> None:
+        """Отменить пакет и удалить временные файлы."""
+        for temp_path, _ in self._staged.values():
+            temp_path.unlink(missing_ok=True)
+        self._staged = {}
+        self._removals = {}
+        self._after_commit = []
+
+
+class BulkWriteError(RuntimeError):
+    """Часть файлов пакета не удалось записать."""
+
+    def __init__(self, errors: List[Tuple[Path, BaseException]], written: List[Path]):
+        self.errors = errors
+        self.written = written
+        details = "; ".join(f"{path}: {exc}" for path, exc in errors[:5])
+        more = f" (и ещё {len(errors) - 5})" if len(errors) > 5 else ""
+        super().__init__(f"Не удалось записать файлов: {len(errors)}: {details}{more}")
+
+
+class BulkWriter(AtomicWriteBatch):
+    """
+    Пакет атомарных записей с фоновым пулом потоков.
+
+    `write` отдаёт готовые байты пулу и сразу возвращает управление: запись
+    временного файла и его fsync выполняются в фоне. Если в работе уже
+    `max_pending` файлов, `write` ждёт (обратное давление), поэтому память
+    не растёт при медленном диске. `commit` дожидается всех записей,
+    переименовывает успешно записанные файлы и, если были ошибки,
+    бросает `BulkWriteError` со списком всех неудачных путей. Удаления
+    и действия, привязанные к неудачной записи (`after`), не выполняются.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: Optional[int] = None, fsync: bool = True):
+        """
+        Инициализация пула записи.
+
+        Args:
+            workers: Количество потоков записи
+            max_pending: Максимум файлов в работе (по умолчанию workers × 4)
+            fsync: Синхронизировать данные с диском
+        """
+        super().__init__(fsync=fsync)
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 4
+        self.errors: List[Tuple[Path, BaseException]] = []
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[Path, Tuple[Future, Optional[Callable[[], None]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending) + super().__len__()
+
+    def write(
+        self, path: Path, data: bytes, on_commit: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Поставить запись файла в очередь (видна только после `commit`).
+
+        Args:
+            path: Целевой файл
+            data: Содержимое
+            on_commit: Вызывается после успешной фиксации этого файла
+        """
+        self._removals.pop(path, None)
+        previous = self._pending.pop(path, None)
+        if previous is not None:
+            self._discard(previous[0])
+
+        self._slots.acquire()
+        try:
+            future = self._pool().submit(self._stage_and_sync, path, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._pending[path] = (future, on_commit)
+
+    def remove(self, path: Path, after: Optional[Path] = None) -> None:
+        """Удалить файл после фиксации записей (см. `AtomicWriteBatch.remove`)."""
+        if path not in self._pending:
+            self._removals[path] = after
+
+    def commit(self) -> List[Path]:
+        """
+        Дождаться фоновых записей и зафиксировать пакет.
+
+        Returns:
+            Записанные файлы
+
+        Raises:
+            BulkWriteError: Если часть файлов не записалась (остальные зафиксированы)
+        """
+        pending = self._pending
+        self._pending = {}
+        try:
+            for path, (future, on_commit) in pending.items():
+                try:
+                    self._staged[path] = (future.result(), on_commit)
+                except Exception as exc:
+                    self.errors.append((path, exc))
+        finally:
+            self._shutdown()
+
+        written = self._publish({path for path, _ in self.errors})
+        if self.errors:
+            raise BulkWriteError(self.errors, written)
+        return written
+
+    def abort(self) -> None:
+        """Отменить пакет: дождаться фоновых записей и удалить временные файлы."""
+        pending = self._pending
+        self._pending = {}
+        for future, _ in pending.values():
+            self._discard(future)
+        self._shutdown()
+        super().abort()
+
+    def _stage_and_sync(self, path: Path, data: bytes) -> Path:
+        temp_path = _stage(path, data)
+        if self.fsync:
+            try:
+                _fsync_file(temp_path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+        return temp_path
+
+    @staticmethod
+    def _discard(future: Future) -> None:
+        if future.cancel():
+            return
+        try:
+            future.result().unlink(missing_ok=True)
+        except Exception:
+            pass  # Запись и так не удалась — удалять нечего
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="ontology-writer"
+            )
+        return self._executor
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class EntityPathIndex:
+    """
+    Соответствие ID сущности → путь к её файлу.
+
+    Строится при загрузке онтологии и сохраняется в кэше (JSON с путями
+    относительно корня онтологии). Кэш читается лениво, только если индекс
+    понадобился без полной загрузки.
+
+    Изменения по одной сущности (`record`) не переписывают весь кэш:
+    строка дописывается в журнал `paths.log` рядом с ним. Журнал применяется
+    поверх кэша при чтении и сливается в кэш при `save()` (или когда
+    становится длиннее индекса).
+    """
+
+    def __init__(self, root: Path, cache_file: Path):
+        """
+        Инициализация индекса.
+
+        Args:
+            root: Корень онтологии (пути в кэше хранятся относительно него)
+            cache_file: Файл кэша (например, `.cache/paths.json`)
+        """
+        self.root = Path(root)
+        self.cache_file = Path(cache_file)
+        self.log_file = self.cache_file.with_suffix(".log")
+        self._paths: Optional[Dict[str, Path]] = None
+        self._changed = False
+        self._log_lines = 0
+        # Содержимое кэша на диске до reset(): если перезагрузка дала то же
+        # самое и журнал пуст, save() ничего не пишет (команды только для чтения)
+        self._baseline: Optional[Dict[str, Path]] = None
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._mapping()
+
+    def __len__(self) -> int:
+        return len(self._mapping())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._mapping())
+
+    def get(self, entity_id: str) -> Optional[Path]:
+        """Путь к файлу сущности (или None)."""
+        return self._mapping().get(entity_id)
+
+    def set(self, entity_id: str, path: Path) -> None:
+        """Запомнить путь к файлу сущности."""
+        mapping = self._mapping()
+        if mapping.get(entity_id) != path:
+            mapping[entity_id] = path
+            self._changed = True
+
+    def pop(self, entity_id: str) -> Optional[Path]:
+        """Забыть сущность. Возвращает её прежний путь."""
+        path = self._mapping().pop(entity_id, None)
+        if path is not None:
+            self._changed = True
+        return path
+
+    def record(self, entity_id: str, path: Optional[Path]) -> None:
+        """
+        Запомнить путь (None — забыть сущность) и сразу сохранить изменение.
+
+        Стоимость не зависит от размера индекса: изменение дописывается
+        в журнал, а не переписывает весь кэш.
+        """
+        mapping = self._mapping()
+        if path is None:
+            if mapping.pop(entity_id, None) is None:
+                return
+        elif mapping.get(entity_id) == path:
+            return
+        else:
+            mapping[entity_id] = path
+        if self._changed or self._log_lines >= max(_LOG_COMPACT_MIN, len(mapping)):
+            # Кэш на диске отстаёт от памяти или журнал разросся — полная запись
+            self.save(force=True)
+            return
+        from ontology_toolkit.core.embeddings import ensure_cache_dir
+
+        ensure_cache_dir(self.log_file.parent)
+        relative = None if path is None else self._relative(path)
+        line = json.dumps([entity_id, relative], ensure_ascii=False)
+        with open(self.log_file, "a", encoding="utf-8") as handler:
+            handler.write(line + "\n")
+        self._log_lines += 1
+
+    def reset(self) -> None:
+        """Очистить индекс (перед полной перезагрузкой с диска)."""
+        self._baseline = None if self._changed else dict(self._mapping())
+        self._paths = {}
+        self._changed = True
+
+    def save(self, force: bool = False) -> bool:
+        """
+        Сохранить индекс в кэш, если он менялся.
+
+        Returns:
+            True, если файл кэша был записан
+        """
+        if self._paths is None or not (self._changed or force):
+            return False
+        baseline, self._baseline = self._baseline, None
+        if not force and self._paths == baseline and not self._log_lines:
+            self._changed = False
+            return False
+        from ontology_toolkit.core.embeddings import ensure_cache_dir
+
+        ensure_cache_dir(self.cache_file.parent)
+        payload = {entity_id: self._relative(path) for entity_id, path in self._paths.items()}
+        data = json.dumps(payload, ensure_ascii=False, indent=0, sort_keys=True)
+        # Журнал удаляется до записи кэша: после сбоя между ними кэш может
+        # отстать (как устаревший кэш), но старый журнал не применится к новому
+        self.log_file.unlink(missing_ok=True)
+        self._log_lines = 0
+        atomic_write_bytes(self.cache_file, data.encode("utf-8"), fsync=False)
+        self._changed = False
+        return True
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _mapping(self) -> Dict[str, Path]:
+        if self._paths is None:
+            self._paths = {}
+            try:
+                raw = json.loads(self.cache_file.read_text(encoding="utf-8"))
+                self._paths = {entity_id: self.root / rel for entity_id, rel in raw.items()}
+            except (OSError, ValueError, AttributeError):
+                pass  # Нет кэша или он повреждён — индекс заполнится при загрузке
+            self._replay_log()
+        return self._paths
+
+    def _replay_log(self) -> None:
+        """Применить журнал одиночных изменений поверх кэша."""
+        assert self._paths is not None
+        try:
+            lines = self.log_file.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                entity_id, rel = json.loads(line)
+            except (ValueError, TypeError):
+                continue  # Строка, оборванная сбоем
+            if rel is None:
+                self._paths.pop(entity_id, None)
+            else:
+                self._paths[entity_id] = self.root / rel
+        self._log_lines = len(lines)
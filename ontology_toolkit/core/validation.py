@@ -0,0 +1,406 @@
+"""
+Движок правил проверки онтологии (`ontology validate`).
+
+Правила двух видов:
+- `entity`   — смотрят на одну сущность (схема, заглушки `[пусто]`, meta_meta);
+  выполняются параллельно по файлам в пуле процессов вместе с разбором Markdown;
+- `ontology` — смотрят на онтологию целиком (цели связей, симметричные связи,
+  связи meta_meta); выполняются после разбора в основном процессе по индексу.
+
+Свои правила подключаются через `register_rule` (функция правила должна быть
+определена на уровне модуля — она передаётся в процессы пула по ссылке).
+Результат — `ValidationReport`, сериализуемый в JSON для CI.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.concept import parse_entity_strict
+from ontology_toolkit.core.schema import (
+    BaseEntity,
+    Concept,
+    ConceptStatus,
+    MetaMetaType,
+    RelationType,
+)
+
+__all__ = [
+    "Issue",
+    "Rule",
+    "RULES",
+    "ValidationReport",
+    "register_rule",
+    "validate_ontology",
+]
+
+Severity = Literal["error", "warning"]
+
+PLACEHOLDER = "[пусто]"
+
+# Ниже этого числа файлов пул процессов не запускается: его старт дороже проверки
+PARALLEL_THRESHOLD = 200
+
+
+class Issue(BaseModel):
+    """Найденная проблема."""
+
+    rule: str
+    severity: Severity
+    message: str
+    entity_id: Optional[str] = None
+    file: Optional[str] = None
+
+
+class ValidationReport(BaseModel):
+    """Результат проверки (машиночитаемый отчёт)."""
+
+    root: str
+    files_checked: int = 0
+    entities: int = 0
+    rules: List[str] = Field(default_factory=list)
+    issues: List[Issue] = Field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def errors(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def warnings(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == "warning"]
+
+    def passed(self, strict: bool = False) -> bool:
+        """Проверка пройдена (strict — предупреждения тоже считаются ошибками)."""
+        return not (self.issues if strict else self.errors)
+
+
+# Сигнатуры правил: entity-правило получает сущность, ontology-правило — словарь ID → сущность.
+# Правило возвращает (или выдаёт) пары (ID сущности, сообщение).
+EntityCheck = Callable[[BaseEntity], Iterable[str]]
+OntologyCheck = Callable[[Dict[str, BaseEntity]], Iterable[Tuple[str, str]]]
+
+
+class Rule:
+    """Правило проверки."""
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable,
+        scope: Literal["entity", "ontology"] = "entity",
+        severity: Severity = "warning",
+        description: str = "",
+    ):
+        """
+        Args:
+            name: Имя правила (в отчёте и для `--rule`)
+            check: Функция проверки (см. EntityCheck / OntologyCheck)
+            scope: "entity" или "ontology"
+            severity: "error" или "warning"
+            description: Описание для справки
+        """
+        self.name = name
+        self.check = check
+        self.scope = scope
+        self.severity = severity
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name!r}, scope={self.scope!r}, severity={self.severity!r})"
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def register_rule(
+    name: str,
+    scope: Literal["entity", "ontology"] = "entity",
+    severity: Severity = "warning",
+    description: str = "",
+) -> Callable[[Callable], Callable]:
+    """
+    Декоратор регистрации правила.
+
+    Пример:
+        @register_rule("name-length", severity="warning")
+        def name_length(entity):
+            if len(entity.name) > 80:
+                yield "Слишком длинное название"
+    """
+
+    def decorator(check: Callable) -> Callable:
+        RULES[name] = Rule(
+            name, check, scope, severity, description or (check.__doc__ or "").strip()
+        )
+        return check
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Правила уровня сущности
+# ---------------------------------------------------------------------------
+
+
+@register_rule(
+    "placeholder",
+    severity="warning",
+    description="Поля с заглушкой [пусто] (кроме черновиков понятий)",
+)
+def check_placeholders(entity: BaseEntity) -> Iterator[str]:
+    if isinstance(entity, Concept) and entity.status == ConceptStatus.DRAFT:
+        return  # Заглушки в черновике ожидаемы: их заполняет fill
+    fields = [
+        name
+        for name in ("definition", "purpose")
+        if PLACEHOLDER in (getattr(entity, name) or "")
+    ]
+    if any(PLACEHOLDER in example for example in entity.examples):
+        fields.append("examples")
+    if not fields:
+        return
+    message = f"Заглушка {PLACEHOLDER}: {', '.join(fields)}"
+    if isinstance(entity, Concept) and entity.status == ConceptStatus.APPROVED:
+        message += " (понятие утверждено)"
+    yield message
+
+
+@register_rule(
+    "meta-meta-required",
+    severity="warning",
+    description="У заполненного понятия задан meta_meta (prompts_templates/meta_meta_rules.md)",
+)
+def check_meta_meta_required(entity: BaseEntity) -> Iterator[str]:
+    if (
+        isinstance(entity, Concept)
+        and entity.status != ConceptStatus.DRAFT
+        and entity.meta_meta is None
+    ):
+        yield f"Понятие в статусе {entity.status.value} без meta_meta"
+
+
+# ---------------------------------------------------------------------------
+# Правила уровня онтологии
+# ---------------------------------------------------------------------------
+
+
+@register_rule(
+    "relation-target", scope="ontology", severity="error", description="Цель связи существует"
+)
+def check_relation_targets(entities: Dict[str, BaseEntity]) -> Iterator[Tuple[str, str]]:
+    for entity_id, entity in entities.items():
+        for relation in entity.relations:
+            if relation.target == entity_id:
+                yield entity_id, f"Связь {relation.type.value} на самого себя"
+            elif relation.target not in entities:
+                yield entity_id, (
+                    f"Целевой объект не найден: {relation.target} ({relation.type.value})"
+                )
+
+
+# Симметричные связи должны быть взаимными, антисимметричные — не должны.
+SYMMETRIC_RELATIONS = (RelationType.OPPOSITE_OF, RelationType.SIMILAR_TO)
+ANTISYMMETRIC_RELATIONS = (RelationType.PART_OF, RelationType.INSTANCE_OF)
+
+
+@register_rule(
+    "relation-symmetry",
+    scope="ontology",
+    severity="warning",
+    description="opposite_of/similar_to взаимны, part_of/instance_of не взаимны",
+)
+def check_relation_symmetry(entities: Dict[str, BaseEntity]) -> Iterator[Tuple[str, str]]:
+    edges = {
+        (entity_id, relation.type, relation.target)
+        for entity_id, entity in entities.items()
+        for relation in entity.relations
+    }
+    ordered = sorted(edges, key=lambda edge: (edge[0], edge[1].value, edge[2]))
+    for source, relation_type, target in ordered:
+        if target not in entities or target == source:
+            continue
+        reverse = (target, relation_type, source) in edges
+        if relation_type in SYMMETRIC_RELATIONS and not reverse:
+            yield source, f"{relation_type.value} → {target}: нет обратной связи у {target}"
+        elif relation_type in ANTISYMMETRIC_RELATIONS and reverse and source < target:
+            yield source, f"{relation_type.value} взаимно с {target}"
+
+
+# «Ключевые различения» из meta_meta_rules.md: производный тип должен быть
+# связан хотя бы с одним понятием базового типа.
+META_META_LINKS: Dict[MetaMetaType, Tuple[MetaMetaType, ...]] = {
+    MetaMetaType.INDICATOR: (MetaMetaType.CHARACTERISTIC,),
+    MetaMetaType.VALUE: (MetaMetaType.INDICATOR, MetaMetaType.CHARACTERISTIC),
+    MetaMetaType.METHOD_DESCRIPTION: (MetaMetaType.METHOD,),
+    MetaMetaType.EXECUTION: (
+        MetaMetaType.METHOD,
+        MetaMetaType.METHOD_DESCRIPTION,
+        MetaMetaType.WORK_PLAN,
+    ),
+}
+
+
+@register_rule(
+    "meta-meta-links",
+    scope="ontology",
+    severity="warning",
+    description="Показатель/Значение/Описание метода/Выполнение связаны с базовым типом",
+)
+def check_meta_meta_links(entities: Dict[str, BaseEntity]) -> Iterator[Tuple[str, str]]:
+    for entity_id, entity in entities.items():
+        if not isinstance(entity, Concept) or entity.meta_meta not in META_META_LINKS:
+            continue
+        expected = META_META_LINKS[entity.meta_meta]
+        linked = (entities.get(relation.target) for relation in entity.relations)
+        if not any(getattr(target, "meta_meta", None) in expected for target in linked):
+            names = " / ".join(item.value for item in expected)
+            yield entity_id, f"{entity.meta_meta.value} без связи с понятием типа {names}"
+
+
+# ---------------------------------------------------------------------------
+# Запуск
+# ---------------------------------------------------------------------------
+
+# Результат проверки файла: (путь, сущность или None, проблемы)
+_FileResult = Tuple[str, Optional[BaseEntity], List[Issue]]
+
+
+def _check_files(
+    items: Sequence[Tuple[str, str, type]], rules: Sequence[Rule]
+) -> List[_FileResult]:
+    """Разбор и проверка пачки файлов (выполняется в процессе пула)."""
+    results: List[_FileResult] = []
+    for file_path, relative, entity_cls in items:
+        try:
+            text = Path(file_path).read_text(encoding="utf-8")
+        except OSError as exc:
+            issue = Issue(rule="schema", severity="error", message=str(exc), file=relative)
+            results.append((relative, None, [issue]))
+            continue
+
+        entity, schema_errors = parse_entity_strict(text, entity_cls)
+        entity_id = entity.id if entity is not None else None
+        issues = [
+            Issue(
+                rule="schema", severity="error", message=message, entity_id=entity_id, file=relative
+            )
+            for message in schema_errors
+        ]
+        if entity is not None:
+            for rule in rules:
+                for message in rule.check(entity):
+                    issues.append(
+                        Issue(
+                            rule=rule.name,
+                            severity=rule.severity,
+                            message=message,
+                            entity_id=entity_id,
+                            file=relative,
+                        )
+                    )
+        results.append((relative, entity, issues))
+    return results
+
+
+def _chunks(items: List, count: int) -> List[List]:
+    size = max(1, -(-len(items) // count))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def validate_ontology(
+    root: Path,
+    rules: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+) -> ValidationReport:
+    """
+    Проверить все файлы онтологии.
+
+    Args:
+        root: Корень онтологии (.ontology/)
+        rules: Имена правил (по умолчанию — все зарегистрированные); схема проверяется всегда
+        workers: Количество процессов (по умолчанию — число ядер; 1 — без пула)
+
+    Returns:
+        Отчёт проверки
+    """
+    # Импорт здесь: ontology.py не должен зависеть от движка проверки
+    from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+
+    started = time.perf_counter()
+    root = Path(root)
+    unknown = sorted(set(rules or ()) - set(RULES))
+    if unknown:
+        raise ValueError(
+            f"Неизвестные правила: {', '.join(unknown)} (доступны: {', '.join(RULES)})"
+        )
+    selected = [RULES[name] for name in (rules or RULES)]
+    entity_rules = [rule for rule in selected if rule.scope == "entity"]
+    ontology_rules = [rule for rule in selected if rule.scope == "ontology"]
+
+    items: List[Tuple[str, str, type]] = []
+    for config in ENTITY_REGISTRY.values():
+        directory = root / config["dir"]
+        if directory.exists():
+            for file_path in Ontology._entity_files(directory):
+                relative = file_path.relative_to(root).as_posix()
+                items.append((str(file_path), relative, config["model"]))
+    items.sort(key=lambda item: item[1])
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(items) >= PARALLEL_THRESHOLD:
+        # Несколько пачек на процесс: выравнивание нагрузки при неравных файлах
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = executor.map(
+                _check_files, _chunks(items, workers * 4), [entity_rules] * (workers * 4)
+            )
+            results = [result for batch in batches for result in batch]
+    else:
+        results = _check_files(items, entity_rules)
+
+    report = ValidationReport(
+        root=str(root),
+        files_checked=len(items),
+        rules=["schema", *(rule.name for rule in selected)],
+    )
+    entities: Dict[str, BaseEntity] = {}
+    files: Dict[str, str] = {}
+    for relative, entity, issues in results:
+        report.issues.extend(issues)
+        if entity is None:
+            continue
+        if entity.id in entities:
+            report.issues.append(
+                Issue(
+                    rule="schema",
+                    severity="error",
+                    message=f"ID {entity.id} уже используется в {files[entity.id]}",
+                    entity_id=entity.id,
+                    file=relative,
+                )
+            )
+            continue
+        entities[entity.id] = entity
+        files[entity.id] = relative
+
+    for rule in ontology_rules:
+        for entity_id, message in rule.check(entities):
+            report.issues.append(
+                Issue(
+                    rule=rule.name,
+                    severity=rule.severity,
+                    message=message,
+                    entity_id=entity_id,
+                    file=files.get(entity_id),
+                )
+            )
+
+    report.entities = len(entities)
+    report.duration_seconds = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,244 @@
+"""
+Переносимый сжатый пакет онтологии (bundle).
+
+Один ZIP-файл вместо сотен мелких Markdown-файлов:
+- `manifest.json` — версия формата, список файлов с размерами и SHA-256;
+- `files/...`     — сами файлы онтологии (служебные `.cache/`, `.journal/` не входят).
+
+При распаковке хэши проверяются, а файлы, уже совпадающие локально, пропускаются.
+Локальные файлы сущностей с тем же ID, но другим именем удаляются (иначе при
+загрузке ID встретится дважды); кэш путей заполняется по списку файлов пакета.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zipfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit import __version__
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.storage import BulkWriteError, BulkWriter
+
+__all__ = [
+    "BUNDLE_FORMAT_VERSION",
+    "BundleFile",
+    "BundleManifest",
+    "UnpackReport",
+    "pack_ontology",
+    "read_manifest",
+    "unpack_bundle",
+]
+
+# v2: без index.json (v1 читается, индекс из него не используется)
+BUNDLE_FORMAT_VERSION = 2
+
+_MANIFEST = "manifest.json"
+_FILES_PREFIX = "files/"
+
+_ENTITY_DIRS = {config["dir"] for config in ENTITY_REGISTRY.values()}
+# Файл сущности: `<ID>_<имя>.md` (ID — префикс и номер)
+_ENTITY_FILE = re.compile(r"^([A-Za-z]+_\d+)_.*\.md$")
+
+
+class BundleFile(BaseModel):
+    """Файл внутри пакета."""
+
+    path: str
+    sha256: str
+    size: int
+
+
+class BundleManifest(BaseModel):
+    """Манифест пакета."""
+
+    format: str = "ontology-bundle"
+    format_version: int = BUNDLE_FORMAT_VERSION
+    toolkit_version: str = __version__
+    created: datetime = Field(default_factory=datetime.now)
+    entity_count: int = 0
+    files: List[BundleFile] = Field(default_factory=list)
+
+
+class UnpackReport(BaseModel):
+    """Результат распаковки."""
+
+    written: List[str] = Field(default_factory=list)
+    skipped: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+    errors: List[str] = Field(default_factory=list)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _collect_files(root: Path) -> List[Path]:
+    """Файлы онтологии без служебных (скрытых) каталогов и временных файлов."""
+    files = []
+    for path in root.rglob("*"):
+        relative = path.relative_to(root)
+        if not path.is_file() or any(part.startswith(".") for part in relative.parts):
+            continue
+        files.append(path)
+    return sorted(files)
+
+
+def _entity_id(relative: PurePosixPath) -> Optional[str]:
+    """ID сущности по пути файла относительно корня (или None для прочих файлов)."""
+    if len(relative.parts) < 2 or relative.parts[0] not in _ENTITY_DIRS:
+        return None
+    match = _ENTITY_FILE.match(relative.name)
+    return match.group(1) if match else None
+
+
+def _safe_relative(path: str) -> PurePosixPath:
+    """Проверка пути из пакета (защита от выхода за корень онтологии)."""
+    relative = PurePosixPath(path)
+    if relative.is_absolute() or ".." in relative.parts or not relative.parts:
+        raise ValueError(f"Недопустимый путь в пакете: {path}")
+    return relative
+
+
+def pack_ontology(root: Path, output: Path, compresslevel: int = 6) -> BundleManifest:
+    """
+    Упаковать онтологию в один сжатый файл.
+
+    Args:
+        root: Корень онтологии (.ontology/)
+        output: Путь к пакету (.zip)
+        compresslevel: Уровень сжатия deflate (0-9)
+
+    Returns:
+        Манифест пакета
+    """
+    root = Path(root)
+    manifest = BundleManifest()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(
+        output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+    ) as archive:
+        for path in _collect_files(root):
+            relative = path.relative_to(root)
+            data = path.read_bytes()
+            manifest.files.append(
+                BundleFile(path=relative.as_posix(), sha256=_sha256(data), size=len(data))
+            )
+            if _entity_id(PurePosixPath(relative.as_posix())) is not None:
+                manifest.entity_count += 1
+            archive.writestr(_FILES_PREFIX + relative.as_posix(), data)
+        archive.writestr(_MANIFEST, manifest.model_dump_json(indent=2))
+    return manifest
+
+
+def read_manifest(bundle: Path) -> BundleManifest:
+    """Прочитать манифест пакета."""
+    with zipfile.ZipFile(bundle) as archive:
+        return _read_manifest(archive)
+
+
+def _read_manifest(archive: zipfile.ZipFile) -> BundleManifest:
+    manifest = BundleManifest.model_validate_json(archive.read(_MANIFEST))
+    if manifest.format_version > BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Пакет формата v{manifest.format_version} не поддерживается "
+            f"(поддерживается до v{BUNDLE_FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def unpack_bundle(bundle: Path, root: Path, verify: bool = True) -> UnpackReport:
+    """
+    Распаковать пакет в каталог онтологии.
+
+    Файлы, уже совпадающие локально (размер + SHA-256), не перезаписываются.
+    Локальный файл сущности с ID из пакета, но другим именем (сущность
+    переименована) удаляется — после успешной записи файла из пакета.
+    Запись атомарная и идёт фоновым пулом (`BulkWriter`).
+
+    Args:
+        bundle: Путь к пакету
+        root: Корень онтологии (.ontology/)
+        verify: Проверять SHA-256 содержимого по манифесту
+
+    Returns:
+        Записанные, пропущенные, удалённые файлы и ошибки
+    """
+    root = Path(root)
+    report = UnpackReport()
+    local = _local_entity_files(root)
+    bundled: Dict[str, Path] = {}
+    with zipfile.ZipFile(bundle) as archive:
+        manifest = _read_manifest(archive)
+        try:
+            with BulkWriter() as writer:
+                for entry in manifest.files:
+                    try:
+                        relative = _safe_relative(entry.path)
+                    except ValueError as exc:
+                        report.errors.append(str(exc))
+                        continue
+                    target = root.joinpath(*relative.parts)
+                    entity_id = _entity_id(relative)
+                    if _same_file(target, entry):
+                        written = None
+                        report.skipped.append(entry.path)
+                    else:
+                        data = archive.read(_FILES_PREFIX + entry.path)
+                        if verify and (len(data) != entry.size or _sha256(data) != entry.sha256):
+                            report.errors.append(f"{entry.path}: хэш не совпадает с манифестом")
+                            continue
+                        writer.write(target, data)
+                        written = target
+                        report.written.append(entry.path)
+                    if entity_id is None:
+                        continue
+                    bundled[entity_id] = target
+                    for stale in local.get(entity_id, []):
+                        if stale != target:
+                            writer.remove(stale, after=written)
+                            report.removed.append(stale.relative_to(root).as_posix())
+        except BulkWriteError as exc:
+            failed = {path for path, _ in exc.errors}
+            report.written = [p for p in report.written if root.joinpath(p) not in failed]
+            report.errors.extend(f"{path}: {error}" for path, error in exc.errors)
+            # Удаления, привязанные к неудачной записи, не выполнялись
+            report.removed = [p for p in report.removed if not root.joinpath(p).exists()]
+
+    _seed_path_index(root, bundled)
+    return report
+
+
+def _local_entity_files(root: Path) -> Dict[str, List[Path]]:
+    """Файлы сущностей в каталоге онтологии по ID."""
+    files: Dict[str, List[Path]] = {}
+    if not root.exists():
+        return files
+    for path in _collect_files(root):
+        entity_id = _entity_id(PurePosixPath(path.relative_to(root).as_posix()))
+        if entity_id is not None:
+            files.setdefault(entity_id, []).append(path)
+    return files
+
+
+def _same_file(target: Path, entry: BundleFile) -> bool:
+    try:
+        if target.stat().st_size != entry.size:
+            return False
+        return _sha256(target.read_bytes()) == entry.sha256
+    except OSError:
+        return False
+
+
+def _seed_path_index(root: Path, bundled: Dict[str, Path]) -> None:
+    """Заполнить кэш путей по файлам пакета (без обхода каталогов при загрузке)."""
+    paths = Ontology(root).paths
+    for entity_id, target in bundled.items():
+        if target.exists():
+            paths.set(entity_id, target)
+    paths.save()
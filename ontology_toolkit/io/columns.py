@@ -0,0 +1,206 @@
+"""
+План колонок для табличных экспортов (CSV, XLSX).
+
+Колонки выводятся один раз на тип сущности из `model_fields` pydantic-модели:
+для каждой колонки заранее выбирается функция форматирования по аннотации поля
+(список строк, связи, перечисление, дата, строка). Строка таблицы — кортеж,
+собранный готовыми функциями доступа, без `hasattr` и словарей на каждую сущность.
+Новые типы сущностей и поля экспортируются автоматически.
+"""
+
+from __future__ import annotations
+
+import typing
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Sequence, Tuple, Type
+
+from ontology_toolkit.core.schema import BaseEntity, Relation
+
+__all__ = ["COLUMN_LABELS", "Column", "ColumnPlan", "column_plan"]
+
+Style = Literal["csv", "xlsx"]
+
+# Заголовки XLSX (в CSV заголовок — имя поля)
+COLUMN_LABELS: Dict[str, str] = {
+    "id": "ID",
+    "name": "Название",
+    "definition": "Определение",
+    "purpose": "Назначение",
+    "examples": "Примеры",
+    "relations": "Связи",
+    "created": "Создано",
+    "updated": "Обновлено",
+    "notes": "Заметки",
+    "status": "Статус",
+    "meta_meta": "Тип",
+    "method_type": "Тип метода",
+    "steps": "Шаги",
+    "components": "Компоненты",
+    "boundaries": "Границы",
+    "current_state": "Текущее состояние",
+    "desired_state": "Желаемое состояние",
+    "metrics": "Метрики",
+    "artifact_type": "Тип артефакта",
+    "template_ref": "Шаблон",
+}
+
+# Порядок первых колонок (исторический формат каждого экспорта);
+# остальные поля модели идут следом в порядке объявления.
+_LEADING: Dict[str, Tuple[str, ...]] = {
+    "csv": (
+        "id", "name", "definition", "purpose", "status", "meta_meta",
+        "examples", "relations", "created", "updated",
+    ),
+    "xlsx": (
+        "id", "name", "definition", "purpose", "examples", "relations",
+        "created", "updated", "status", "meta_meta",
+    ),
+}
+
+# CSV — одна таблица на все типы: эти колонки есть всегда (пустые у типов без поля)
+_CSV_FIXED = _LEADING["csv"]
+
+Formatter = Callable[[Any], Any]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _join(values: Sequence[str]) -> str:
+    return "; ".join(values) if values else ""
+
+
+def _relations(relations: Sequence[Relation]) -> str:
+    return "; ".join(f"{r.type.value}:{r.target}" for r in relations) if relations else ""
+
+
+def _enum(value: Any) -> str:
+    return value.value if value is not None else ""
+
+
+def _date(value: Any) -> str:
+    return value.isoformat() if value else ""
+
+
+def _formatter(annotation: Any) -> Formatter:
+    """Функция форматирования ячейки по аннотации поля (выбирается один раз)."""
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) is typing.Union:
+        # Optional[X] → форматирование X (None даёт пустую ячейку)
+        inner = [arg for arg in args if arg is not type(None)]
+        return _formatter(inner[0]) if len(inner) == 1 else _text
+    if typing.get_origin(annotation) in (list, List):
+        if args and isinstance(args[0], type) and issubclass(args[0], Relation):
+            return _relations
+        return _join
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return _enum
+        if issubclass(annotation, datetime):
+            return _date
+    return _text
+
+
+class Column:
+    """Колонка таблицы: поле модели, заголовки и форматирование."""
+
+    __slots__ = ("field", "label", "format")
+
+    def __init__(self, field: str, label: str, format: Formatter):
+        self.field = field
+        self.label = label
+        self.format = format
+
+    def __repr__(self) -> str:
+        return f"Column({self.field!r})"
+
+
+def _field_columns(entity_cls: Type[BaseEntity]) -> Dict[str, Column]:
+    return {
+        name: Column(name, COLUMN_LABELS.get(name, name), _formatter(info.annotation))
+        for name, info in entity_cls.model_fields.items()
+    }
+
+
+class ColumnPlan:
+    """Колонки таблицы и функции доступа для каждого типа сущностей."""
+
+    def __init__(self, columns: Sequence[Column]):
+        self.columns: Tuple[Column, ...] = tuple(columns)
+        self._accessors: Dict[type, Tuple[Callable[[Any], Any], ...]] = {}
+
+    def headers(self, labels: bool = False) -> List[str]:
+        """Заголовки: имена полей (CSV) или подписи (XLSX)."""
+        return [column.label if labels else column.field for column in self.columns]
+
+    def select(self, fields: Sequence[str]) -> "ColumnPlan":
+        """
+        План из выбранных колонок в указанном порядке.
+
+        Raises:
+            ValueError: Колонки нет в плане
+        """
+        by_field = {column.field: column for column in self.columns}
+        unknown = [field for field in fields if field not in by_field]
+        if unknown:
+            raise ValueError(
+                f"Неизвестные колонки: {', '.join(unknown)} "
+                f"(доступные: {', '.join(by_field)})"
+            )
+        return ColumnPlan([by_field[field] for field in fields])
+
+    def row(self, entity: BaseEntity) -> Tuple[Any, ...]:
+        """Строка таблицы для сущности."""
+        accessors = self._accessors.get(type(entity))
+        if accessors is None:
+            accessors = self._compile(type(entity))
+        return tuple(access(entity) for access in accessors)
+
+    def rows(self, entities: Iterable[BaseEntity]) -> Iterator[Tuple[Any, ...]]:
+        """Строки таблицы для сущностей."""
+        for entity in entities:
+            yield self.row(entity)
+
+    def _compile(self, entity_cls: type) -> Tuple[Callable[[Any], Any], ...]:
+        fields = entity_cls.model_fields
+        accessors = []
+        for column in self.columns:
+            if column.field in fields:
+                getter, format = attrgetter(column.field), column.format
+                accessors.append(lambda entity, get=getter, fmt=format: fmt(get(entity)))
+            else:
+                # У типа нет поля (например, status у метода) — пустая ячейка
+                accessors.append(lambda entity: "")
+        compiled = tuple(accessors)
+        self._accessors[entity_cls] = compiled
+        return compiled
+
+
+@lru_cache(maxsize=None)
+def column_plan(entity_classes: Tuple[Type[BaseEntity], ...], style: Style = "csv") -> ColumnPlan:
+    """
+    План колонок для набора типов сущностей (вычисляется один раз и кэшируется).
+
+    Args:
+        entity_classes: Типы сущностей таблицы (по порядку `ENTITY_REGISTRY`)
+        style: "csv" (общая таблица, постоянные базовые колонки) или "xlsx" (вкладка на тип)
+
+    Returns:
+        План колонок
+    """
+    columns: Dict[str, Column] = {}
+    for entity_cls in entity_classes:
+        for name, column in _field_columns(entity_cls).items():
+            columns.setdefault(name, column)
+    if style == "csv":
+        for name in _CSV_FIXED:
+            # Постоянные колонки CSV есть даже без соответствующего типа в выборке
+            columns.setdefault(name, Column(name, COLUMN_LABELS.get(name, name), _text))
+
+    leading = [name for name in _LEADING[style] if name in columns]
+    rest = [name for name in columns if name not in leading]
+    return ColumnPlan([columns[name] for name in leading + rest])
@@ -1,15 +1,124 @@
 """
 Экспорт онтологии в CSV формат.
 
-Поддерживает фильтрацию по префиксу и статусу.
+Поддерживает фильтрацию по префиксу и статусу, выбор колонок,
+потоковую запись (stdout, gzip/zstd) с постоянным расходом памяти.
 """
 
 import csv
+import io
+import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Type, Union
 
-from ontology_toolkit.core.ontology import Ontology
-from ontology_toolkit.core.schema import ConceptStatus
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import BaseEntity, ConceptStatus
+from ontology_toolkit.io.columns import column_plan
+from ontology_toolkit.io.streams import (
+    Compression,
+    ExportStats,
+    detect_compression,
+    is_stdout,
+    open_output,
+)
+
+
+def iter_entities(
+    ontology: Ontology,
+    prefix: Optional[str] = None,
+    status: Optional[ConceptStatus] = None
+) -> Iterator[BaseEntity]:
+    """
+    Объекты для экспорта по фильтрам (без промежуточного списка).
+    
+    Args:
+        ontology: Онтология
+        prefix: Фильтр по префиксу (C, M, S, P, A) или None для всех
+        status: Фильтр по статусу (только для типов с полем status) или None
+        
+    Yields:
+        Объекты в порядке индекса
+    """
+    source = ontology.index.by_prefix.get(prefix, []) if prefix else ontology.index.by_id.values()
+    for entity in source:
+        if status and ("status" not in type(entity).model_fields or entity.status != status):
+            continue
+        yield entity
+
+
+def selected_types(
+    ontology: Ontology,
+    prefix: Optional[str] = None,
+    status: Optional[ConceptStatus] = None
+) -> Tuple[Type[BaseEntity], ...]:
+    """Типы объектов, попадающих в выборку (по порядку `ENTITY_REGISTRY`)."""
+    present = {type(entity) for entity in iter_entities(ontology, prefix, status)}
+    return tuple(cfg["model"] for cfg in ENTITY_REGISTRY.values() if cfg["model"] in present)
+
+
+def stream_csv(
+    entities: Iterable[BaseEntity],
+    output: Union[Path, str],
+    entity_types: Optional[Sequence[Type[BaseEntity]]] = None,
+    columns: Optional[Sequence[str]] = None,
+    compression: Optional[Compression] = None,
+    chunk_size: int = 1000,
+    bom: Optional[bool] = None,
+) -> ExportStats:
+    """
+    Потоково записать объекты в CSV.
+    
+    Строки собираются пачками по `chunk_size` в небольшой текстовый буфер
+    и сразу уходят в приёмник, поэтому память не зависит от размера онтологии.
+    
+    Args:
+        entities: Объекты (любой итератор)
+        output: Путь к файлу или `-` (stdout)
+        entity_types: Типы для набора колонок (по умолчанию — все типы реестра)
+        columns: Выбранные колонки (имена полей) в нужном порядке
+        compression: gzip, zstd или None (по умолчанию — по расширению: .gz, .zst)
+        chunk_size: Строк в одной записи
+        bom: Писать UTF-8 BOM (по умолчанию — только для несжатого файла, для Excel)
+        
+    Returns:
+        Статистика: строки, байты, время
+    """
+    started = time.perf_counter()
+    if entity_types is None:
+        entity_types = [cfg["model"] for cfg in ENTITY_REGISTRY.values()]
+    plan = column_plan(tuple(entity_types), "csv")
+    if columns:
+        plan = plan.select(columns)
+    if compression is None:
+        compression = detect_compression(output)
+    if bom is None:
+        bom = compression is None and not is_stdout(output)
+
+    stats = ExportStats()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if bom:
+        buffer.write("\ufeff")
+    writer.writerow(plan.headers())
+
+    with open_output(output, compression) as out:
+        pending = 0
+        for row in plan.rows(entities):
+            writer.writerow(row)
+            pending += 1
+            if pending == chunk_size:
+                out.write(buffer.getvalue().encode("utf-8"))
+                buffer.seek(0)
+                buffer.truncate()
+                stats.rows += pending
+                pending = 0
+        out.write(buffer.getvalue().encode("utf-8"))
+        stats.rows += pending
+
+    stats.bytes_written = out.bytes_written
+    stats.output_bytes = out.output_bytes
+    stats.seconds = round(time.perf_counter() - started, 3)
+    return stats
 
 
 def export_concepts_to_csv(
@@ -30,59 +139,13 @@ def export_concepts_to_csv(
     Returns:
         Количество экспортированных объектов
     """
-    # Получаем объекты для экспорта
-    entities = []
-    
-    if prefix:
-        entities = ontology.index.by_prefix.get(prefix, [])
-    else:
-        # Все объекты
-        entities = list(ontology.index.by_id.values())
-    
-    # Фильтр по статусу (только для Concept)
-    if status:
-        entities = [e for e in entities if hasattr(e, 'status') and e.status == status]
-    
-    # Экспорт в CSV
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.writer(f)
-        
-        # Заголовки
-        writer.writerow([
-            "id", "name", "definition", "purpose", "status", "meta_meta",
-            "examples", "relations", "created", "updated"
-        ])
-        
-        # Данные
-        for entity in entities:
-            # Examples через точку с запятой
-            examples_str = "; ".join(entity.examples) if entity.examples else ""
-            
-            # Relations через точку с запятой
-            relations_str = "; ".join(
-                [f"{r.type.value}:{r.target}" for r in entity.relations]
-            ) if entity.relations else ""
-            
-            # Status и meta_meta только для Concept
-            status_str = entity.status.value if hasattr(entity, 'status') else ""
-            meta_meta_str = entity.meta_meta.value if hasattr(entity, 'meta_meta') and entity.meta_meta else ""
-            
-            writer.writerow([
-                entity.id,
-                entity.name,
-                entity.definition,
-                entity.purpose,
-                status_str,
-                meta_meta_str,
-                examples_str,
-                relations_str,
-                entity.created.isoformat() if entity.created else "",
-                entity.updated.isoformat() if entity.updated else ""
-            ])
-    
-    return len(entities)
+    # Колонки: общие поля + поля типов, попавших в выборку (план кэшируется)
+    stats = stream_csv(
+        iter_entities(ontology, prefix, status),
+        output_path,
+        entity_types=selected_types(ontology, prefix, status),
+    )
+    return stats.rows
 
 
 class CSVExporter:
@@ -115,4 +178,3 @@ class CSVExporter:
             Количество экспортированных объектов
         """
         return export_concepts_to_csv(self.ontology, output_path, prefix, status)
-
@@ -0,0 +1,221 @@
+"""
+Потоковый экспорт графа связей для внешних инструментов: GraphML, GEXF, DOT.
+
+GraphML открывают yEd и Cytoscape, GEXF — Gephi, DOT — Graphviz.
+Узлы несут атрибуты label (название), type, status, meta_meta;
+рёбра — relation (тип связи) и description. Данные берутся прямо из индекса
+онтологии или из выборки объектов (связи с объектами вне выборки и с
+отсутствующими объектами пропускаются, как в `_build_graph`) и пишутся
+в поток (`open_output`: файл, stdout, gzip/zstd) без копии графа networkx.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Literal, Optional, Set, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import BaseEntity, Relation, RelationType
+from ontology_toolkit.io.streams import Compression, ExportStats, detect_compression, open_output
+
+__all__ = ["GRAPH_FORMATS", "GraphFormat", "GraphStats", "stream_graph"]
+
+GraphFormat = Literal["graphml", "gexf", "dot"]
+GRAPH_FORMATS: Tuple[str, ...] = ("graphml", "gexf", "dot")
+
+# Атрибуты узлов (помимо названия) и рёбер
+NODE_ATTRIBUTES: Tuple[str, ...] = ("type", "status", "meta_meta")
+EDGE_ATTRIBUTES: Tuple[str, ...] = ("relation", "description")
+
+_TYPE_BY_MODEL = {config["model"]: name for name, config in ENTITY_REGISTRY.items()}
+
+
+class GraphStats(ExportStats):
+    """Итог экспорта графа: rows — узлы, edges — рёбра."""
+
+    edges: int = 0
+
+
+def _node_attributes(entity: BaseEntity) -> Dict[str, str]:
+    status = getattr(entity, "status", None)
+    meta_meta = getattr(entity, "meta_meta", None)
+    return {
+        "type": _TYPE_BY_MODEL.get(type(entity), "entity"),
+        "status": status.value if status is not None else "",
+        "meta_meta": meta_meta.value if meta_meta is not None else "",
+    }
+
+
+Nodes = Dict[str, BaseEntity]
+
+
+def _edges(
+    nodes: Nodes, relation_types: Optional[Set[RelationType]]
+) -> Iterator[Tuple[str, Relation]]:
+    for entity_id, entity in nodes.items():
+        for relation in entity.relations:
+            if relation.target in nodes and (
+                relation_types is None or relation.type in relation_types
+            ):
+                yield entity_id, relation
+
+
+# --- GraphML ---
+
+def _graphml(nodes: Nodes, types: Optional[Set[RelationType]]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+        'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+    )
+    for key in ("label", *NODE_ATTRIBUTES):
+        yield f'  <key id="{key}" for="node" attr.name="{key}" attr.type="string"/>\n'
+    for key in EDGE_ATTRIBUTES:
+        yield f'  <key id="{key}" for="edge" attr.name="{key}" attr.type="string"/>\n'
+    yield '  <graph id="ontology" edgedefault="directed">\n'
+    for entity_id, entity in nodes.items():
+        data = {"label": entity.name, **_node_attributes(entity)}
+        yield f"    <node id={quoteattr(entity_id)}>"
+        yield "".join(
+            f'<data key="{key}">{escape(value)}</data>' for key, value in data.items() if value
+        )
+        yield "</node>\n"
+    for number, (source, relation) in enumerate(_edges(nodes, types)):
+        yield (
+            f'    <edge id="e{number}" source={quoteattr(source)} '
+            f'target={quoteattr(relation.target)}>'
+            f'<data key="relation">{relation.type.value}</data>'
+        )
+        if relation.description:
+            yield f'<data key="description">{escape(relation.description)}</data>'
+        yield "</edge>\n"
+    yield "  </graph>\n</graphml>\n"
+
+
+# --- GEXF ---
+
+def _gexf(nodes: Nodes, types: Optional[Set[RelationType]]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+    yield '  <graph mode="static" defaultedgetype="directed">\n'
+    yield '    <attributes class="node">\n'
+    for index, key in enumerate(NODE_ATTRIBUTES):
+        yield f'      <attribute id="{index}" title="{key}" type="string"/>\n'
+    yield "    </attributes>\n"
+    yield '    <attributes class="edge">\n'
+    for index, key in enumerate(EDGE_ATTRIBUTES):
+        yield f'      <attribute id="{index}" title="{key}" type="string"/>\n'
+    yield "    </attributes>\n"
+    yield "    <nodes>\n"
+    for entity_id, entity in nodes.items():
+        values = _node_attributes(entity)
+        yield f"      <node id={quoteattr(entity_id)} label={quoteattr(entity.name)}><attvalues>"
+        yield "".join(
+            f"<attvalue for=\"{index}\" value={quoteattr(values[key])}/>"
+            for index, key in enumerate(NODE_ATTRIBUTES)
+            if values[key]
+        )
+        yield "</attvalues></node>\n"
+    yield "    </nodes>\n    <edges>\n"
+    for number, (source, relation) in enumerate(_edges(nodes, types)):
+        values = {"relation": relation.type.value, "description": relation.description or ""}
+        yield (
+            f'      <edge id="{number}" source={quoteattr(source)} '
+            f'target={quoteattr(relation.target)} label="{relation.type.value}"><attvalues>'
+        )
+        yield "".join(
+            f"<attvalue for=\"{index}\" value={quoteattr(values[key])}/>"
+            for index, key in enumerate(EDGE_ATTRIBUTES)
+            if values[key]
+        )
+        yield "</attvalues></edge>\n"
+    yield "    </edges>\n  </graph>\n</gexf>\n"
+
+
+# --- DOT ---
+
+def _dot_quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _dot(nodes: Nodes, types: Optional[Set[RelationType]]) -> Iterator[str]:
+    yield "digraph ontology {\n"
+    yield "  node [shape=box];\n"
+    for entity_id, entity in nodes.items():
+        attributes = {"label": entity.name, **_node_attributes(entity)}
+        rendered = ", ".join(
+            f"{key}={_dot_quote(value)}" for key, value in attributes.items() if value
+        )
+        yield f"  {_dot_quote(entity_id)} [{rendered}];\n"
+    for source, relation in _edges(nodes, types):
+        attributes = {
+            "label": relation.type.value,
+            "relation": relation.type.value,
+            "description": relation.description or "",
+        }
+        rendered = ", ".join(
+            f"{key}={_dot_quote(value)}" for key, value in attributes.items() if value
+        )
+        yield f"  {_dot_quote(source)} -> {_dot_quote(relation.target)} [{rendered}];\n"
+    yield "}\n"
+
+
+_WRITERS = {"graphml": _graphml, "gexf": _gexf, "dot": _dot}
+
+
+def stream_graph(
+    ontology: Ontology,
+    output: Union[Path, str],
+    format: GraphFormat = "graphml",
+    relation_types: Optional[Iterable[RelationType]] = None,
+    compression: Optional[Compression] = None,
+    chunk_size: int = 1000,
+    entities: Optional[Iterable[BaseEntity]] = None,
+) -> GraphStats:
+    """
+    Потоково записать граф связей в GraphML, GEXF или DOT.
+
+    Args:
+        ontology: Онтология
+        output: Путь к файлу или `-` (stdout)
+        format: graphml, gexf или dot
+        relation_types: Только эти типы связей
+        compression: gzip, zstd или None (по умолчанию — по расширению)
+        chunk_size: Фрагментов текста в одной записи
+        entities: Узлы графа (по умолчанию — все объекты онтологии);
+            рёбра — только между ними
+
+    Returns:
+        Статистика: узлы (rows), рёбра, байты, время
+    """
+    if format not in _WRITERS:
+        raise ValueError(
+            f"Неизвестный формат графа: {format} (доступные: {', '.join(GRAPH_FORMATS)})"
+        )
+    started = time.perf_counter()
+    types = set(relation_types) if relation_types else None
+    if compression is None:
+        compression = detect_compression(output)
+
+    nodes = (
+        ontology.index.by_id if entities is None else {entity.id: entity for entity in entities}
+    )
+    stats = GraphStats(rows=len(nodes))
+    stats.edges = sum(1 for _ in _edges(nodes, types))
+    with open_output(output, compression) as out:
+        pending = []
+        for fragment in _WRITERS[format](nodes, types):
+            pending.append(fragment)
+            if len(pending) == chunk_size:
+                out.write("".join(pending).encode("utf-8"))
+                pending.clear()
+        out.write("".join(pending).encode("utf-8"))
+
+    stats.bytes_written = out.bytes_written
+    stats.output_bytes = out.output_bytes
+    stats.seconds = round(time.perf_counter() - started, 3)
+    return stats
@@ -7,6 +7,8 @@
 from pathlib import Path
 from typing import Optional
 
+from ontology_toolkit.core.storage import atomic_write_bytes
+
 
 class MarkdownIO:
     """Универсальный MD reader/writer."""
@@ -38,8 +40,6 @@ class MarkdownIO:
         if file_path.exists() and not overwrite:
             raise FileExistsError(f"Файл уже существует: {file_path}")
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Атомарная запись: временный файл + переименование
+        atomic_write_bytes(file_path, content.encode("utf-8"))
 
@@ -0,0 +1,300 @@
+"""
+Граф связей онтологии в формате Mermaid.
+
+Для больших онтологий один `graph TD` на сотни узлов не рендерится,
+поэтому граф можно:
+- ограничить окрестностью объекта (`focus`, `depth`) и типами связей;
+- сгруппировать в `subgraph` по типу объектов или по сообществам
+  (модульность Louvain из networkx);
+- разбить на страницы по `page_size` узлов: связь с узлом другой страницы
+  показывается узлом-ссылкой «→ C_5 (стр. 2)».
+
+Строки пишутся в файл страницы сразу, без накопления всего текста.
+Список записанных страниц хранится рядом в `.<имя>.pages.json`: при смене
+разбивки удаляются только страницы из этого списка, а не любые
+`graph.N.mmd` в каталоге.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Set, TextIO, Tuple
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import BaseEntity, ConceptSchema, Relation, RelationType
+from ontology_toolkit.core.storage import atomic_write_bytes
+
+__all__ = [
+    "GroupBy",
+    "MermaidReport",
+    "neighbourhood",
+    "page_paths",
+    "write_mermaid",
+]
+
+GroupBy = Literal["type", "community"]
+
+_TYPE_BY_PREFIX = {config["prefix"]: name for name, config in ENTITY_REGISTRY.items()}
+
+
+class MermaidReport(BaseModel):
+    """Результат записи графа."""
+
+    pages: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+    nodes: int = 0
+    edges: int = 0
+    cross_page_edges: int = 0
+
+
+def _allowed(relation: Relation, relation_types: Optional[Set[RelationType]]) -> bool:
+    return relation_types is None or relation.type in relation_types
+
+
+def neighbourhood(
+    ontology: Ontology,
+    focus: str,
+    depth: int = 1,
+    relation_types: Optional[Iterable[RelationType]] = None,
+) -> List[str]:
+    """
+    Объекты в пределах `depth` связей от `focus` (в обе стороны), в порядке обхода.
+
+    Входящие связи берутся из индекса обратных ссылок, без обхода всех объектов.
+
+    Args:
+        ontology: Онтология
+        focus: ID центрального объекта
+        depth: Глубина (число шагов по связям)
+        relation_types: Учитывать только эти типы связей
+
+    Returns:
+        Список ID, начиная с `focus`
+    """
+    if focus not in ontology.index.by_id:
+        raise ValueError(f"Объект не найден: {focus}")
+    types = set(relation_types) if relation_types else None
+    seen = {focus}
+    order = [focus]
+    queue = deque([(focus, 0)])
+    while queue:
+        entity_id, distance = queue.popleft()
+        if distance == depth:
+            continue
+        entity = ontology.index.by_id[entity_id]
+        neighbours = [r.target for r in entity.relations if _allowed(r, types)]
+        for source_id in sorted(ontology.index.linked_from(entity_id)):
+            source = ontology.index.by_id.get(source_id)
+            if source is not None and any(
+                _allowed(r, types) for r in source.relations_to(entity_id)
+            ):
+                neighbours.append(source_id)
+        for neighbour in neighbours:
+            if neighbour not in seen and neighbour in ontology.index.by_id:
+                seen.add(neighbour)
+                order.append(neighbour)
+                queue.append((neighbour, distance + 1))
+    return order
+
+
+def _edges(
+    entity: BaseEntity, nodes: Set[str], types: Optional[Set[RelationType]]
+) -> Iterator[Relation]:
+    for relation in entity.relations:
+        if relation.target in nodes and _allowed(relation, types):
+            yield relation
+
+
+def _groups(
+    ontology: Ontology,
+    node_ids: List[str],
+    group_by: Optional[GroupBy],
+    types: Optional[Set[RelationType]],
+) -> Dict[str, Tuple[str, str]]:
+    """ID → (ключ группы, подпись группы)."""
+    if group_by is None:
+        return {}
+    if group_by == "type":
+        groups = {}
+        for entity_id in node_ids:
+            prefix, _ = ConceptSchema.parse_id(entity_id)
+            entity_type = _TYPE_BY_PREFIX.get(prefix, prefix)
+            label = ENTITY_REGISTRY.get(entity_type, {}).get("dir", prefix)
+            groups[entity_id] = (entity_type, label)
+        return groups
+
+    import networkx as nx
+
+    nodes = set(node_ids)
+    undirected = nx.Graph()
+    undirected.add_nodes_from(node_ids)
+    for entity_id in node_ids:
+        for relation in _edges(ontology.index.by_id[entity_id], nodes, types):
+            undirected.add_edge(entity_id, relation.target)
+    communities = nx.community.louvain_communities(undirected, seed=0)
+    # Крупные сообщества первыми; внутри — порядок исходного списка
+    position = {entity_id: index for index, entity_id in enumerate(node_ids)}
+    ordered = sorted(communities, key=lambda c: (-len(c), min(position[n] for n in c)))
+    return {
+        entity_id: (f"community_{number}", f"Сообщество {number}")
+        for number, community in enumerate(ordered, start=1)
+        for entity_id in community
+    }
+
+
+def page_paths(output: Path, pages: int) -> List[Path]:
+    """Файлы страниц: один файл — `output`, иначе `ontology.1.mmd`, `ontology.2.mmd`, ..."""
+    output = Path(output)
+    if pages <= 1:
+        return [output]
+    return [
+        output.with_name(f"{output.stem}.{page}{output.suffix}") for page in range(1, pages + 1)
+    ]
+
+
+def _pages_manifest(output: Path) -> Path:
+    """Файл со списком страниц последней записи (`.graph.mmd.pages.json`)."""
+    output = Path(output)
+    return output.with_name(f".{output.name}.pages.json")
+
+
+def _stale_pages(output: Path, paths: List[Path]) -> List[Path]:
+    """Страницы прошлой записи (по её списку), которых нет среди `paths`."""
+    output = Path(output)
+    try:
+        names = json.loads(_pages_manifest(output).read_text(encoding="utf-8"))["pages"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []  # Списка нет — чужие файлы не трогаем
+    current = {path.name for path in paths}
+    return [
+        output.with_name(name)
+        for name in sorted(set(names) - current)
+        if isinstance(name, str) and "/" not in name and output.with_name(name).is_file()
+    ]
+
+
+def _label(text: str) -> str:
+    return text.replace('"', '\\"')
+
+
+def write_mermaid(
+    ontology: Ontology,
+    output: Path,
+    focus: Optional[str] = None,
+    depth: int = 1,
+    relation_types: Optional[Iterable[RelationType]] = None,
+    group_by: Optional[GroupBy] = None,
+    page_size: Optional[int] = None,
+    direction: str = "TD",
+) -> MermaidReport:
+    """
+    Записать граф связей в Mermaid (один файл или несколько страниц).
+
+    Args:
+        ontology: Онтология
+        output: Файл графа (при нескольких страницах — шаблон имени)
+        focus: Только окрестность этого объекта
+        depth: Глубина окрестности
+        relation_types: Только эти типы связей
+        group_by: Группировка в subgraph: "type" или "community"
+        page_size: Узлов на страницу (None — одна страница)
+        direction: Направление графа (TD, LR, ...)
+
+    Returns:
+        Страницы, удалённые страницы прошлой разбивки и счётчики узлов/рёбер
+    """
+    types = set(relation_types) if relation_types else None
+    if focus is not None:
+        node_ids = neighbourhood(ontology, focus, depth, types)
+    else:
+        node_ids = list(ontology.index.by_id)
+    nodes = set(node_ids)
+
+    groups = _groups(ontology, node_ids, group_by, types)
+    if groups:
+        # Узлы одной группы идут подряд, чтобы группа не рвалась между страницами
+        first_seen: Dict[str, int] = {}
+        for index, entity_id in enumerate(node_ids):
+            first_seen.setdefault(groups[entity_id][0], index)
+        node_ids = sorted(node_ids, key=lambda n: first_seen[groups[n][0]])
+
+    size = page_size if page_size and page_size > 0 else max(len(node_ids), 1)
+    page_count = max(1, -(-len(node_ids) // size))
+    page_of = {entity_id: index // size for index, entity_id in enumerate(node_ids)}
+    paths = page_paths(output, page_count)
+    report = MermaidReport(pages=[str(path) for path in paths], nodes=len(node_ids))
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    for page, path in enumerate(paths):
+        page_nodes = node_ids[page * size:(page + 1) * size]
+        with open(path, "w", encoding="utf-8") as out:
+            _write_page(
+                out, ontology, page_nodes, nodes, page, page_of, page_count, groups,
+                types, direction, report,
+            )
+    # Страницы прошлой разбивки (лишние номера, файл без номера) не остаются рядом с новыми
+    for path in _stale_pages(output, paths):
+        path.unlink()
+        report.removed.append(str(path))
+    manifest = {"pages": [path.name for path in paths]}
+    atomic_write_bytes(
+        _pages_manifest(output),
+        json.dumps(manifest, ensure_ascii=False).encode("utf-8"),
+        fsync=False,
+    )
+    return report
+
+
+def _write_page(
+    out: TextIO,
+    ontology: Ontology,
+    page_nodes: List[str],
+    nodes: Set[str],
+    page: int,
+    page_of: Dict[str, int],
+    page_count: int,
+    groups: Dict[str, Tuple[str, str]],
+    types: Optional[Set[RelationType]],
+    direction: str,
+    report: MermaidReport,
+) -> None:
+    out.write(f"graph {direction}\n")
+    if page_count > 1:
+        out.write(f"    %% Страница {page + 1} из {page_count}\n")
+
+    current_group: Optional[str] = None
+    for entity_id in page_nodes:
+        group = groups.get(entity_id)
+        if group and group[0] != current_group:
+            if current_group is not None:
+                out.write("    end\n")
+            current_group = group[0]
+            out.write(f'    subgraph grp_{group[0]}["{_label(group[1])}"]\n')
+        indent = "        " if current_group else "    "
+        entity = ontology.index.by_id[entity_id]
+        out.write(f'{indent}{entity_id}["{_label(entity.name)}"]\n')
+    if current_group is not None:
+        out.write("    end\n")
+
+    references: Set[str] = set()
+    for entity_id in page_nodes:
+        for relation in _edges(ontology.index.by_id[entity_id], nodes, types):
+            target = relation.target
+            if page_of[target] != page:
+                # Узел другой страницы — ссылка с номером страницы
+                reference = f"{target}_ref"
+                if reference not in references:
+                    references.add(reference)
+                    out.write(
+                        f'    {reference}["→ {target} (стр. {page_of[target] + 1})"]:::ref\n'
+                    )
+                target = reference
+                report.cross_page_edges += 1
+            out.write(f"    {entity_id} -->|{relation.type.value}| {target}\n")
+            report.edges += 1
+    if references:
+        out.write("    classDef ref stroke-dasharray: 5 5\n")
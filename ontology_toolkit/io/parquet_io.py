@@ -0,0 +1,305 @@
+"""
+Колоночный экспорт и импорт онтологии (Parquet / Arrow) для аналитики.
+
+Две таблицы вместо одной CSV со склеенными строками:
+- `<имя>.parquet`           — объекты: типизированные колонки, `examples`/`steps`/...
+  как list<string>, даты как timestamp, `type`/`status`/`meta_meta`
+  со словарным кодированием;
+- `<имя>.relations.parquet` — рёбра: source, type, target, description.
+
+Схема выводится из `model_fields` моделей (как план колонок CSV/XLSX),
+строки пишутся пачками (`ParquetWriter`), импорт валидирует данные моделями.
+Требует pyarrow: `pip install ontology-toolkit[parquet]`.
+"""
+
+from __future__ import annotations
+
+import typing
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import BaseEntity
+
+__all__ = [
+    "PARQUET_FORMAT_VERSION",
+    "ImportReport",
+    "entities_schema",
+    "export_to_parquet",
+    "import_parquet",
+    "load_parquet",
+    "read_parquet",
+    "relations_path",
+]
+
+PARQUET_FORMAT_VERSION = 1
+
+# Колонки, которых нет в моделях: тип объекта (ключ ENTITY_REGISTRY)
+_TYPE_COLUMN = "type"
+_METADATA_KEY = b"ontology_toolkit.format_version"
+
+_TYPE_BY_MODEL = {config["model"]: name for name, config in ENTITY_REGISTRY.items()}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError(
+            "Экспорт в Parquet требует pyarrow. "
+            "Установите: pip install ontology-toolkit[parquet]"
+        )
+    return pyarrow, pyarrow.parquet
+
+
+def relations_path(path: Path) -> Path:
+    """Файл таблицы связей рядом с таблицей объектов (`x.parquet` → `x.relations.parquet`)."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.relations{path.suffix or '.parquet'}")
+
+
+def _arrow_type(pa, annotation: Any):
+    """Тип Arrow по аннотации поля модели."""
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) is typing.Union:
+        inner = [arg for arg in args if arg is not type(None)]
+        return _arrow_type(pa, inner[0]) if len(inner) == 1 else pa.string()
+    if typing.get_origin(annotation) in (list, List):
+        return pa.list_(pa.string())
+    if isinstance(annotation, type):
+        if issubclass(annotation, Enum):
+            return pa.dictionary(pa.int8(), pa.string())
+        if issubclass(annotation, datetime):
+            return pa.timestamp("us")
+    return pa.string()
+
+
+def entities_schema():
+    """
+    Схема таблицы объектов: поля всех типов реестра (без relations) и колонка type.
+
+    Returns:
+        pyarrow.Schema
+    """
+    pa, _ = _pyarrow()
+    fields: Dict[str, Any] = {}
+    for config in ENTITY_REGISTRY.values():
+        for name, info in config["model"].model_fields.items():
+            if name != "relations":
+                fields.setdefault(name, _arrow_type(pa, info.annotation))
+    columns = [pa.field("id", pa.string(), nullable=False)]
+    columns.append(pa.field(_TYPE_COLUMN, pa.dictionary(pa.int8(), pa.string()), nullable=False))
+    columns.extend(
+        pa.field(name, arrow_type) for name, arrow_type in fields.items() if name != "id"
+    )
+    return pa.schema(columns, metadata={_METADATA_KEY: str(PARQUET_FORMAT_VERSION).encode()})
+
+
+def _relations_schema():
+    pa, _ = _pyarrow()
+    return pa.schema(
+        [
+            pa.field("source", pa.string(), nullable=False),
+            pa.field("type", pa.dictionary(pa.int8(), pa.string()), nullable=False),
+            pa.field("target", pa.string(), nullable=False),
+            pa.field("description", pa.string()),
+        ],
+        metadata={_METADATA_KEY: str(PARQUET_FORMAT_VERSION).encode()},
+    )
+
+
+def _cell(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+class _BatchWriter:
+    """Накопление строк по колонкам и запись пачками в ParquetWriter."""
+
+    def __init__(self, path: Path, schema, batch_size: int, compression: str):
+        self.pa, pq = _pyarrow()
+        self.schema = schema
+        self.batch_size = batch_size
+        self.columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        self.pending = 0
+        self.rows = 0
+        self.writer = pq.ParquetWriter(path, schema, compression=compression)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for name, values in self.columns.items():
+            values.append(row.get(name))
+        self.pending += 1
+        if self.pending == self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        arrays = [
+            self.pa.array(self.columns[field.name], type=field.type) for field in self.schema
+        ]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        for values in self.columns.values():
+            values.clear()
+        self.rows += self.pending
+        self.pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+def export_to_parquet(
+    ontology: Ontology,
+    output_path: Path,
+    entities: Optional[Iterable[BaseEntity]] = None,
+    batch_size: int = 10_000,
+    compression: str = "zstd",
+) -> Dict[str, int]:
+    """
+    Экспортировать онтологию в две таблицы Parquet (объекты и связи).
+
+    Args:
+        ontology: Онтология для экспорта
+        output_path: Файл таблицы объектов; связи — в `relations_path(output_path)`
+        entities: Объекты (по умолчанию — все объекты онтологии)
+        batch_size: Строк в одной пачке записи
+        compression: Сжатие Parquet (zstd, snappy, gzip, none)
+
+    Returns:
+        {"entities": строк, "relations": строк}
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    entity_writer = _BatchWriter(output_path, entities_schema(), batch_size, compression)
+    relation_writer = _BatchWriter(
+        relations_path(output_path), _relations_schema(), batch_size, compression
+    )
+    try:
+        for entity in ontology.index.by_id.values() if entities is None else entities:
+            row = {name: _cell(getattr(entity, name)) for name in type(entity).model_fields}
+            row[_TYPE_COLUMN] = _TYPE_BY_MODEL[type(entity)]
+            entity_writer.append(row)
+            for relation in entity.relations:
+                relation_writer.append(
+                    {
+                        "source": entity.id,
+                        "type": relation.type.value,
+                        "target": relation.target,
+                        "description": relation.description,
+                    }
+                )
+    finally:
+        entity_writer.close()
+        relation_writer.close()
+    return {"entities": entity_writer.rows, "relations": relation_writer.rows}
+
+
+def _check_version(parquet_file) -> None:
+    metadata = parquet_file.schema_arrow.metadata or {}
+    version = int(metadata.get(_METADATA_KEY, b"0"))
+    if version > PARQUET_FORMAT_VERSION:
+        raise ValueError(
+            f"Таблица формата v{version} не поддерживается "
+            f"(поддерживается до v{PARQUET_FORMAT_VERSION})"
+        )
+
+
+def read_parquet(path: Path, batch_size: int = 10_000) -> Iterator[BaseEntity]:
+    """
+    Прочитать объекты из таблиц Parquet (с валидацией моделями).
+
+    Связи читаются целиком и раскладываются по объектам; объекты — пачками.
+
+    Args:
+        path: Файл таблицы объектов (таблица связей — рядом, если есть)
+        batch_size: Строк в одной пачке чтения
+
+    Yields:
+        Объекты (новые, грязные — для записи в файлы)
+    """
+    _, pq = _pyarrow()
+    path = Path(path)
+    relations: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    edges_path = relations_path(path)
+    if edges_path.exists():
+        edges = pq.ParquetFile(edges_path)
+        _check_version(edges)
+        for batch in edges.iter_batches(batch_size=batch_size):
+            for edge in batch.to_pylist():
+                source = edge.pop("source")
+                relations[source].append(edge)
+
+    table = pq.ParquetFile(path)
+    _check_version(table)
+    for batch in table.iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            registry = ENTITY_REGISTRY.get(row.pop(_TYPE_COLUMN))
+            if registry is None:
+                raise ValueError(f"{row.get('id')}: неизвестный тип объекта")
+            model: Type[BaseEntity] = registry["model"]  # type: ignore[assignment]
+            data = {name: value for name, value in row.items() if name in model.model_fields}
+            data["relations"] = relations.pop(row["id"], [])
+            yield model.model_validate(data)
+
+
+def load_parquet(path: Path, root: Optional[Path] = None) -> Ontology:
+    """
+    Открыть онтологию из таблиц Parquet (без записи файлов).
+
+    Args:
+        path: Файл таблицы объектов
+        root: Корень онтологии для последующих сохранений
+            (по умолчанию `.ontology` рядом с таблицей)
+
+    Returns:
+        Онтология с построенным графом связей
+    """
+    ontology = Ontology(root or Path(path).parent / ".ontology")
+    for entity in read_parquet(path):
+        ontology.add_entity(entity)
+    ontology._build_graph()
+    return ontology
+
+
+class ImportReport(BaseModel):
+    """Результат импорта."""
+
+    added: List[str] = Field(default_factory=list)
+    updated: List[str] = Field(default_factory=list)
+    unchanged: int = 0
+
+
+def import_parquet(ontology: Ontology, path: Path) -> ImportReport:
+    """
+    Импортировать объекты из Parquet в загруженную онтологию.
+
+    Объекты с тем же отпечатком содержимого пропускаются, остальные заменяют
+    существующие (или добавляются) и помечаются грязными — их запишет `save_all()`.
+
+    Args:
+        ontology: Онтология (обычно после load_all)
+        path: Файл таблицы объектов
+
+    Returns:
+        Добавленные и обновлённые ID
+    """
+    report = ImportReport()
+    for entity in read_parquet(path):
+        existing = ontology.index.get(entity.id)
+        if existing is not None and existing.fingerprint == entity.fingerprint:
+            report.unchanged += 1
+            continue
+        if existing is not None:
+            ontology.remove_entity(entity.id)
+            report.updated.append(entity.id)
+        else:
+            report.added.append(entity.id)
+        ontology.add_entity(entity)
+    ontology._build_graph()
+    return report
@@ -0,0 +1,351 @@
+"""
+Потоковый экспорт онтологии в RDF: Turtle и JSON-LD.
+
+Объекты отображаются на словарь `ot:` (типы сущностей, `MetaMetaType`,
+`RelationType`) и стандартные свойства RDFS/SKOS/Dublin Core:
+name → rdfs:label, definition → skos:definition, examples → skos:example,
+notes → skos:note, created/updated → dcterms:created/modified.
+Тройки пишутся по объекту сразу в поток (`open_output`: файл, stdout,
+gzip/zstd) — RDF-граф в памяти не строится. Результат загружается
+в любое хранилище троек для SPARQL-запросов.
+
+IRI словаря `ot:` берётся из конфигурации проекта (`rdf_vocabulary`,
+по умолчанию `urn:ontology-toolkit:vocab#`). Связь с описанием
+(`Relation.description`) дополнительно выводится как `rdf:Statement`
+(реификация) с `rdfs:comment`; сама тройка связи остаётся прямой.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import (
+    DEFAULT_RDF_VOCABULARY,
+    BaseEntity,
+    MetaMetaType,
+    Relation,
+    RelationType,
+)
+from ontology_toolkit.io.streams import Compression, ExportStats, detect_compression, open_output
+
+__all__ = [
+    "DEFAULT_BASE",
+    "IRI",
+    "PREFIXES",
+    "RdfLiteral",
+    "RdfFormat",
+    "VOCAB",
+    "entity_triples",
+    "relation_statements",
+    "stream_rdf",
+]
+
+RdfFormat = Literal["turtle", "jsonld"]
+
+VOCAB = DEFAULT_RDF_VOCABULARY
+DEFAULT_BASE = "urn:ontology:"
+
+PREFIXES: Dict[str, str] = {
+    "ot": VOCAB,
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "dcterms": "http://purl.org/dc/terms/",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+# Поля, совпадающие по смыслу со стандартными свойствами
+_STANDARD_PROPERTIES = {
+    "name": "rdfs:label",
+    "definition": "skos:definition",
+    "examples": "skos:example",
+    "notes": "skos:note",
+    "created": "dcterms:created",
+    "updated": "dcterms:modified",
+}
+
+# Поля, значения которых — ID других объектов (ссылки, а не строки)
+_REFERENCE_FIELDS = {"components"}
+
+# Человекочитаемые тексты получают языковой тег проекта
+_TEXT_FIELDS = {
+    "name", "definition", "purpose", "examples", "notes", "steps", "boundaries",
+    "current_state", "desired_state", "metrics",
+}
+
+
+def _camel(name: str) -> str:
+    head, *tail = name.lower().split("_")
+    return head + "".join(part.capitalize() for part in tail)
+
+
+def _pascal(name: str) -> str:
+    return "".join(part.capitalize() for part in name.lower().split("_"))
+
+
+def _class_curie(entity_type: str) -> str:
+    return f"ot:{entity_type.capitalize()}"
+
+
+def _meta_meta_curie(value: MetaMetaType) -> str:
+    return f"ot:{_pascal(value.name)}"
+
+
+def _relation_curie(value: RelationType) -> str:
+    return f"ot:{_camel(value.value)}"
+
+
+_TYPE_BY_MODEL = {config["model"]: name for name, config in ENTITY_REGISTRY.items()}
+
+
+class IRI(str):
+    """Ссылка (CURIE `ot:Concept` или полный IRI объекта)."""
+
+
+class RdfLiteral:
+    """Литерал с типом данных или языковым тегом."""
+
+    __slots__ = ("value", "datatype", "language")
+
+    def __init__(
+        self, value: str, datatype: Optional[str] = None, language: Optional[str] = None
+    ):
+        self.value = value
+        self.datatype = datatype
+        self.language = language
+
+
+Term = Union[IRI, RdfLiteral]
+
+
+def entity_triples(
+    entity: BaseEntity, base: str = DEFAULT_BASE, language: Optional[str] = "ru"
+) -> Iterator[Tuple[str, Term]]:
+    """
+    Пары (свойство, значение) объекта — тройки с субъектом `base + id`.
+
+    Args:
+        entity: Объект онтологии
+        base: Префикс IRI объектов
+        language: Языковой тег текстов (None — без тега)
+
+    Yields:
+        (CURIE свойства, IRI или литерал)
+    """
+    entity_type = _TYPE_BY_MODEL.get(type(entity), "entity")
+    yield "rdf:type", IRI(_class_curie(entity_type))
+    if entity_type == "concept":
+        yield "rdf:type", IRI("skos:Concept")
+    yield "dcterms:identifier", RdfLiteral(entity.id)
+
+    for name in type(entity).model_fields:
+        if name in ("id", "relations"):
+            continue
+        value = getattr(entity, name)
+        if value is None or value == "" or value == []:
+            continue
+        predicate = _STANDARD_PROPERTIES.get(name, f"ot:{_camel(name)}")
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, MetaMetaType):
+                yield predicate, IRI(_meta_meta_curie(item))
+            elif isinstance(item, Enum):
+                yield predicate, RdfLiteral(item.value)
+            elif isinstance(item, datetime):
+                yield predicate, RdfLiteral(item.isoformat(), datatype="xsd:dateTime")
+            elif name in _REFERENCE_FIELDS:
+                yield predicate, IRI(base + str(item))
+            else:
+                yield predicate, RdfLiteral(
+                    str(item), language=language if name in _TEXT_FIELDS else None
+                )
+
+    for relation in entity.relations:
+        yield _relation_curie(relation.type), IRI(base + relation.target)
+
+
+def _statement_iri(entity: BaseEntity, relation: Relation, base: str) -> str:
+    return f"{base}{entity.id}/{relation.type.value}/{relation.target}"
+
+
+def relation_statements(
+    entity: BaseEntity, base: str = DEFAULT_BASE, language: Optional[str] = "ru"
+) -> Iterator[Tuple[str, List[Tuple[str, Term]]]]:
+    """
+    Реификация связей с описанием: `rdf:Statement` с `rdfs:comment`.
+
+    Args:
+        entity: Объект онтологии
+        base: Префикс IRI объектов
+        language: Языковой тег описаний (None — без тега)
+
+    Yields:
+        (IRI утверждения `base + id/тип/цель`, пары свойство–значение)
+    """
+    for relation in entity.relations:
+        if not relation.description:
+            continue
+        yield _statement_iri(entity, relation, base), [
+            ("rdf:type", IRI("rdf:Statement")),
+            ("rdf:subject", IRI(base + entity.id)),
+            ("rdf:predicate", IRI(_relation_curie(relation.type))),
+            ("rdf:object", IRI(base + relation.target)),
+            ("rdfs:comment", RdfLiteral(relation.description, language=language)),
+        ]
+
+
+def _vocabulary(language: Optional[str]) -> Iterator[Tuple[str, List[Tuple[str, Term]]]]:
+    """Описание словаря `ot:` (классы, фундаментальные типы, свойства связей)."""
+    for name in ENTITY_REGISTRY:
+        yield _class_curie(name), [
+            ("rdf:type", IRI("rdfs:Class")),
+            ("rdfs:label", RdfLiteral(name.capitalize())),
+        ]
+    for value in MetaMetaType:
+        yield _meta_meta_curie(value), [
+            ("rdf:type", IRI("ot:MetaMetaType")),
+            ("rdfs:label", RdfLiteral(value.value, language=language)),
+        ]
+    for value in RelationType:
+        yield _relation_curie(value), [
+            ("rdf:type", IRI("rdf:Property")),
+            ("rdfs:label", RdfLiteral(value.value)),
+        ]
+
+
+# --- Turtle ---
+
+_TURTLE_ESCAPES = str.maketrans(
+    {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+)
+
+
+def _turtle_term(term: Term) -> str:
+    if isinstance(term, IRI):
+        return str(term) if ":" in term and term.split(":", 1)[0] in PREFIXES else f"<{term}>"
+    text = f'"{term.value.translate(_TURTLE_ESCAPES)}"'
+    if term.datatype:
+        return f"{text}^^{term.datatype}"
+    if term.language:
+        return f"{text}@{term.language}"
+    return text
+
+
+def _turtle_block(subject: str, pairs: Iterable[Tuple[str, Term]]) -> str:
+    lines = [
+        f"    {'a' if predicate == 'rdf:type' else predicate} {_turtle_term(term)}"
+        for predicate, term in pairs
+    ]
+    return f"{_turtle_term(IRI(subject))}\n" + " ;\n".join(lines) + " .\n\n"
+
+
+def _prefixes(vocabulary: str) -> Dict[str, str]:
+    return {**PREFIXES, "ot": vocabulary}
+
+
+def _turtle_header(prefixes: Dict[str, str]) -> str:
+    return "".join(f"@prefix {prefix}: <{iri}> .\n" for prefix, iri in prefixes.items()) + "\n"
+
+
+# --- JSON-LD ---
+
+def _jsonld_term(term: Term) -> Dict[str, Any]:
+    if isinstance(term, IRI):
+        return {"@id": str(term)}
+    node: Dict[str, Any] = {"@value": term.value}
+    if term.datatype:
+        node["@type"] = term.datatype
+    elif term.language:
+        node["@language"] = term.language
+    return node
+
+
+def _jsonld_node(subject: str, pairs: Iterable[Tuple[str, Term]]) -> Dict[str, Any]:
+    node: Dict[str, Any] = {"@id": subject}
+    for predicate, term in pairs:
+        if predicate == "rdf:type":
+            node.setdefault("@type", []).append(str(term))
+        else:
+            node.setdefault(predicate, []).append(_jsonld_term(term))
+    return node
+
+
+def stream_rdf(
+    ontology: Ontology,
+    output: Union[Path, str],
+    format: RdfFormat = "turtle",
+    entities: Optional[Iterable[BaseEntity]] = None,
+    base: str = DEFAULT_BASE,
+    vocabulary: Optional[str] = None,
+    include_vocabulary: bool = True,
+    compression: Optional[Compression] = None,
+) -> ExportStats:
+    """
+    Потоково записать онтологию в Turtle или JSON-LD.
+
+    Args:
+        ontology: Онтология (язык текстов — из конфигурации проекта)
+        output: Путь к файлу или `-` (stdout)
+        format: turtle или jsonld
+        entities: Объекты (по умолчанию — все объекты онтологии)
+        base: Префикс IRI объектов (`urn:ontology:C_1`)
+        vocabulary: IRI словаря `ot:` (по умолчанию — `rdf_vocabulary` из конфигурации)
+        include_vocabulary: Добавить описание словаря `ot:`
+        compression: gzip, zstd или None (по умолчанию — по расширению)
+
+    Returns:
+        Статистика: объекты (rows), байты, время
+    """
+    if format not in ("turtle", "jsonld"):
+        raise ValueError(f"Неизвестный формат RDF: {format} (доступные: turtle, jsonld)")
+    started = time.perf_counter()
+    language = ontology.config.language or None
+    prefixes = _prefixes(vocabulary or ontology.config.rdf_vocabulary)
+    source = ontology.index.by_id.values() if entities is None else entities
+    if compression is None:
+        compression = detect_compression(output)
+
+    stats = ExportStats()
+    with open_output(output, compression) as out:
+        if format == "turtle":
+            out.write(_turtle_header(prefixes).encode("utf-8"))
+            if include_vocabulary:
+                for subject, pairs in _vocabulary(language):
+                    out.write(_turtle_block(subject, pairs).encode("utf-8"))
+            for entity in source:
+                block = _turtle_block(base + entity.id, entity_triples(entity, base, language))
+                for subject, pairs in relation_statements(entity, base, language):
+                    block += _turtle_block(subject, pairs)
+                out.write(block.encode("utf-8"))
+                stats.rows += 1
+        else:
+            context = dict(prefixes)
+            out.write(
+                ('{"@context": ' + json.dumps(context) + ',\n "@graph": [\n').encode("utf-8")
+            )
+            nodes: Iterator[Dict[str, Any]] = (
+                _jsonld_node(subject, pairs) for subject, pairs in _vocabulary(language)
+            ) if include_vocabulary else iter(())
+            separator = ""
+            for node in nodes:
+                out.write((separator + json.dumps(node, ensure_ascii=False)).encode("utf-8"))
+                separator = ",\n"
+            for entity in source:
+                node = _jsonld_node(base + entity.id, entity_triples(entity, base, language))
+                out.write((separator + json.dumps(node, ensure_ascii=False)).encode("utf-8"))
+                separator = ",\n"
+                for subject, pairs in relation_statements(entity, base, language):
+                    node = _jsonld_node(subject, pairs)
+                    out.write((separator + json.dumps(node, ensure_ascii=False)).encode("utf-8"))
+                stats.rows += 1
+            out.write(b"\n]}\n")
+
+    stats.bytes_written = out.bytes_written
+    stats.output_bytes = out.output_bytes
+    stats.seconds = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,445 @@
+"""
+Статический HTML-сайт онтологии.
+
+Структура сайта:
+- `index.html`             — обзор: число объектов по типам и статусам, поиск;
+- `entities/<ID>.html`     — страница объекта: поля, связи, обратные ссылки;
+- `types/<тип>.html`       — список объектов типа;
+- `status/<статус>.html`   — список понятий со статусом;
+- `search-index.js`        — индекс для поиска в браузере (работает и с file://);
+- `assets/`                — стили и скрипт поиска (файлы пакета `io/site_assets/`).
+
+Сборка инкрементальная. Ключ страницы объекта — хэш её входных данных:
+отпечаток объекта, даты, названия связанных объектов и обратные ссылки
+(источник, тип связи, название). Страница перерисовывается, только если ключ
+изменился; списки и индекс поиска сравниваются по хэшу содержимого.
+Ключи хранятся в манифесте `.site-manifest.json` в каталоге сайта, страницы
+удалённых объектов удаляются. Запись — атомарная (`AtomicWriteBatch`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from datetime import datetime
+from enum import Enum
+from html import escape
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.core.schema import BaseEntity, ConceptSchema, ConceptStatus
+from ontology_toolkit.core.storage import AtomicWriteBatch
+from ontology_toolkit.core.validation import PLACEHOLDER
+from ontology_toolkit.io.columns import COLUMN_LABELS
+
+__all__ = [
+    "MANIFEST_NAME",
+    "SITE_FORMAT_VERSION",
+    "SiteReport",
+    "build_site",
+    "entity_page_key",
+]
+
+# Меняется при изменении разметки страниц: все страницы перерисовываются
+SITE_FORMAT_VERSION = 1
+MANIFEST_NAME = ".site-manifest.json"
+
+TYPE_TITLES: Dict[str, str] = {
+    "concept": "Понятия",
+    "method": "Методы",
+    "system": "Системы",
+    "problem": "Проблемы",
+    "artifact": "Артефакты",
+}
+
+STATUS_TITLES: Dict[str, str] = {
+    ConceptStatus.DRAFT.value: "Черновики",
+    ConceptStatus.DRAFT_FILLED.value: "Заполнены",
+    ConceptStatus.APPROVED.value: "Утверждены",
+}
+
+# Поля, которые выводятся в шапке страницы, а не в основном тексте
+_HEADER_FIELDS = {"id", "name", "relations", "status", "meta_meta", "created", "updated"}
+
+# Поля со ссылками на другие объекты
+_REFERENCE_FIELDS = {"components"}
+
+# Длина фрагмента определения в индексе поиска
+_SNIPPET_LENGTH = 200
+
+_TYPE_BY_MODEL = {config["model"]: name for name, config in ENTITY_REGISTRY.items()}
+
+# Стили и скрипт поиска — файлы пакета, копируются в `assets/` сайта
+_ASSETS_DIR = Path(__file__).with_name("site_assets")
+_ASSETS = ("style.css", "search.js")
+
+
+class SiteReport(BaseModel):
+    """Результат сборки сайта."""
+
+    written: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+    unchanged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages(self) -> int:
+        return len(self.written) + self.unchanged
+
+
+def _hash(payload: Any) -> str:
+    data = payload if isinstance(payload, str) else json.dumps(
+        payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _sort_key(entity_id: str) -> Tuple[str, int]:
+    return ConceptSchema.parse_id(entity_id)
+
+
+def _entity_type(entity: BaseEntity) -> str:
+    return _TYPE_BY_MODEL.get(type(entity), "entity")
+
+
+def _status(entity: BaseEntity) -> Optional[str]:
+    status = getattr(entity, "status", None)
+    return status.value if status is not None else None
+
+
+def _status_slug(status: str) -> str:
+    return status.replace("+", "-")
+
+
+def _outgoing(ontology: Ontology, entity: BaseEntity) -> List[Tuple[str, str, Optional[str], str]]:
+    """Связи объекта: (тип, цель, название цели или None, описание)."""
+    by_id = ontology.index.by_id
+    result = []
+    for relation in entity.relations:
+        target = by_id.get(relation.target)
+        result.append(
+            (
+                relation.type.value,
+                relation.target,
+                target.name if target is not None else None,
+                relation.description or "",
+            )
+        )
+    return result
+
+
+def _references(ontology: Ontology, entity: BaseEntity) -> Dict[str, Optional[str]]:
+    """Объекты, на которые ссылаются поля-ссылки (`components`): ID → название или None."""
+    by_id = ontology.index.by_id
+    result: Dict[str, Optional[str]] = {}
+    for name in _REFERENCE_FIELDS & set(type(entity).model_fields):
+        for entity_id in getattr(entity, name) or []:
+            target = by_id.get(str(entity_id))
+            result[str(entity_id)] = target.name if target is not None else None
+    return result
+
+
+def _backlinks(ontology: Ontology, entity_id: str) -> List[Tuple[str, str, str]]:
+    """Обратные ссылки: (источник, тип связи, название источника), по порядку ID."""
+    result = []
+    for source_id in sorted(ontology.index.linked_from(entity_id), key=_sort_key):
+        source = ontology.index.by_id.get(source_id)
+        if source is None:
+            continue
+        for relation in source.relations_to(entity_id):
+            result.append((source_id, relation.type.value, source.name))
+    return result
+
+
+def entity_page_key(ontology: Ontology, entity: BaseEntity, title: str = "") -> str:
+    """
+    Ключ страницы объекта: хэш всего, что на ней выводится.
+
+    Args:
+        ontology: Онтология (для названий связанных объектов и обратных ссылок)
+        entity: Объект
+        title: Заголовок сайта
+
+    Returns:
+        Хэш (32 hex-символа)
+    """
+    return _hash(
+        [
+            SITE_FORMAT_VERSION,
+            title,
+            ontology.config.language,
+            entity.fingerprint,
+            entity.created.isoformat() if entity.created else None,
+            entity.updated.isoformat() if entity.updated else None,
+            _outgoing(ontology, entity),
+            sorted(_references(ontology, entity).items()),
+            _backlinks(ontology, entity.id),
+        ]
+    )
+
+
+# --- Разметка ---
+
+def _layout(title: str, site_title: str, body: str, root: str, language: str) -> str:
+    navigation = " ".join(
+        f'<a href="{root}types/{name}.html">{TYPE_TITLES.get(name, name)}</a>'
+        for name in ENTITY_REGISTRY
+    )
+    return (
+        f'<!DOCTYPE html>\n<html lang="{escape(language)}">\n<head>\n'
+        f'<meta charset="utf-8">\n<title>{escape(title)} — {escape(site_title)}</title>\n'
+        f'<link rel="stylesheet" href="{root}assets/style.css">\n</head>\n'
+        f'<body data-root="{root}">\n<header>\n'
+        f'<a class="title" href="{root}index.html">{escape(site_title)}</a>\n'
+        f"<nav>{navigation}</nav>\n"
+        '<div class="search">'
+        '<input id="search" type="search" placeholder="Поиск" autocomplete="off">'
+        '<ul id="search-results"></ul></div>\n</header>\n'
+        f"<main>\n<h1>{escape(title)}</h1>\n{body}</main>\n"
+        f'<script src="{root}search-index.js"></script>\n'
+        f'<script src="{root}assets/search.js"></script>\n</body>\n</html>\n'
+    )
+
+
+def _link(entity_id: str, name: Optional[str]) -> str:
+    if name is None:
+        return f'<span class="missing">{escape(entity_id)} (нет объекта)</span>'
+    return f'<a href="{escape(entity_id)}.html">{escape(entity_id)} — {escape(name)}</a>'
+
+
+def _text(value: str) -> str:
+    paragraphs = [part.strip() for part in value.split("\n\n") if part.strip()]
+    return "".join(
+        f"<p>{escape(paragraph).replace(chr(10), '<br>')}</p>\n" for paragraph in paragraphs
+    )
+
+
+def _value(name: str, value: Any, names: Dict[str, Optional[str]]) -> str:
+    if isinstance(value, list):
+        if name in _REFERENCE_FIELDS:
+            items = [_link(str(item), names.get(str(item))) for item in value]
+        else:
+            items = [escape(str(item)) for item in value]
+        return "<ul>\n" + "".join(f"<li>{item}</li>\n" for item in items) + "</ul>\n"
+    if isinstance(value, Enum):
+        return f"<p>{escape(str(value.value))}</p>\n"
+    return _text(str(value))
+
+
+def _date(value: Optional[datetime]) -> str:
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def _entity_page(ontology: Ontology, entity: BaseEntity, site_title: str) -> str:
+    entity_type = _entity_type(entity)
+    meta = [("Тип объекта", f'<a href="../types/{entity_type}.html">'
+             f"{TYPE_TITLES.get(entity_type, entity_type)}</a>")]
+    status = _status(entity)
+    if status is not None:
+        meta.append(
+            ("Статус", f'<a href="../status/{_status_slug(status)}.html">{escape(status)}</a>')
+        )
+    meta_meta = getattr(entity, "meta_meta", None)
+    if meta_meta is not None:
+        meta.append((COLUMN_LABELS["meta_meta"], escape(meta_meta.value)))
+    for name in ("created", "updated"):
+        if getattr(entity, name, None):
+            meta.append((COLUMN_LABELS[name], _date(getattr(entity, name))))
+    parts = ['<dl class="meta">\n']
+    parts.extend(f"<dt>{label}</dt><dd>{value}</dd>\n" for label, value in meta)
+    parts.append("</dl>\n")
+
+    names = _references(ontology, entity)
+    for name in type(entity).model_fields:
+        value = getattr(entity, name)
+        if name in _HEADER_FIELDS or value in (None, "", [], PLACEHOLDER):
+            continue
+        parts.append(f"<h2>{escape(COLUMN_LABELS.get(name, name))}</h2>\n")
+        parts.append(_value(name, value, names))
+
+    outgoing = _outgoing(ontology, entity)
+    if outgoing:
+        parts.append(f"<h2>{COLUMN_LABELS['relations']}</h2>\n<ul>\n")
+        for relation_type, target, target_name, description in outgoing:
+            note = f" — {escape(description)}" if description else ""
+            parts.append(
+                f'<li><span class="rel">{relation_type}</span> '
+                f"{_link(target, target_name)}{note}</li>\n"
+            )
+        parts.append("</ul>\n")
+
+    backlinks = _backlinks(ontology, entity.id)
+    if backlinks:
+        parts.append("<h2>Обратные ссылки</h2>\n<ul>\n")
+        for source, relation_type, source_name in backlinks:
+            parts.append(
+                f'<li>{_link(source, source_name)} <span class="rel">{relation_type}</span></li>\n'
+            )
+        parts.append("</ul>\n")
+
+    return _layout(
+        f"{entity.id} — {entity.name}", site_title, "".join(parts), "../", ontology.config.language
+    )
+
+
+def _entity_table(entities: Iterable[BaseEntity], root: str) -> str:
+    rows = []
+    for entity in entities:
+        status = _status(entity) or ""
+        meta_meta = getattr(entity, "meta_meta", None)
+        rows.append(
+            f'<tr><td><a href="{root}entities/{escape(entity.id)}.html">'
+            f"{escape(entity.id)}</a></td>"
+            f"<td>{escape(entity.name)}</td><td>{escape(status)}</td>"
+            f"<td>{escape(meta_meta.value) if meta_meta is not None else ''}</td></tr>\n"
+        )
+    if not rows:
+        return "<p>Нет объектов.</p>\n"
+    header = (
+        f"<tr><th>{COLUMN_LABELS['id']}</th><th>{COLUMN_LABELS['name']}</th>"
+        f"<th>{COLUMN_LABELS['status']}</th><th>{COLUMN_LABELS['meta_meta']}</th></tr>\n"
+    )
+    return f"<table>\n{header}{''.join(rows)}</table>\n"
+
+
+def _index_pages(
+    ontology: Ontology, entities: List[BaseEntity], site_title: str
+) -> Dict[str, str]:
+    """Обзор, списки по типам и статусам, индекс поиска: путь → содержимое."""
+    language = ontology.config.language
+    by_type: Dict[str, List[BaseEntity]] = {name: [] for name in ENTITY_REGISTRY}
+    by_status: Dict[str, List[BaseEntity]] = {status: [] for status in STATUS_TITLES}
+    for entity in entities:
+        by_type.setdefault(_entity_type(entity), []).append(entity)
+        status = _status(entity)
+        if status is not None:
+            by_status.setdefault(status, []).append(entity)
+
+    pages: Dict[str, str] = {}
+    for name, members in by_type.items():
+        title = TYPE_TITLES.get(name, name)
+        pages[f"types/{name}.html"] = _layout(
+            title, site_title, _entity_table(members, "../"), "../", language
+        )
+    for status, members in by_status.items():
+        title = f"{STATUS_TITLES.get(status, status)} ({status})"
+        pages[f"status/{_status_slug(status)}.html"] = _layout(
+            title, site_title, _entity_table(members, "../"), "../", language
+        )
+
+    overview = ["<h2>Типы объектов</h2>\n<ul>\n"]
+    overview.extend(
+        f'<li><a href="types/{name}.html">{TYPE_TITLES.get(name, name)}</a>: {len(members)}</li>\n'
+        for name, members in by_type.items()
+    )
+    overview.append("</ul>\n<h2>Статусы понятий</h2>\n<ul>\n")
+    overview.extend(
+        f'<li><a href="status/{_status_slug(status)}.html">{STATUS_TITLES.get(status, status)}</a>'
+        f": {len(members)}</li>\n"
+        for status, members in by_status.items()
+    )
+    overview.append("</ul>\n")
+    pages["index.html"] = _layout(site_title, site_title, "".join(overview), "", language)
+
+    search = [
+        {
+            "id": entity.id,
+            "name": entity.name,
+            "type": _entity_type(entity),
+            "status": _status(entity) or "",
+            "text": _snippet(getattr(entity, "definition", None)),
+        }
+        for entity in entities
+    ]
+    pages["search-index.js"] = (
+        "window.ONTOLOGY_SEARCH = " + json.dumps(search, ensure_ascii=False, indent=0) + ";\n"
+    )
+    for name in _ASSETS:
+        pages[f"assets/{name}"] = (_ASSETS_DIR / name).read_text(encoding="utf-8")
+    return pages
+
+
+def _snippet(definition: Optional[str]) -> str:
+    if not definition or definition == PLACEHOLDER:
+        return ""
+    return definition[:_SNIPPET_LENGTH]
+
+
+def _load_manifest(output: Path) -> Dict[str, str]:
+    try:
+        data = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    pages = data.get("pages") if isinstance(data, dict) else None
+    if not isinstance(pages, dict):
+        return {}
+    if data.get("version") != SITE_FORMAT_VERSION:
+        # Ключи другой версии разметки недействительны, но список страниц
+        # нужен, чтобы удалить страницы исчезнувших объектов
+        return {relative: "" for relative in pages}
+    return pages
+
+
+def build_site(
+    ontology: Ontology,
+    output: Path,
+    title: Optional[str] = None,
+    force: bool = False,
+) -> SiteReport:
+    """
+    Собрать (или обновить) статический сайт онтологии.
+
+    Args:
+        ontology: Онтология (обычно после load_all)
+        output: Каталог сайта
+        title: Заголовок сайта (по умолчанию — название проекта)
+        force: Перерисовать все страницы (манифест нужен только для удаления
+            страниц исчезнувших объектов)
+
+    Returns:
+        Записанные, удалённые и неизменённые страницы
+    """
+    started = time.perf_counter()
+    output = Path(output)
+    site_title = title or ontology.config.project_name
+    previous = _load_manifest(output)
+    entities = sorted(ontology.index.by_id.values(), key=lambda entity: _sort_key(entity.id))
+    keys: Dict[str, str] = {}
+    report = SiteReport()
+
+    with AtomicWriteBatch(fsync=False) as batch:
+
+        def emit(relative: str, key: str, render: Callable[[], str]) -> None:
+            keys[relative] = key
+            if not force and previous.get(relative) == key and (output / relative).exists():
+                report.unchanged += 1
+                return
+            batch.write(output / relative, render().encode("utf-8"))
+            report.written.append(relative)
+
+        for entity in entities:
+            emit(
+                f"entities/{entity.id}.html",
+                entity_page_key(ontology, entity, site_title),
+                lambda entity=entity: _entity_page(ontology, entity, site_title),
+            )
+        for relative, content in _index_pages(ontology, entities, site_title).items():
+            emit(relative, _hash([SITE_FORMAT_VERSION, content]), lambda content=content: content)
+
+        for relative in sorted(set(previous) - set(keys)):
+            batch.remove(output / relative)
+            report.removed.append(relative)
+
+        if force or keys != previous:
+            manifest = {"version": SITE_FORMAT_VERSION, "pages": keys}
+            batch.write(
+                output / MANIFEST_NAME,
+                json.dumps(manifest, ensure_ascii=False, indent=0, sort_keys=True).encode("utf-8"),
+            )
+
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,24 @@
+(function () {
+  var root = document.body.getAttribute("data-root");
+  var input = document.getElementById("search");
+  var results = document.getElementById("search-results");
+  var entries = window.ONTOLOGY_SEARCH || [];
+  input.addEventListener("input", function () {
+    var query = input.value.trim().toLowerCase();
+    results.innerHTML = "";
+    if (!query) { return; }
+    var found = 0;
+    for (var i = 0; i < entries.length && found < 20; i++) {
+      var entry = entries[i];
+      var text = (entry.id + " " + entry.name + " " + entry.text).toLowerCase();
+      if (text.indexOf(query) === -1) { continue; }
+      var item = document.createElement("li");
+      var link = document.createElement("a");
+      link.href = root + "entities/" + entry.id + ".html";
+      link.textContent = entry.id + " — " + entry.name;
+      item.appendChild(link);
+      results.appendChild(item);
+      found++;
+    }
+  });
+})();
@@ -0,0 +1,174 @@
+"""
+Выходные потоки потоковых экспортов.
+
+Экспорт пишет байты в приёмник, открытый `open_output`: файл, stdout (`-`)
+или сжатый поток (gzip из стандартной библиотеки, zstd — опционально,
+пакет `zstandard`). Приёмник считает записанные байты, а `ExportStats`
+собирает строки, объём и время для отчёта о скорости.
+"""
+
+from __future__ import annotations
+
+import gzip
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Literal, Optional, Union
+
+from pydantic import BaseModel
+
+__all__ = [
+    "STDOUT",
+    "Compression",
+    "ExportStats",
+    "OutputStream",
+    "detect_compression",
+    "is_stdout",
+    "open_output",
+]
+
+STDOUT = "-"
+
+Compression = Literal["gzip", "zstd"]
+
+_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+
+class ExportStats(BaseModel):
+    """Итог потокового экспорта (для отчёта о пропускной способности)."""
+
+    rows: int = 0
+    bytes_written: int = 0  # Несжатые данные
+    output_bytes: int = 0  # Фактически записано в приёмник (после сжатия)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+    @property
+    def megabytes_per_second(self) -> float:
+        megabytes = self.bytes_written / 1_000_000
+        return megabytes / self.seconds if self.seconds > 0 else megabytes
+
+    def summary(self) -> str:
+        """Строка для CLI: строки, объём, скорость."""
+        text = (
+            f"{self.rows} строк, {self.bytes_written / 1_000_000:.1f} МБ за {self.seconds:.2f} с "
+            f"({self.rows_per_second:,.0f} строк/с, {self.megabytes_per_second:.1f} МБ/с)"
+        )
+        if self.output_bytes and self.output_bytes != self.bytes_written:
+            text += f", сжато до {self.output_bytes / 1_000_000:.1f} МБ"
+        return text
+
+
+def is_stdout(output: Union[Path, str]) -> bool:
+    """Приёмник — стандартный вывод (`-`)."""
+    return str(output) == STDOUT
+
+
+def detect_compression(output: Union[Path, str]) -> Optional[Compression]:
+    """Сжатие по расширению файла (.gz, .zst) или None."""
+    if is_stdout(output):
+        return None
+    return _SUFFIXES.get(Path(output).suffix.lower())  # type: ignore[return-value]
+
+
+class _CountingWriter:
+    """Обёртка приёмника, считающая фактически записанные байты."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.count = 0
+
+    def write(self, data: bytes) -> int:
+        self.raw.write(data)
+        self.count += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+
+class OutputStream:
+    """Поток экспорта: запись байтов со счётчиками до и после сжатия."""
+
+    def __init__(self, sink: _CountingWriter, stream: Optional[BinaryIO] = None):
+        self._sink = sink
+        self._stream = stream  # Компрессор поверх приёмника или None
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> None:
+        (self._stream or self._sink).write(data)
+        self.bytes_written += len(data)
+
+    @property
+    def output_bytes(self) -> int:
+        return self._sink.count
+
+    def _close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+        self._sink.flush()
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "Сжатие zstd требует пакет zstandard. "
+            "Установите: pip install ontology-toolkit[zstd]"
+        )
+    return zstandard
+
+
+@contextmanager
+def open_output(
+    output: Union[Path, str],
+    compression: Optional[Compression] = None,
+    level: Optional[int] = None,
+) -> Iterator[OutputStream]:
+    """
+    Открыть приёмник экспорта для записи байтов.
+
+    Args:
+        output: Путь к файлу или `-` (stdout)
+        compression: gzip, zstd или None (без сжатия)
+        level: Уровень сжатия (по умолчанию 6 для gzip, 3 для zstd)
+
+    Yields:
+        Поток экспорта (счётчики байтов доступны и после закрытия)
+    """
+    if compression not in (None, "gzip", "zstd"):
+        raise ValueError(f"Неизвестное сжатие: {compression} (доступные: gzip, zstd)")
+    # Зависимость проверяется до создания файла
+    zstandard = _import_zstandard() if compression == "zstd" else None
+
+    if is_stdout(output):
+        raw: BinaryIO = sys.stdout.buffer
+        close_raw = False
+    else:
+        path = Path(output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = open(path, "wb")
+        close_raw = True
+
+    try:
+        sink = _CountingWriter(raw)
+        compressor: Optional[BinaryIO] = None
+        if compression == "gzip":
+            # mtime=0: одинаковые данные дают одинаковый архив
+            compressor = gzip.GzipFile(  # type: ignore[assignment]
+                fileobj=sink, mode="wb", compresslevel=6 if level is None else level, mtime=0
+            )
+        elif zstandard is not None:
+            compressor = zstandard.ZstdCompressor(
+                level=3 if level is None else level
+            ).stream_writer(sink, closefd=False)
+        stream = OutputStream(sink, compressor)
+        yield stream
+        stream._close()
+    finally:
+        if close_raw:
+            raw.close()
@@ -1,146 +1,108 @@
 """
 Экспорт онтологии в XLSX формат (Excel).
 
-Создаёт отдельные вкладки для каждого типа объектов.
+Создаёт отдельные вкладки для каждого типа объектов. Книга пишется
+в режиме write-only openpyxl: строки уходят во временные файлы листов
+по мере добавления, вся книга в памяти не держится.
 """
 
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
-import pandas as pd
+from ontology_toolkit.core.ontology import ENTITY_REGISTRY, Ontology
+from ontology_toolkit.io.columns import column_plan
 
-from ontology_toolkit.core.ontology import Ontology
-from ontology_toolkit.core.schema import BaseEntity
+# Максимальная ширина колонки (символов)
+MAX_COLUMN_WIDTH = 50
 
 
-def export_to_xlsx(ontology: Ontology, output_path: Path) -> Dict[str, int]:
+def export_to_xlsx(
+    ontology: Ontology, output_path: Path, width_sample: int = 1000
+) -> Dict[str, int]:
     """
     Экспортировать онтологию в XLSX файл с вкладками.
     
     Args:
         ontology: Онтология для экспорта
         output_path: Путь к выходному XLSX файлу
+        width_sample: Сколько первых строк вкладки учитывать при подборе ширины колонок
         
     Returns:
         Словарь {имя_вкладки: количество_строк}
     """
+    from openpyxl import Workbook
+    
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    stats = {}
     
-    # Создаём Excel writer
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        stats = {}
+    # Экспортируем каждый тип объектов на отдельную вкладку
+    for config in ENTITY_REGISTRY.values():
+        entities = ontology.index.by_prefix.get(config["prefix"], [])
         
-        # Экспортируем каждый тип объектов на отдельную вкладку
-        prefixes = {
-            "C": "Concepts",
-            "M": "Methods",
-            "S": "Systems",
-            "P": "Problems",
-            "A": "Artifacts"
-        }
+        if not entities:
+            continue
         
-        for prefix, sheet_name in prefixes.items():
-            entities = ontology.index.by_prefix.get(prefix, [])
-            
-            if not entities:
-                continue
-            
-            # Конвертируем в DataFrame
-            data = _entities_to_dict_list(entities)
-            df = pd.DataFrame(data)
-            
-            # Экспортируем на вкладку
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-            
-            # Форматирование
-            worksheet = writer.sheets[sheet_name]
-            _format_worksheet(worksheet, df)
-            
-            stats[sheet_name] = len(entities)
+        sheet_name = config["dir"].capitalize()
+        plan = column_plan((config["model"],), "xlsx")
+        worksheet = workbook.create_sheet(title=sheet_name)
+        stats[sheet_name] = _write_sheet(
+            worksheet, plan.headers(labels=True), plan.rows(entities), width_sample
+        )
     
+    workbook.save(output_path)
     return stats
 
 
-def _entities_to_dict_list(entities: List[BaseEntity]) -> List[Dict[str, Any]]:
+def _write_sheet(
+    worksheet, headers: List[str], rows: Iterable[Tuple[Any, ...]], width_sample: int
+) -> int:
     """
-    Конвертировать список сущностей в список словарей для DataFrame.
+    Записать вкладку: ширины колонок, жирный заголовок, строки.
+    
+    В режиме write-only ширины задаются до первой строки, поэтому они
+    считаются по заголовку и первым `width_sample` строкам (остальные
+    строки идут потоком, без повторного обхода ячеек).
     
-    Args:
-        entities: Список сущностей
-        
     Returns:
-        Список словарей
+        Количество строк данных
     """
-    result = []
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
     
-    for entity in entities:
-        row = {
-            "ID": entity.id,
-            "Название": entity.name,
-            "Определение": entity.definition,
-            "Назначение": entity.purpose,
-            "Примеры": "; ".join(entity.examples) if entity.examples else "",
-            "Связи": "; ".join(
-                [f"{r.type.value}:{r.target}" for r in entity.relations]
-            ) if entity.relations else "",
-            "Создано": entity.created.isoformat() if entity.created else "",
-            "Обновлено": entity.updated.isoformat() if entity.updated else ""
-        }
-        
-        # Дополнительные поля для Concept
-        if hasattr(entity, 'status'):
-            row["Статус"] = entity.status.value
-        
-        if hasattr(entity, 'meta_meta') and entity.meta_meta:
-            row["Тип"] = entity.meta_meta.value
-        
-        # Дополнительные поля для других типов
-        if hasattr(entity, 'steps') and entity.steps:
-            row["Шаги"] = "; ".join(entity.steps)
-        
-        if hasattr(entity, 'components') and entity.components:
-            row["Компоненты"] = "; ".join(entity.components)
-        
-        if hasattr(entity, 'current_state'):
-            row["Текущее состояние"] = entity.current_state or ""
-        
-        if hasattr(entity, 'desired_state'):
-            row["Желаемое состояние"] = entity.desired_state or ""
-        
-        result.append(row)
+    rows = iter(rows)
+    sample = list(islice(rows, width_sample))
+    for index, width in enumerate(_column_widths(headers, sample), start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+    
+    bold = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font = bold
+        header_cells.append(cell)
+    worksheet.append(header_cells)
     
-    return result
+    count = 0
+    for row in chain(sample, rows):
+        # Пустая строка — пустая ячейка (как в прежнем экспорте через DataFrame)
+        worksheet.append([value if value != "" else None for value in row])
+        count += 1
+    return count
 
 
-def _format_worksheet(worksheet, df: pd.DataFrame) -> None:
-    """
-    Форматировать worksheet (жирные заголовки, автоширина).
-    
-    Args:
-        worksheet: Worksheet объект openpyxl
-        df: DataFrame для определения ширины столбцов
-    """
-    from openpyxl.styles import Font
-    
-    # Жирные заголовки
-    for cell in worksheet[1]:
-        cell.font = Font(bold=True)
-    
-    # Автоширина столбцов
-    for column in worksheet.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        
-        for cell in column:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        
-        # Ограничиваем максимальную ширину
-        adjusted_width = min(max_length + 2, 50)
-        worksheet.column_dimensions[column_letter].width = adjusted_width
+def _column_widths(headers: Sequence[str], rows: Iterable[Tuple[Any, ...]]) -> List[int]:
+    """Ширина колонок: самое длинное значение + 2, не больше MAX_COLUMN_WIDTH."""
+    lengths = [len(str(header)) for header in headers]
+    for row in rows:
+        for index, value in enumerate(row):
+            if value:
+                length = len(str(value))
+                if length > lengths[index]:
+                    lengths[index] = length
+    return [min(length + 2, MAX_COLUMN_WIDTH) for length in lengths]
 
 
 class XLSXExporter:
@@ -196,6 +196,44 @@ class TestConceptExtractor:
         assert len(concepts) == 2
         assert concepts[0].name == "Понятие 1"
         assert concepts[1].name == "Понятие 2"
+    
+    def test_extract_drops_semantic_duplicates(self, tmp_path):
+        """Тест отсева семантических дубликатов через индекс эмбеддингов."""
+        from ontology_toolkit.ai.extractor import ConceptExtractor
+        from ontology_toolkit.core.ontology import Ontology
+        
+        ontology = Ontology(tmp_path / ".ontology")
+        existing = ontology.add_concept("Понятие 1")
+        existing.definition = "Определение 1"
+        existing.purpose = "Назначение 1"
+        existing.examples = ["Пример 1"]
+        
+        # «Модель»: мешок слов, разложенный по хэшу в 64 измерения
+        def embed(texts):
+            import zlib
+            vectors = []
+            for text in texts:
+                vector = [0.0] * 64
+                for word in text.lower().split():
+                    vector[zlib.crc32(word.encode("utf-8")) % 64] += 1.0
+                vectors.append(vector)
+            return vectors
+        
+        ontology.use_embeddings(embed, "mock-embedding")
+        provider = MockProvider("test-key")
+        extractor = ConceptExtractor(AIClient(provider), ontology)
+        
+        with patch.object(provider, 'generate', return_value="""
+| name | definition | purpose | meta_meta | examples |
+|------|-----------|---------|-----------|----------|
+| Понятие 1 | Определение 1 | Назначение 1 | характеристика | Пример 1 |
+| Совсем другое понятие | Иное | Прочее | метод | Пример |
+"""):
+            concepts = extractor.extract_from_text("Тестовый текст")
+        
+        assert [c.name for c in concepts] == ["Совсем другое понятие"]
+        assert concepts[0].id == "C_2"
+        assert extractor.duplicates[0][1] == "C_1"
 
 
 @pytest.mark.skipif(
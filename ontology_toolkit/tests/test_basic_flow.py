@@ -16,6 +16,7 @@ from ontology_toolkit.core.schema import (
     Concept,
     ConceptStatus,
     MetaMetaType,
+    Relation,
     RelationType,
 )
 from ontology_toolkit.core.concept import ConceptFile, ConceptFactory
@@ -159,6 +160,205 @@ def test_full_flow(tmp_path: Path):
     onto2.print_audit()
 
 
+def test_dirty_tracking(tmp_path: Path):
+    """Тест dirty-флага: новые и изменённые сущности грязные, загруженные — чистые."""
+    onto = Ontology(tmp_path / ".ontology")
+    c1 = onto.add_concept("Агентность")
+    assert c1.is_dirty
+
+    onto.save_concept(c1)
+    assert not c1.is_dirty
+
+    c1.definition = "Способность действовать"
+    assert c1.is_dirty
+    onto.save_concept(c1)
+
+    c1.add_relation("C_2", RelationType.REQUIRES)
+    assert c1.is_dirty
+    onto.save_concept(c1)
+
+    onto2 = Ontology(tmp_path / ".ontology")
+    onto2.load_all()
+    assert onto2.dirty_entities() == []
+    print("✅ Dirty-флаг работает")
+
+
+def test_save_all_dirty_only(tmp_path: Path):
+    """Тест save_all: пишутся только изменённые, одинаковые байты не перезаписываются."""
+    onto = Ontology(tmp_path / ".ontology")
+    for name in ("Агентность", "Стратегирование", "Личный контракт"):
+        onto.add_concept(name)
+    assert len(onto.save_all()) == 3
+
+    onto2 = Ontology(tmp_path / ".ontology")
+    onto2.load_all()
+    files = {p.name: p.stat().st_mtime_ns for p in onto2.concepts_dir.glob("*.md")}
+
+    onto2.get_concept("C_2").purpose = "Переводить неудовлетворённости в проекты"
+    saved = onto2.save_all()
+    assert [p.name for p in saved] == [p for p in files if p.startswith("C_2_")]
+
+    # Полный проход без изменений не трогает файлы
+    onto2.save_all(dirty_only=False)
+    for path in onto2.concepts_dir.glob("*.md"):
+        if not path.name.startswith("C_2_"):
+            assert path.stat().st_mtime_ns == files[path.name]
+    print("✅ save_all работает")
+
+
+def test_save_all_keeps_in_place_list_edits(tmp_path: Path):
+    """Правка списка на месте (append в examples) помечает сущность и сохраняется."""
+    onto = Ontology(tmp_path / ".ontology")
+    concept = onto.add_concept("Агентность")
+    onto.save_all()
+    assert not concept.is_dirty
+
+    concept.examples.append("Взять ответственность за проект")
+    assert concept.is_dirty
+    assert len(onto.save_all()) == 1
+
+    onto2 = Ontology(tmp_path / ".ontology")
+    onto2.load_all()
+    loaded = onto2.get_concept("C_1")
+    assert loaded.examples == ["Взять ответственность за проект"]
+
+    # Копии и присвоенные списки — собственные списки новой сущности
+    copy = loaded.model_copy()
+    copy.mark_clean()
+    copy.examples.append("Ещё")
+    assert copy.is_dirty and not loaded.is_dirty
+    loaded.examples = []
+    loaded.mark_clean()
+    loaded.examples.append("Снова")
+    assert loaded.is_dirty
+
+
+def test_render_cache():
+    """Отрисовка кэшируется по содержимому сущности."""
+    from ontology_toolkit.core.concept import clear_render_cache, entity_to_markdown
+
+    concept = ConceptFactory.create_filled(
+        name="Агентность",
+        definition="Способность действовать",
+        purpose="Для развития",
+        meta_meta=MetaMetaType.CHARACTERISTIC,
+        examples=["Пример"],
+        concept_id="C_1",
+    )
+    concept.add_relation("C_2", RelationType.RELATES_TO, "связь «с кавычками»: да")
+    clear_render_cache()
+
+    first = entity_to_markdown(concept)
+    assert entity_to_markdown(concept) is first
+
+    # Изменение на месте (без присваивания) тоже меняет отпечаток
+    concept.examples.append("Новый пример")
+    assert "Новый пример" in entity_to_markdown(concept)
+
+
+def test_trusted_copy_is_independent():
+    """Копия из кэша без валидации равна оригиналу и не делит с ним списки."""
+    concept = Concept(id="C_1", name="Агентность", definition="d", purpose="p", examples=["x"])
+    concept.add_relation("C_2", RelationType.REQUIRES)
+    concept.mark_clean()
+
+    copy = concept.trusted_copy()
+    assert copy == concept
+    assert not copy.is_dirty
+
+    copy.examples.append("y")
+    copy.relations[0].target = "C_3"
+    copy.name = "Другое"
+    assert concept.examples == ["x"]
+    assert concept.relations[0].target == "C_2"
+    assert concept.name == "Агентность"
+    assert copy.is_dirty and not concept.is_dirty
+
+
+def test_content_fingerprint(tmp_path: Path):
+    """Отпечаток не зависит от дат и порядка связей, кэшируется и сбрасывается при изменении."""
+    onto = Ontology(tmp_path / ".ontology")
+    concept = onto.add_concept("Агентность")
+    concept.add_relation("C_2", RelationType.REQUIRES)
+    concept.add_relation("C_3", RelationType.ENABLES)
+    snapshot = onto.index.fingerprints()
+    before = concept.fingerprint
+
+    concept.updated = datetime(2030, 1, 1)
+    concept.relations = list(reversed(concept.relations))
+    assert concept.fingerprint == before
+    assert onto.index.changed_since(snapshot) == []
+
+    concept.examples.append("Пример")  # Правка на месте сбрасывает кэш отпечатка
+    assert concept.fingerprint != before
+    edited = concept.fingerprint
+    concept.examples[0] = "Другой пример"
+    assert concept.fingerprint != edited
+    concept.definition = "Новое определение"
+    assert onto.index.changed_since(snapshot) == ["C_1"]
+
+    reloaded = Concept.model_validate(concept.model_dump())
+    assert reloaded.fingerprint == concept.fingerprint
+
+
+def test_relation_bulk_operations_and_events(tmp_path: Path):
+    """Пакетные операции со связями: дубликаты, события, граф и обратные ссылки."""
+    onto = Ontology(tmp_path / ".ontology")
+    hub = onto.add_concept("Агентность")
+    for name in ("Проект", "Роль", "Метод"):
+        onto.add_concept(name)
+    onto._build_graph()
+    events = []
+    hub.subscribe_relations(events.append)
+
+    added = hub.add_relations(
+        [
+            Relation(type=RelationType.REQUIRES, target="C_2"),
+            Relation(type=RelationType.REQUIRES, target="C_2"),  # дубликат
+            Relation(type=RelationType.ENABLES, target="C_3"),
+            Relation(type=RelationType.RELATES_TO, target="C_99"),  # нет такого объекта
+        ]
+    )
+    assert [r.target for r in added] == ["C_2", "C_3", "C_99"]
+    assert not hub.add_relation("C_2", RelationType.REQUIRES)
+    assert len(events) == 1 and len(events[0].added) == 3
+    assert onto.graph.has_edge("C_1", "C_2") and onto.graph.has_edge("C_1", "C_3")
+    assert onto.index.linked_from("C_99") == {"C_1"}
+
+    removed = hub.remove_relations([("C_2", None), ("C_99", RelationType.RELATES_TO)])
+    assert {r.target for r in removed} == {"C_2", "C_99"}
+    assert [r.target for r in hub.relations] == ["C_3"]
+    assert not onto.graph.has_edge("C_1", "C_2")
+    assert onto.index.linked_from("C_2") == set()
+
+    change = hub.replace_relations([Relation(type=RelationType.PART_OF, target="C_4")])
+    assert [r.target for r in change.added] == ["C_4"]
+    assert [r.target for r in change.removed] == ["C_3"]
+    assert list(onto.graph.successors("C_1")) == ["C_4"]
+    assert onto.index.linked_from("C_4") == {"C_1"}
+
+    # Правки списка на месте тоже обновляют индекс связей, граф и обратные ссылки
+    hub.relations.append(Relation(type=RelationType.REQUIRES, target="C_2"))
+    assert hub.has_relation("C_2", RelationType.REQUIRES)
+    assert onto.graph.has_edge("C_1", "C_2")
+    assert onto.index.linked_from("C_2") == {"C_1"}
+
+    hub.mark_clean()
+    hub.relations[0] = Relation(type=RelationType.PART_OF, target="C_3")  # та же длина
+    assert hub.is_dirty
+    assert hub.has_relation("C_3", RelationType.PART_OF)
+    assert not hub.has_relation("C_4")
+    assert not onto.graph.has_edge("C_1", "C_4") and onto.graph.has_edge("C_1", "C_3")
+    assert onto.index.linked_from("C_4") == set()
+    assert onto.index.linked_from("C_3") == {"C_1"}
+
+    del hub.relations[1]
+    assert not hub.has_relation("C_2")
+    assert onto.index.linked_from("C_2") == set()
+    assert [r.target for r in events[-1].removed] == ["C_2"]
+    assert hub.trusted_copy()._relation_listeners == []
+
+
 if __name__ == "__main__":
     import tempfile
     
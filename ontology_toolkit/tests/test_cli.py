@@ -250,6 +250,125 @@ def test_graph_command(tmp_path: Path):
     assert "C_1" in content
 
 
+def test_init_sharded_and_layout_command(tmp_path: Path):
+    """init --layout sharded пишет ontology.yaml, layout переносит файлы."""
+    ontology_path = tmp_path / ".ontology"
+    result = runner.invoke(app, ["init", "--path", str(ontology_path), "--layout", "sharded"])
+    assert result.exit_code == 0
+    assert "layout: sharded" in (ontology_path / "ontology.yaml").read_text(encoding="utf-8")
+
+    runner.invoke(app, ["add", "Агентность", "--path", str(ontology_path)])
+    assert len(list((ontology_path / "concepts" / "00").glob("C_1_*.md"))) == 1
+
+    result = runner.invoke(app, ["layout", "flat", "--path", str(ontology_path)])
+    assert result.exit_code == 0
+    assert len(list((ontology_path / "concepts").glob("C_1_*.md"))) == 1
+    assert not (ontology_path / "concepts" / "00").exists()
+
+    result = runner.invoke(app, ["layout", "diagonal", "--path", str(ontology_path)])
+    assert result.exit_code == 1
+
+
+def test_validate_command(tmp_path: Path):
+    """validate: код 0 для корректной онтологии, 1 и список ошибок для испорченной."""
+    ontology_path = tmp_path / ".ontology"
+    runner.invoke(app, ["init", "--path", str(ontology_path)])
+    runner.invoke(app, ["add", "Агентность", "--path", str(ontology_path)])
+
+    result = runner.invoke(app, ["validate", "--path", str(ontology_path)])
+    assert result.exit_code == 0
+    assert "ошибок нет" in result.stdout
+
+    broken = ontology_path / "concepts" / "C_2_broken.md"
+    broken.write_text(
+        "---\nid: C_2\nname: Broken\nrelations:\n  - type: bogus\n    target: C_1\n---\n",
+        encoding="utf-8",
+    )
+    result = runner.invoke(app, ["validate", "--path", str(ontology_path)])
+    assert result.exit_code == 1
+    assert "C_2_broken.md" in result.stdout
+    assert "relations[1]" in result.stdout
+
+
+def test_export_csv_to_stdout(tmp_path: Path):
+    """export -o -: в stdout только данные CSV (сообщения — в stderr)."""
+    ontology_path = tmp_path / ".ontology"
+    runner.invoke(app, ["init", "--path", str(ontology_path)])
+    runner.invoke(app, ["add", "Понятие 1", "--path", str(ontology_path)])
+
+    result = runner.invoke(app, [
+        "export", "--output", "-", "--columns", "id,name", "--path", str(ontology_path)
+    ])
+
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == ["id,name", "C_1,Понятие 1"]
+
+
+def test_export_parquet_and_import(tmp_path: Path):
+    """export --format parquet и import в другую онтологию."""
+    pytest.importorskip("pyarrow")
+    source = tmp_path / "source" / ".ontology"
+    target = tmp_path / "target" / ".ontology"
+    table = tmp_path / "ontology.parquet"
+    runner.invoke(app, ["init", "--path", str(source)])
+    runner.invoke(app, ["add", "Понятие 1", "--path", str(source)])
+    runner.invoke(app, ["init", "--path", str(target)])
+
+    result = runner.invoke(app, [
+        "export", "--format", "parquet", "--output", str(table), "--path", str(source)
+    ])
+    assert result.exit_code == 0, result.stdout
+    assert (tmp_path / "ontology.relations.parquet").exists()
+
+    result = runner.invoke(app, ["import", str(table), "--path", str(target)])
+    assert result.exit_code == 0, result.stdout
+    assert "Добавлено: 1" in result.stdout
+    assert list((target / "concepts").glob("C_1_*.md"))
+
+
+def test_export_filters_apply_to_every_format(tmp_path: Path):
+    """--prefix отбирает объекты не только в CSV, но и в RDF, графах и Parquet."""
+    ontology_path = tmp_path / ".ontology"
+    runner.invoke(app, ["init", "--path", str(ontology_path)])
+    runner.invoke(app, ["add", "Понятие 1", "--path", str(ontology_path)])
+    runner.invoke(app, ["add", "Метод 1", "--type", "method", "--path", str(ontology_path)])
+
+    for format in ("turtle", "dot"):
+        result = runner.invoke(app, [
+            "export", "--format", format, "--output", "-", "--prefix", "M",
+            "--path", str(ontology_path),
+        ])
+        assert result.exit_code == 0, result.stdout
+        assert "M_1" in result.stdout and "C_1" not in result.stdout
+
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    table = tmp_path / "methods.parquet"
+    result = runner.invoke(app, [
+        "export", "--format", "parquet", "--output", str(table), "--prefix", "M",
+        "--path", str(ontology_path),
+    ])
+    assert result.exit_code == 0, result.stdout
+    assert pq.read_table(table).column("id").to_pylist() == ["M_1"]
+
+
+def test_site_command(tmp_path: Path):
+    """site: сборка и повторная сборка без изменений."""
+    ontology_path = tmp_path / ".ontology"
+    site = tmp_path / "site"
+    runner.invoke(app, ["init", "--path", str(ontology_path)])
+    runner.invoke(app, ["add", "Понятие 1", "--path", str(ontology_path)])
+
+    result = runner.invoke(app, ["site", "--output", str(site), "--path", str(ontology_path)])
+    assert result.exit_code == 0, result.stdout
+    assert (site / "entities" / "C_1.html").exists()
+    assert (site / "index.html").exists()
+
+    result = runner.invoke(app, ["site", "--output", str(site), "--path", str(ontology_path)])
+    assert result.exit_code == 0, result.stdout
+    assert "обновлено: 0" in result.stdout
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-
@@ -0,0 +1,167 @@
+"""
+Тесты чтения ревизий онтологии из Git.
+"""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from ontology_toolkit.cli.main import app
+from ontology_toolkit.core.diff import diff_revisions
+from ontology_toolkit.core.gitstore import GitObjectStore, parse_cache
+from ontology_toolkit.core.ontology import Ontology
+from ontology_toolkit.core.schema import MetaMetaType, RelationType
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="Требуется git")
+
+runner = CliRunner()
+
+
+def git(repo: Path, *args: str) -> str:
+    """Выполнить git-команду в тестовом репозитории."""
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    """Репозиторий с двумя коммитами онтологии."""
+    git(tmp_path, "init", "-q")
+    root = tmp_path / ".ontology"
+
+    onto = Ontology(root)
+    c1 = onto.add_concept("Агентность")
+    c1.definition = "Способность действовать"
+    c1.purpose = "Брать ответственность"
+    c2 = onto.add_concept("Стратегирование")
+    c2.definition = "Работа с неудовлетворённостями"
+    c2.purpose = "Выбирать проекты"
+    c3 = onto.add_concept("Спринт")
+    c3.definition = "Недельный план"
+    c3.purpose = "Планировать неделю"
+    for concept in (c1, c2, c3):
+        onto.save_concept(concept)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "first")
+
+    # Вторая ревизия: C_2 изменено, C_3 удалено, C_4 добавлено
+    c2.meta_meta = MetaMetaType.METHOD
+    c2.add_relation("C_1", RelationType.REQUIRES)
+    onto.save_concept(c2)
+    next(root.joinpath("concepts").glob("C_3_*.md")).unlink()
+    c4 = onto.add_concept("Экзокортекс")
+    c4.definition = "Внешняя память"
+    c4.purpose = "Хранить знания"
+    c4.add_relation("C_2", RelationType.RELATES_TO)
+    onto.save_concept(c4)
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "second")
+    return tmp_path
+
+
+def test_object_store_reads_without_checkout(repo: Path):
+    """Дерево и blob'ы читаются из объектов Git."""
+    with GitObjectStore(repo / ".ontology") as store:
+        tree = dict(store.list_tree("HEAD~1"))
+        assert len(tree) == 3
+        path = next(p for p in tree if p.startswith("concepts/C_3_"))
+        assert "Спринт" in store.read_blob(tree[path]).decode("utf-8")
+
+
+def test_load_at_reuses_parsed_blobs(repo: Path):
+    """load_at загружает ревизию без checkout; общие файлы разбираются один раз."""
+    parse_cache.clear()
+    hits, misses = parse_cache.hits, parse_cache.misses
+    onto = Ontology(repo / ".ontology")
+
+    with GitObjectStore(onto.root_path) as store:
+        old_commit = onto.load_at("HEAD~1", store=store)
+        assert sorted(onto.index.by_id) == ["C_1", "C_2", "C_3"]
+        assert onto.get_concept("C_2").meta_meta is None
+        assert not onto.get_concept("C_2").is_dirty
+
+        onto.load_at("HEAD", store=store)
+        assert sorted(onto.index.by_id) == ["C_1", "C_2", "C_4"]
+        assert onto.get_concept("C_2").meta_meta == MetaMetaType.METHOD
+        assert onto.graph.has_edge("C_4", "C_2")
+
+    assert old_commit == git(repo, "rev-parse", "HEAD~1")
+    # 3 файла первой ревизии + 2 новых blob'а второй; C_1 взят из кэша
+    assert parse_cache.misses - misses == 5
+    assert parse_cache.hits - hits == 1
+
+
+def test_diff_revisions(repo: Path):
+    """Diff показывает добавленные/удалённые/изменённые сущности и рёбра."""
+    result = diff_revisions(repo / ".ontology", "HEAD~1", "HEAD")
+
+    assert [s.id for s in result.added] == ["C_4"]
+    assert [s.id for s in result.removed] == ["C_3"]
+    assert [c.id for c in result.changed] == ["C_2"]
+    assert result.unchanged == 1
+
+    changed_fields = {f.field: f for f in result.changed[0].fields}
+    assert changed_fields["meta_meta"].old is None
+    assert changed_fields["meta_meta"].new == "Метод"
+
+    added_edges = {str(edge) for edge in result.relations_added}
+    assert added_edges == {"C_2 -[requires]-> C_1", "C_4 -[relates_to]-> C_2"}
+    assert result.relations_removed == []
+
+
+def test_diff_command_json(repo: Path):
+    """Команда diff выводит машиночитаемый результат."""
+    result = runner.invoke(
+        app, ["diff", "HEAD~1", "HEAD", "--json", "--path", str(repo / ".ontology")]
+    )
+
+    assert result.exit_code == 0
+    payload = json.loads(result.stdout)
+    assert payload["added"][0]["id"] == "C_4"
+    assert payload["removed"][0]["id"] == "C_3"
+
+
+def test_diff_ignores_timestamp_only_changes(repo: Path):
+    """Файл, в котором изменилась только дата updated, не считается изменённым."""
+    from datetime import datetime
+
+    onto = Ontology(repo / ".ontology")
+    onto.load_all()
+    concept = onto.get_concept("C_1")
+    concept.updated = datetime(2030, 1, 1)
+    onto.save_concept(concept)
+    git(repo, "commit", "-q", "-am", "touch")
+
+    result = diff_revisions(repo / ".ontology", "HEAD~1", "HEAD")
+
+    assert result.is_empty
+    assert result.touched == 1
+
+
+def test_diff_fields_skip_timestamps(repo: Path):
+    """Отметки времени не попадают в изменённые поля без --timestamps."""
+    from datetime import datetime
+
+    onto = Ontology(repo / ".ontology")
+    onto.load_all()
+    concept = onto.get_concept("C_1")
+    concept.purpose = "Отвечать за результат"
+    concept.updated = datetime(2030, 1, 1)
+    onto.save_concept(concept)
+    git(repo, "commit", "-q", "-am", "edit")
+
+    result = diff_revisions(repo / ".ontology", "HEAD~1", "HEAD")
+    assert [f.field for f in result.changed[0].fields] == ["purpose"]
+
+    result = diff_revisions(repo / ".ontology", "HEAD~1", "HEAD", timestamps=True)
+    assert {f.field for f in result.changed[0].fields} == {"purpose", "updated"}
@@ -190,6 +190,363 @@ def test_xlsx_export_with_relations(sample_ontology: Ontology, tmp_path: Path):
     assert "enables:C_2" in relations
 
 
+
+def test_xlsx_column_widths_from_sample(sample_ontology: Ontology, tmp_path: Path):
+    """Ширины колонок задаются до строк (write-only) по заголовку и первым строкам."""
+    from openpyxl import load_workbook
+
+    output_path = tmp_path / "widths.xlsx"
+    sample_ontology.get_concept("C_3").definition = "Д" * 80
+
+    export_to_xlsx(sample_ontology, output_path, width_sample=2)
+
+    sheet = load_workbook(output_path)["Concepts"]
+    assert sheet["A1"].font.b
+    assert sheet.column_dimensions["A"].width == len("C_1") + 2
+    # Длинное определение C_3 вне выборки: ширина по первым строкам
+    assert sheet.column_dimensions["C"].width == len("Характеристика личности") + 2
+    assert sheet.max_row == 4
+    assert sheet["C4"].value == "Д" * 80
+
+
+def test_parquet_roundtrip(sample_ontology: Ontology, tmp_path: Path):
+    """Parquet: типизированные колонки, таблица связей, импорт без потерь."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    from ontology_toolkit.io.parquet_io import (
+        export_to_parquet,
+        import_parquet,
+        load_parquet,
+        relations_path,
+    )
+
+    method = sample_ontology.create_entity("Недельная сессия", "method")
+    method.steps = ["Собрать", "Приоритизировать"]
+    output_path = tmp_path / "ontology.parquet"
+
+    counts = export_to_parquet(sample_ontology, output_path, batch_size=2)
+
+    assert counts == {"entities": 4, "relations": 3}
+    table = pq.read_table(output_path)
+    assert str(table.schema.field("examples").type) == "list<element: string>"
+    assert str(table.schema.field("created").type) == "timestamp[us]"
+    assert "dictionary" in str(table.schema.field("status").type)
+    rows = {row["id"]: row for row in table.to_pylist()}
+    assert rows["C_1"]["examples"] == ["Пример 1", "Пример 2"]
+    assert rows["M_1"]["type"] == "method" and rows["M_1"]["status"] is None
+    edges = pq.read_table(relations_path(output_path)).to_pylist()
+    assert {"source": "C_3", "type": "enables", "target": "C_2", "description": None} in edges
+
+    loaded = load_parquet(output_path, tmp_path / "copy" / ".ontology")
+    for entity_id, entity in sample_ontology.index.by_id.items():
+        assert loaded.index.get(entity_id).fingerprint == entity.fingerprint
+    assert loaded.graph.has_edge("C_3", "C_2")
+
+    loaded.get_concept("C_1").purpose = "Новое назначение"
+    export_to_parquet(loaded, output_path)
+    report = import_parquet(sample_ontology, output_path)
+    assert report.updated == ["C_1"] and report.added == [] and report.unchanged == 3
+    assert sample_ontology.get_concept("C_1").purpose == "Новое назначение"
+
+
+def test_mermaid_filters_groups_and_pages(sample_ontology: Ontology, tmp_path: Path):
+    """Mermaid: окрестность, фильтр типов связей, subgraph по типам, страницы со ссылками."""
+    from ontology_toolkit.io.mermaid import neighbourhood, write_mermaid
+
+    extra = sample_ontology.add_concept("Изолированное")
+    method = sample_ontology.create_entity("Недельная сессия", "method")
+    method.add_relation("C_3", RelationType.PART_OF)
+
+    assert neighbourhood(sample_ontology, "C_2") == ["C_2", "C_1", "C_3"]
+    assert set(neighbourhood(sample_ontology, "C_2", depth=2)) == {"C_1", "C_2", "C_3", "M_1"}
+    assert neighbourhood(sample_ontology, "C_3", relation_types=[RelationType.PART_OF]) == ["C_3", "M_1"]
+
+    output = tmp_path / "graph.mmd"
+    report = write_mermaid(
+        sample_ontology, output, focus="C_1", depth=2, relation_types=[RelationType.REQUIRES]
+    )
+    text = output.read_text(encoding="utf-8")
+    assert report.nodes == 3 and report.edges == 2
+    assert "enables" not in text and extra.id not in text
+
+    # Разбивка на страницы убирает файл без номера, лишние номера прошлой разбивки тоже;
+    # файлы с похожими именами, которые записал не write_mermaid, остаются
+    user_file = tmp_path / "graph.2024.mmd"
+    user_file.write_text("graph LR\n", encoding="utf-8")
+    assert len(write_mermaid(sample_ontology, output, page_size=2).pages) == 3
+    assert not output.exists()
+    report = write_mermaid(sample_ontology, output, group_by="type", page_size=3)
+    assert len(report.pages) == 2
+    assert report.removed == [str(tmp_path / "graph.3.mmd")]
+    first, second = (Path(page).read_text(encoding="utf-8") for page in report.pages)
+    assert first.startswith("graph TD\n    %% Страница 1 из 2")
+    assert 'subgraph grp_concept["concepts"]' in first
+    assert 'subgraph grp_method["methods"]' in second
+    # C_3 → C_2 на одной странице, M_1 → C_3 — ссылка на первую страницу
+    assert "C_3 -->|enables| C_2" in first
+    assert 'C_3_ref["→ C_3 (стр. 1)"]:::ref' in second
+    assert "M_1 -->|part_of| C_3_ref" in second
+    assert report.edges == 4 and report.cross_page_edges == 1
+
+    report = write_mermaid(sample_ontology, output, group_by="community")
+    assert "subgraph grp_community_1" in output.read_text(encoding="utf-8")
+    assert sorted(path.name for path in tmp_path.glob("graph*.mmd")) == [
+        "graph.2024.mmd",
+        "graph.mmd",
+    ]
+    assert user_file.read_text(encoding="utf-8") == "graph LR\n"
+
+
+def test_bundle_pack_unpack_roundtrip(sample_ontology: Ontology, tmp_path: Path):
+    """Пакет распаковывается с проверкой хэшей, совпадающие файлы пропускаются."""
+    from ontology_toolkit.io.bundle import pack_ontology, unpack_bundle
+
+    sample_ontology.save_all()
+    bundle = tmp_path / "onto.zip"
+    manifest = pack_ontology(sample_ontology.root_path, bundle)
+    assert manifest.entity_count == 3
+    assert len(manifest.files) == 3
+
+    target = tmp_path / "copy" / ".ontology"
+    report = unpack_bundle(bundle, target)
+    assert len(report.written) == 3 and not report.errors
+    assert Ontology(target).path_for("C_2").exists()
+
+    again = unpack_bundle(bundle, target)
+    assert again.written == [] and len(again.skipped) == 3
+
+    # Локальный файл той же сущности под старым именем удаляется
+    stale = Ontology(target).path_for("C_2").with_name("C_2_staroe_imya.md")
+    Ontology(target).path_for("C_2").rename(stale)
+    report = unpack_bundle(bundle, target)
+    assert report.removed == [stale.relative_to(target).as_posix()]
+    assert not stale.exists()
+    reloaded = Ontology(target)
+    reloaded.load_all()
+    assert sorted(reloaded.index.by_id) == ["C_1", "C_2", "C_3"]
+    assert reloaded.get_concept("C_2").meta_meta == MetaMetaType.METHOD
+    assert len(list(reloaded.concepts_dir.glob("C_2_*.md"))) == 1
+
+
+def test_bundle_detects_corruption(sample_ontology: Ontology, tmp_path: Path):
+    """Файл с неверным хэшем не распаковывается."""
+    import zipfile
+
+    from ontology_toolkit.io.bundle import pack_ontology, unpack_bundle
+
+    sample_ontology.save_all()
+    bundle = tmp_path / "onto.zip"
+    manifest = pack_ontology(sample_ontology.root_path, bundle)
+    broken = tmp_path / "broken.zip"
+    victim = "files/" + manifest.files[0].path
+    with zipfile.ZipFile(bundle) as source, zipfile.ZipFile(broken, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            target.writestr(item, b"tampered" if item.filename == victim else data)
+
+    report = unpack_bundle(broken, tmp_path / "copy")
+    assert len(report.errors) == 1
+    assert len(report.written) == 2
+
+
+def test_column_plan_per_type(sample_ontology: Ontology, tmp_path: Path):
+    """Колонки выводятся из полей модели: у методов — шаги, в общем CSV — пустой status."""
+    from ontology_toolkit.core.schema import Concept, Method
+    from ontology_toolkit.io.columns import column_plan
+
+    method = sample_ontology.create_entity("Недельная сессия", "method")
+    method.steps = ["Собрать", "Приоритизировать"]
+
+    assert column_plan((Method,), "xlsx") is column_plan((Method,), "xlsx")
+    method_plan = column_plan((Method,), "xlsx")
+    assert "Шаги" in method_plan.headers(labels=True)
+    assert "Статус" not in method_plan.headers(labels=True)
+    assert method_plan.row(method)[method_plan.headers().index("steps")] == "Собрать; Приоритизировать"
+
+    output_path = tmp_path / "mixed.csv"
+    assert export_concepts_to_csv(sample_ontology, output_path) == 4
+    with open(output_path, encoding="utf-8-sig") as f:
+        rows = {row["id"]: row for row in csv.DictReader(f)}
+    assert rows["C_1"]["status"] == "draft+filled"
+    assert rows["C_1"]["meta_meta"] == "Характеристика"
+    assert rows["M_1"]["status"] == ""
+    assert rows["M_1"]["steps"] == "Собрать; Приоритизировать"
+
+    stats = export_to_xlsx(sample_ontology, tmp_path / "mixed.xlsx")
+    assert stats == {"Concepts": 3, "Methods": 1}
+    df = pd.read_excel(tmp_path / "mixed.xlsx", sheet_name="Methods")
+    assert df.iloc[0]["Шаги"] == "Собрать; Приоритизировать"
+    assert list(column_plan((Concept,), "csv").headers()[:4]) == ["id", "name", "definition", "purpose"]
+
+
+def test_stream_csv_gzip_and_columns(sample_ontology: Ontology, tmp_path: Path):
+    """Потоковый CSV: сжатие по расширению, выбор колонок, запись пачками."""
+    import gzip
+
+    from ontology_toolkit.io.csv_export import iter_entities, stream_csv
+
+    output_path = tmp_path / "export.csv.gz"
+    stats = stream_csv(
+        iter_entities(sample_ontology),
+        output_path,
+        columns=["id", "status", "relations"],
+        chunk_size=2,
+    )
+
+    assert stats.rows == 3
+    assert stats.output_bytes == output_path.stat().st_size
+    with gzip.open(output_path, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "status", "relations"]  # Без BOM в сжатом потоке
+    assert rows[3] == ["C_3", "approved", "requires:C_1; enables:C_2"]
+    assert stats.bytes_written == len(
+        gzip.decompress(output_path.read_bytes())
+    )
+
+    with pytest.raises(ValueError, match="Неизвестные колонки"):
+        stream_csv(iter_entities(sample_ontology), tmp_path / "bad.csv", columns=["nope"])
+
+
+def test_rdf_export_turtle_and_jsonld(sample_ontology: Ontology, tmp_path: Path):
+    """Turtle и JSON-LD: словарь ot:, связи как ссылки, одинаковый граф."""
+    import gzip
+    import json
+
+    from ontology_toolkit.io.rdf_export import stream_rdf
+
+    sample_ontology.get_concept("C_1").notes = 'Цитата "в кавычках"\nвторая строка'
+    sample_ontology.get_concept("C_3").relations[0].description = "через договорённости"
+    turtle = tmp_path / "ontology.ttl"
+    stats = stream_rdf(sample_ontology, turtle, "turtle")
+
+    assert stats.rows == 3
+    text = turtle.read_text(encoding="utf-8")
+    assert "@prefix ot: <urn:ontology-toolkit:vocab#> ." in text
+    assert '<urn:ontology:C_3>\n    a ot:Concept ;' in text
+    assert "ot:requires <urn:ontology:C_1>" in text
+    assert "ot:metaMeta ot:Characteristic" in text
+    assert 'skos:note "Цитата \\"в кавычках\\"\\nвторая строка"@ru' in text
+    relation = sample_ontology.get_concept("C_3").relations[0]
+    statement = f"<urn:ontology:C_3/{relation.type.value}/{relation.target}>"
+    assert f"{statement}\n    a rdf:Statement ;" in text
+    assert 'rdfs:comment "через договорённости"@ru' in text
+
+    jsonld = tmp_path / "ontology.jsonld.gz"
+    stream_rdf(
+        sample_ontology,
+        jsonld,
+        "jsonld",
+        base="https://example.org/onto/",
+        vocabulary="https://example.org/vocab#",
+    )
+    document = json.loads(gzip.decompress(jsonld.read_bytes()))
+    assert document["@context"]["ot"] == "https://example.org/vocab#"
+    nodes = {node["@id"]: node for node in document["@graph"]}
+    c3 = nodes["https://example.org/onto/C_3"]
+    assert c3["ot:enables"] == [{"@id": "https://example.org/onto/C_2"}]
+    assert c3["rdfs:label"] == [{"@value": "Личный контракт", "@language": "ru"}]
+
+    rdflib = pytest.importorskip("rdflib")
+    from rdflib.compare import isomorphic
+
+    stream_rdf(sample_ontology, tmp_path / "plain.jsonld", "jsonld")
+    graph = rdflib.Graph().parse(turtle, format="turtle")
+    assert isomorphic(graph, rdflib.Graph().parse(tmp_path / "plain.jsonld", format="json-ld"))
+
+
+def test_graph_export_graphml_gexf_dot(sample_ontology: Ontology, tmp_path: Path):
+    """GraphML/GEXF читаются networkx с атрибутами; DOT экранирует кавычки."""
+    import networkx as nx
+
+    from ontology_toolkit.io.graph_export import stream_graph
+
+    sample_ontology.get_concept("C_1").name = 'Агентность "A&B"'
+    stats = stream_graph(sample_ontology, tmp_path / "graph.graphml", "graphml")
+    assert (stats.rows, stats.edges) == (3, 3)
+
+    graph = nx.read_graphml(tmp_path / "graph.graphml")
+    assert graph.nodes["C_1"] == {
+        "label": 'Агентность "A&B"', "type": "concept", "status": "draft+filled",
+        "meta_meta": "Характеристика",
+    }
+    assert graph.edges["C_3", "C_2"]["relation"] == "enables"
+
+    stream_graph(sample_ontology, tmp_path / "graph.gexf", "gexf")
+    gexf = nx.read_gexf(tmp_path / "graph.gexf")
+    assert gexf.nodes["C_3"]["status"] == "approved"
+    assert sorted(gexf.edges) == [("C_2", "C_1"), ("C_3", "C_1"), ("C_3", "C_2")]
+    assert gexf.edges["C_2", "C_1"]["relation"] == "requires"
+
+    stream_graph(
+        sample_ontology, tmp_path / "graph.dot", "dot", relation_types=[RelationType.ENABLES]
+    )
+    text = (tmp_path / "graph.dot").read_text(encoding="utf-8")
+    assert text.startswith("digraph ontology {")
+    assert '"C_1" [label="Агентность \\"A&B\\"", type="concept"' in text
+    assert '"C_3" -> "C_2" [label="enables", relation="enables"];' in text
+    assert "requires" not in text
+
+    # Выборка: узлы — только отобранные объекты, рёбра — только между ними
+    subset = [sample_ontology.get_concept("C_2"), sample_ontology.get_concept("C_3")]
+    stats = stream_graph(sample_ontology, tmp_path / "subset.dot", "dot", entities=subset)
+    assert (stats.rows, stats.edges) == (2, 1)
+    assert '"C_1"' not in (tmp_path / "subset.dot").read_text(encoding="utf-8")
+
+
+def test_site_incremental_rebuild(sample_ontology: Ontology, tmp_path: Path):
+    """Сайт: обратные ссылки, поиск; повторная сборка пишет только изменённое."""
+    import json
+
+    from ontology_toolkit.io.site import MANIFEST_NAME, build_site
+
+    site = tmp_path / "site"
+    first = build_site(sample_ontology, site, title="Глоссарий")
+    assert "entities/C_1.html" in first.written and first.unchanged == 0
+    page = (site / "entities" / "C_1.html").read_text(encoding="utf-8")
+    assert "<h2>Обратные ссылки</h2>" in page
+    assert '<a href="C_3.html">C_3 — Личный контракт</a> <span class="rel">requires</span>' in page
+    assert '<a href="../status/draft-filled.html">' in page
+    search = (site / "search-index.js").read_text(encoding="utf-8")
+    entries = json.loads(search[search.index("["):search.rindex("]") + 1])
+    assert [entry["id"] for entry in entries] == ["C_1", "C_2", "C_3"]
+
+    assert build_site(sample_ontology, site, title="Глоссарий").written == []
+
+    # Новое название C_2 видно на странице C_3 (цель связи) и C_1 (обратная ссылка)
+    sample_ontology.get_concept("C_2").name = "Стратегирование 2"
+    second = build_site(sample_ontology, site, title="Глоссарий")
+    assert {p for p in second.written if p.startswith("entities/")} == {
+        "entities/C_1.html", "entities/C_2.html", "entities/C_3.html"
+    }
+    assert "types/concept.html" in second.written and "index.html" not in second.written
+
+    sample_ontology.get_concept("C_1").definition = "Новое определение"
+    assert {p for p in build_site(sample_ontology, site, title="Глоссарий").written
+            if p.startswith("entities/")} == {"entities/C_1.html"}
+
+    sample_ontology.remove_entity("C_2")
+    third = build_site(sample_ontology, site, title="Глоссарий")
+    assert third.removed == ["entities/C_2.html"]
+    assert not (site / "entities" / "C_2.html").exists()
+    assert "entities/C_2.html" not in json.loads((site / MANIFEST_NAME).read_text())["pages"]
+
+    # --force перерисовывает всё, но страницы удалённых объектов всё равно убирает
+    sample_ontology.remove_entity("C_3")
+    forced = build_site(sample_ontology, site, title="Глоссарий", force=True)
+    assert forced.removed == ["entities/C_3.html"] and forced.unchanged == 0
+    assert "entities/C_1.html" in forced.written
+    assert not (site / "entities" / "C_3.html").exists()
+
+    # Манифест прошлой версии разметки: всё перерисовывается, страницы
+    # удалённых объектов по его списку удаляются
+    manifest = json.loads((site / MANIFEST_NAME).read_text(encoding="utf-8"))
+    manifest["version"] = 0
+    (site / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    sample_ontology.remove_entity("C_1")
+    upgraded = build_site(sample_ontology, site, title="Глоссарий")
+    assert upgraded.removed == ["entities/C_1.html"] and upgraded.unchanged == 0
+    assert not (site / "entities" / "C_1.html").exists()
+    assert (site / "assets" / "style.css").read_text(encoding="utf-8").startswith("body {")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-
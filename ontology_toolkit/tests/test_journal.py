@@ -0,0 +1,143 @@
+"""
+Тесты журнала пакетных AI-операций и возобновления fill-all.
+"""
+
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ontology_toolkit.ai.base_provider import AIProvider
+from ontology_toolkit.cli.main import app
+from ontology_toolkit.core.journal import OperationJournal, apply_fields
+from ontology_toolkit.core.ontology import Ontology
+from ontology_toolkit.core.schema import ConceptStatus
+
+runner = CliRunner()
+
+FILL_RESPONSE = (
+    "| name | definition | purpose | meta_meta | examples |\n"
+    "|------|-----------|---------|-----------|----------|\n"
+    "| X | Заполненное определение | Заполненное назначение | характеристика | Пример |"
+)
+
+
+class CountingProvider(AIProvider):
+    """Провайдер, считающий запросы и падающий на заданном по счёту."""
+
+    def __init__(self, fail_on: int = 0):
+        super().__init__("test-key", "mock-model")
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def generate(self, prompt: str, max_tokens: int = 2000) -> str:
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("сбой провайдера")
+        return FILL_RESPONSE
+
+    def is_available(self) -> bool:
+        return True
+
+    @property
+    def name(self) -> str:
+        return "Counting"
+
+
+def _make_ontology(root: Path, names) -> Ontology:
+    onto = Ontology(root)
+    for name in names:
+        onto.add_concept(name)
+    onto.save_all()
+    return onto
+
+
+def test_journal_replay_and_pending(tmp_path: Path):
+    """Журнал восстанавливается из файла, оборванная строка игнорируется."""
+    journal = OperationJournal.start(tmp_path, "fill-all", ["C_1", "C_2", "C_3"])
+    journal.record("C_1", {"definition": "a"})
+    journal.record_failure("C_2", "boom")
+    with open(journal.path, "a", encoding="utf-8") as handler:
+        handler.write('{"event": "done", "key": "C_3", "res')  # Сбой посреди записи
+
+    reopened = OperationJournal.unfinished(tmp_path, "fill-all")
+    assert reopened is not None
+    assert reopened.run_id == journal.run_id
+    assert reopened.results == {"C_1": {"definition": "a"}}
+    assert reopened.failures == {"C_2": "boom"}
+    assert reopened.pending() == ["C_2", "C_3"]
+
+    reopened.record("C_3", None)
+    reopened.finish()
+    assert OperationJournal(journal.path).pending() == ["C_2"]
+    assert OperationJournal.unfinished(tmp_path, "fill-all") is None
+    assert (tmp_path / ".journal" / ".gitignore").exists()
+
+
+def test_apply_fields_restores_result(tmp_path: Path):
+    """Результат из журнала применяется к сущности с валидацией."""
+    onto = Ontology(tmp_path / ".ontology")
+    concept = onto.add_concept("Агентность")
+    concept.mark_clean()
+
+    changed = apply_fields(
+        concept, {"definition": "Из журнала", "status": "draft+filled", "examples": ["x"]}
+    )
+
+    assert changed
+    assert concept.definition == "Из журнала"
+    assert concept.status == ConceptStatus.DRAFT_FILLED
+    assert concept.is_dirty
+    assert not apply_fields(concept, {"definition": "Из журнала"})
+
+
+def test_fill_all_resume_skips_done(tmp_path: Path, monkeypatch):
+    """После сбоя --resume запрашивает AI только для невыполненных понятий."""
+    from ontology_toolkit.ai.factory import AIProviderFactory
+
+    root = tmp_path / ".ontology"
+    _make_ontology(root, ["Альфа", "Бета", "Гамма"])
+
+    provider = CountingProvider(fail_on=2)
+    monkeypatch.setattr(AIProviderFactory, "from_env", staticmethod(lambda: provider))
+
+    args = ["fill-all", "--path", str(root), "--delay", "0"]
+    result = runner.invoke(app, args, input="y\n")
+    assert result.exit_code == 0, result.stdout
+    assert provider.calls == 3
+
+    journal = OperationJournal.unfinished(root, "fill-all")
+    assert journal is not None
+    assert len(journal.pending()) == 1
+
+    result = runner.invoke(app, args + ["--resume"], input="y\n")
+    assert result.exit_code == 0, result.stdout
+    assert provider.calls == 4
+    assert OperationJournal.unfinished(root, "fill-all") is None
+
+    reloaded = Ontology(root)
+    reloaded.load_all()
+    assert all(
+        entity.definition == "Заполненное определение"
+        for entity in reloaded.index.by_id.values()
+    )
+
+
+def test_fill_all_resume_recovers_unsaved_results(tmp_path: Path, monkeypatch):
+    """Ответы AI, записанные в журнал, но не сохранённые до сбоя, восстанавливаются."""
+    from ontology_toolkit.ai.factory import AIProviderFactory
+
+    root = tmp_path / ".ontology"
+    _make_ontology(root, ["Альфа"])
+    journal = OperationJournal.start(root, "fill-all", ["C_1"])
+    journal.record("C_1", {"definition": "Из журнала", "status": "draft+filled"})
+
+    provider = CountingProvider()
+    monkeypatch.setattr(AIProviderFactory, "from_env", staticmethod(lambda: provider))
+
+    result = runner.invoke(app, ["fill-all", "--path", str(root), "--resume"])
+    assert result.exit_code == 0, result.stdout
+    assert provider.calls == 0
+
+    reloaded = Ontology(root)
+    reloaded.load_all()
+    assert reloaded.index.get("C_1").definition == "Из журнала"
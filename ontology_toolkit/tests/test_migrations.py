@@ -0,0 +1,139 @@
+"""
+Тесты миграций схемы файлов (`ontology migrate`).
+"""
+
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from ontology_toolkit.cli.main import app
+from ontology_toolkit.core.config import load_config
+from ontology_toolkit.core.migrations import (
+    CURRENT_SCHEMA_VERSION,
+    MapValues,
+    Migration,
+    MigrationStep,
+    RenameField,
+    migrate_ontology,
+)
+from ontology_toolkit.core.ontology import Ontology
+
+runner = CliRunner()
+
+LEGACY = """---
+id: C_1
+name: Агентность
+status: draft+filled
+relations: []
+created: '2025-01-01T10:00:00'
+updated: '2025-01-01T10:00:00'
+---
+
+## Definition
+Способность действовать самостоятельно
+
+## Purpose
+Различать активную и пассивную позицию
+
+## Context
+Введено на недельной сессии
+"""
+
+
+def _legacy_ontology(root: Path, text: str = LEGACY) -> Path:
+    concepts = root / "concepts"
+    concepts.mkdir(parents=True)
+    file_path = concepts / "C_1_agentnost.md"
+    file_path.write_text(text, encoding="utf-8")
+    return file_path
+
+
+def test_fold_unknown_sections(tmp_path: Path):
+    """v1: неизвестная секция переносится в Notes, версия схемы записывается."""
+    root = tmp_path / ".ontology"
+    file_path = _legacy_ontology(root)
+
+    report = migrate_ontology(root, workers=1)
+
+    assert report.changed == ["concepts/C_1_agentnost.md"]
+    assert not report.errors
+    assert load_config(root).schema_version == CURRENT_SCHEMA_VERSION
+    onto = Ontology(root)
+    onto.load_all()
+    assert "### Context\nВведено на недельной сессии" in onto.get_concept("C_1").notes
+    assert "\n## Context" not in file_path.read_text(encoding="utf-8")
+
+    again = migrate_ontology(root, workers=1)
+    assert again.applied == [] and again.changed == []
+
+
+def test_dry_run_writes_nothing(tmp_path: Path):
+    """--dry-run только перечисляет файлы."""
+    root = tmp_path / ".ontology"
+    file_path = _legacy_ontology(root)
+
+    report = migrate_ontology(root, dry_run=True, workers=1)
+
+    assert report.changed == ["concepts/C_1_agentnost.md"]
+    assert file_path.read_text(encoding="utf-8") == LEGACY
+    assert load_config(root).schema_version == 0
+
+
+def test_custom_steps_and_parallel(tmp_path: Path, monkeypatch):
+    """Переименование и замена значений; пул процессов даёт тот же результат."""
+    from ontology_toolkit.core import migrations
+
+    steps = [
+        RenameField("state", "status", types=["concept"]),
+        MapValues("status", {"filled": "draft+filled"}),
+    ]
+    custom = [Migration(1, "Тест", steps)]
+    legacy = LEGACY.replace("status: draft+filled", "state: filled")
+
+    serial_root = tmp_path / "serial" / ".ontology"
+    parallel_root = tmp_path / "parallel" / ".ontology"
+    _legacy_ontology(serial_root, legacy)
+    _legacy_ontology(parallel_root, legacy)
+    monkeypatch.setattr(migrations, "PARALLEL_THRESHOLD", 1)
+
+    serial = migrate_ontology(serial_root, migrations=custom, workers=1)
+    parallel = migrate_ontology(parallel_root, migrations=custom, workers=2)
+
+    assert serial.changed == parallel.changed == ["concepts/C_1_agentnost.md"]
+    migrated = [
+        (root / "concepts" / "C_1_agentnost.md").read_text(encoding="utf-8")
+        for root in (serial_root, parallel_root)
+    ]
+    assert migrated[0] == migrated[1]
+    assert "status: draft+filled" in migrated[0]
+    assert "state: filled" not in migrated[0]
+
+
+def test_step_without_apply_is_rejected():
+    """Шаг без apply не создаётся, а не падает посреди миграции."""
+
+    class Incomplete(MigrationStep):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_migrate_command(tmp_path: Path):
+    """CLI migrate: отчёт и повторный запуск без изменений; init пишет текущую версию."""
+    root = tmp_path / ".ontology"
+    _legacy_ontology(root)
+
+    result = runner.invoke(app, ["migrate", "--path", str(root), "--workers", "1"])
+    assert result.exit_code == 0, result.stdout
+    assert "C_1_agentnost.md" in result.stdout
+
+    result = runner.invoke(app, ["migrate", "--path", str(root)])
+    assert result.exit_code == 0
+    assert "актуальна" in result.stdout
+
+    fresh = tmp_path / "fresh" / ".ontology"
+    result = runner.invoke(app, ["init", "--path", str(fresh), "--project", "Fresh"])
+    assert result.exit_code == 0, result.stdout
+    assert load_config(fresh).schema_version == CURRENT_SCHEMA_VERSION
@@ -0,0 +1,216 @@
+"""
+Тесты текстовой близости и предложения связей.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from ontology_toolkit.core import similarity
+from ontology_toolkit.core.ontology import Ontology
+from ontology_toolkit.core.schema import RelationType
+from ontology_toolkit.core.similarity import TfidfIndex, tokenize
+
+
+@pytest.fixture
+def onto(tmp_path: Path) -> Ontology:
+    """Онтология с тематически различающимися понятиями."""
+    onto = Ontology(tmp_path / ".ontology")
+
+    c1 = onto.add_concept("Стратегирование")
+    c1.definition = "Недельная сессия работы с неудовлетворённостями и планом спринта"
+    c1.purpose = "Выбирать приоритетные проекты на неделю"
+
+    c2 = onto.add_concept("Спринт")
+    c2.definition = "Недельный план работ с целью и слотами"
+    c2.purpose = "Планировать неделю по результатам стратегирования"
+
+    c3 = onto.add_concept("Экзокортекс")
+    c3.definition = "Внешняя память: заметки, база знаний, второй мозг"
+    c3.purpose = "Хранить знания вне головы"
+
+    c4 = onto.add_concept("Исчезающие заметки")
+    c4.definition = "Быстрые заметки, которые переносятся в базу знаний"
+    c4.purpose = "Не терять мысли и пополнять второй мозг"
+
+    return onto
+
+
+def test_tokenize_normalizes():
+    """Токенизация: регистр, ё→е, короткие слова и числа отбрасываются."""
+    assert tokenize("Ёмкий план на 2025 год") == ["емкий", "план", "год"]
+    assert tokenize("агентность агентности") == ["агентн", "агентн"]
+
+
+def test_suggest_relations_by_text(onto: Ontology):
+    """Предлагаются тематически близкие понятия."""
+    assert onto.suggest_relations("C_1", max_suggestions=1) == ["C_2"]
+    assert onto.suggest_relations("C_3", max_suggestions=1) == ["C_4"]
+
+
+def test_suggest_relations_excludes_related(onto: Ontology):
+    """Уже связанные пары не предлагаются (в обе стороны)."""
+    onto.get_concept("C_2").add_relation("C_1", RelationType.REQUIRES)
+
+    assert "C_2" not in onto.suggest_relations("C_1")
+    assert "C_1" not in onto.suggest_relations("C_2")
+
+
+def test_suggest_all_relations_batched(onto: Ontology):
+    """Пакетный расчёт совпадает с одиночными запросами."""
+    suggestions = onto.suggest_all_relations(max_suggestions=1)
+
+    assert set(suggestions) == {"C_1", "C_2", "C_3", "C_4"}
+    assert suggestions["C_1"][0][0] == "C_2"
+    assert suggestions["C_4"][0][0] == "C_3"
+
+
+def test_index_updates_incrementally(onto: Ontology, monkeypatch: pytest.MonkeyPatch):
+    """Новое понятие добавляет свой вектор, остальные не пересчитываются."""
+    index = onto.similarity
+    before = dict(index.vector("C_1"))
+
+    # Пока рост корпуса меньше порога дрейфа IDF, старые строки не пересчитываются
+    monkeypatch.setattr(similarity, "_IDF_DRIFT_LIMIT", 1.0)
+    c5 = onto.add_concept("Недельный цикл")
+    c5.definition = "Цикл из стратегирования и спринта на неделю"
+
+    assert onto.suggest_relations("C_5", max_suggestions=2)
+    assert "C_5" in index
+    assert index.vector("C_1") == before
+    assert index.similarity("C_5", "C_1") > 0
+
+
+def test_index_refresh_tracks_saved_and_dirty_entities(onto: Ontology):
+    """Индекс видит правку до сохранения и после него, чистые сущности не перечитываются."""
+    index = onto.similarity
+    onto.save_all()
+
+    c3 = onto.get_concept("C_3")
+    c3.definition = "Недельный план спринта"
+    assert onto.similarity.top_k("C_3", k=1)[0][0] in {"C_1", "C_2"}
+
+    c4 = onto.get_concept("C_4")
+    c4.definition = "Недельная сессия стратегирования"
+    onto.save_entity(c4)  # сохранено до следующего обращения к индексу
+    assert "недель" in index.vector("C_4")
+
+    calls = []
+    original = index.update
+    index.update = lambda entity: calls.append(entity.id) or original(entity)
+    onto.similarity
+    assert calls == ["C_3"]
+
+
+def test_index_remove():
+    """Удалённая сущность не участвует в выдаче."""
+    from ontology_toolkit.core.concept import ConceptFactory
+
+    first = ConceptFactory.create_filled("Альфа", "Слово общее", "Цель общая", None, [], "C_1")
+    second = ConceptFactory.create_filled("Бета", "Слово общее", "Цель общая", None, [], "C_2")
+    index = TfidfIndex()
+    index.build([first, second])
+
+    assert index.top_k("C_1", k=1)[0][0] == "C_2"
+    assert index.remove("C_2")
+    assert index.top_k("C_1", k=1) == []
+
+
+class CountingEmbedder:
+    """Детерминированная «модель»: мешок слов по хэшу, считает вызовы."""
+
+    def __init__(self, dim: int = 32):
+        self.dim = dim
+        self.embedded: list = []
+
+    def __call__(self, texts):
+        import zlib
+
+        self.embedded.extend(texts)
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for token in tokenize(text):
+                vector[zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def test_embeddings_cached_by_content_hash(onto: Ontology):
+    """Эмбеддинги пересчитываются только при изменении текста и переживают перезапуск."""
+    embedder = CountingEmbedder()
+    index = onto.use_embeddings(embedder, "test-model")
+
+    assert index.sync(onto.index.by_id.values()) == 4
+    assert index.sync(onto.index.by_id.values()) == 0
+
+    onto.get_concept("C_3").purpose = "Хранить заметки вне головы"
+    assert index.sync(onto.index.by_id.values()) == 1
+
+    reopened = Ontology(onto.root_path).use_embeddings(embedder, "test-model")
+    assert len(reopened) == 4
+    assert reopened.sync(onto.index.by_id.values()) == 0
+    assert (onto.root_path / ".cache" / "embeddings" / "test-model.f32").exists()
+
+
+def test_suggest_relations_uses_embeddings(onto: Ontology):
+    """При подключённом индексе предложения строятся по эмбеддингам."""
+    onto.use_embeddings(CountingEmbedder(dim=256), "test-model")
+
+    assert onto.suggest_relations("C_3", max_suggestions=1) == ["C_4"]
+    assert onto.embeddings.query_text("заметки база знаний", k=1)[0][0] in {"C_3", "C_4"}
+
+
+def test_embedding_rows_counter_and_batched_queries(onto: Ontology):
+    """Счётчик строк хранится в кэше; query_texts — один вызов модели на пачку."""
+    import json
+
+    embedder = CountingEmbedder(dim=256)
+    index = onto.use_embeddings(embedder, "test-model")
+    index.sync(onto.index.by_id.values())
+    meta_path = onto.root_path / ".cache" / "embeddings" / "test-model.json"
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["next_row"] == 4
+
+    # Освобождённая строка переиспользуется, счётчик не растёт
+    entities = [e for e in onto.index.by_id.values() if e.id != "C_2"]
+    index.sync(entities)
+    index.sync(entities + [onto.add_concept("Новое понятие")])
+    reopened = Ontology(onto.root_path).use_embeddings(embedder, "test-model")
+    assert reopened._next_row == 4
+    assert sorted(row for row, _ in reopened._entries.values()) == [0, 1, 2, 3]
+
+    texts = ["заметки база знаний", "Новое понятие", "агентность"]
+    embedder.embedded.clear()
+    batched = index.query_texts(texts, k=2)
+    assert embedder.embedded == texts
+    assert batched == [index.query_text(text, k=2) for text in texts]
+
+
+def test_suggest_all_relations_uses_embeddings(onto: Ontology, monkeypatch: pytest.MonkeyPatch):
+    """Пакетные предложения при подключённом индексе идут по эмбеддингам, а не по TF-IDF."""
+    index = onto.use_embeddings(CountingEmbedder(dim=256), "test-model")
+    onto.get_concept("C_2").add_relation("C_1", RelationType.REQUIRES)
+    monkeypatch.setattr(Ontology, "similarity", property(lambda self: pytest.fail("TF-IDF")))
+
+    suggestions = onto.suggest_all_relations(max_suggestions=2)
+
+    assert set(suggestions) == {"C_1", "C_2", "C_3", "C_4"}
+    assert "C_2" not in [target for target, _ in suggestions["C_1"]]
+    for entity_id, found in suggestions.items():
+        related = {"C_1": {"C_2"}, "C_2": {"C_1"}}.get(entity_id, set())
+        single = index.top_k(entity_id, k=2, exclude=related, min_score=0.05)
+        assert [target for target, _ in found] == [target for target, _ in single]
+        assert [score for _, score in found] == pytest.approx([score for _, score in single])
+
+
+def test_embedding_dim_change_reembeds_unchanged_entities(onto: Ontology):
+    """Смена размерности модели пересчитывает все сущности, а не только изменённые."""
+    onto.use_embeddings(CountingEmbedder(dim=32), "test-model").sync(onto.index.by_id.values())
+
+    onto.get_concept("C_3").purpose = "Хранить заметки вне головы"
+    embedder = CountingEmbedder(dim=64)
+    reopened = Ontology(onto.root_path).use_embeddings(embedder, "test-model")
+    assert reopened.sync(onto.index.by_id.values()) == 4
+
+    assert len(embedder.embedded) == 4 and reopened.dim == 64
+    assert all(reopened.vector(entity_id) is not None for entity_id in onto.index.by_id)
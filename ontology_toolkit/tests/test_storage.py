@@ -0,0 +1,319 @@
+"""
+Тесты слоя хранения: атомарная запись и пакетный fsync.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from ontology_toolkit.core import storage
+from ontology_toolkit.core.ontology import Ontology
+from ontology_toolkit.core.storage import (
+    AtomicWriteBatch,
+    BulkWriteError,
+    BulkWriter,
+    atomic_write_bytes,
+)
+
+
+def test_atomic_write_replaces_file(tmp_path: Path):
+    """Атомарная запись заменяет файл и не оставляет временных файлов."""
+    target = tmp_path / "C_1_test.md"
+    target.write_text("old", encoding="utf-8")
+
+    atomic_write_bytes(target, "новое".encode("utf-8"))
+
+    assert target.read_text(encoding="utf-8") == "новое"
+    assert [p.name for p in tmp_path.iterdir()] == ["C_1_test.md"]
+
+
+def test_atomic_write_interrupted_keeps_original(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Сбой перед заменой не повреждает исходный файл."""
+    target = tmp_path / "C_1_test.md"
+    target.write_text("исходное", encoding="utf-8")
+
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(storage.os, "replace", crash)
+    with pytest.raises(KeyboardInterrupt):
+        atomic_write_bytes(target, b"partial")
+
+    assert target.read_text(encoding="utf-8") == "исходное"
+    assert [p.name for p in tmp_path.iterdir()] == ["C_1_test.md"]
+
+
+def test_batch_groups_fsync(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Пакет пишет файлы только при фиксации; fsync каталога — один раз."""
+    synced_dirs = []
+    monkeypatch.setattr(storage, "_fsync_directory", synced_dirs.append)
+
+    with AtomicWriteBatch() as batch:
+        for i in range(5):
+            batch.write(tmp_path / f"C_{i}.md", f"{i}".encode())
+        assert not list(tmp_path.glob("*.md"))
+
+    assert len(list(tmp_path.glob("*.md"))) == 5
+    assert synced_dirs == [tmp_path]
+
+
+def test_batch_abort_on_error(tmp_path: Path):
+    """Исключение внутри пакета удаляет временные файлы, цели не меняются."""
+    target = tmp_path / "C_1.md"
+    target.write_bytes(b"old")
+
+    with pytest.raises(RuntimeError):
+        with AtomicWriteBatch() as batch:
+            batch.write(target, b"new")
+            raise RuntimeError("сбой")
+
+    assert target.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["C_1.md"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Права файлов проверяются только на POSIX")
+def test_atomic_write_keeps_permissions(tmp_path: Path):
+    """Заменённый файл сохраняет права исходного."""
+    target = tmp_path / "C_1.md"
+    target.write_bytes(b"old")
+    target.chmod(0o640)
+
+    atomic_write_bytes(target, b"new")
+
+    assert target.stat().st_mode & 0o777 == 0o640
+
+
+def test_save_all_uses_batch(tmp_path: Path):
+    """save_all помечает сущности чистыми только после фиксации пакета."""
+    onto = Ontology(tmp_path / ".ontology")
+    concepts = [onto.add_concept(name) for name in ("Агентность", "Стратегирование")]
+
+    saved = onto.save_all()
+
+    assert len(saved) == 2
+    assert all(path.exists() for path in saved)
+    assert not any(concept.is_dirty for concept in concepts)
+    assert not list(onto.concepts_dir.glob("*.tmp"))
+
+
+def test_rename_replaces_old_file(tmp_path: Path):
+    """Переименование сущности не оставляет файл со старым именем."""
+    root = tmp_path / ".ontology"
+    onto = Ontology(root)
+    concept = onto.add_concept("Агентность")
+    old_path = onto.save_entity(concept)
+
+    reloaded = Ontology(root)
+    reloaded.load_all()
+    assert reloaded.path_for(concept.id) == old_path
+
+    entity = reloaded.index.get(concept.id)
+    entity.name = "Агентность роли"
+    new_path = reloaded.save_entity(entity)
+
+    assert new_path != old_path
+    assert not old_path.exists()
+    assert [p.name for p in reloaded.concepts_dir.glob("*.md")] == [new_path.name]
+
+
+def test_path_index_persisted_and_batch_rename(tmp_path: Path):
+    """Индекс путей читается из кэша без загрузки; save_all удаляет старые файлы."""
+    root = tmp_path / ".ontology"
+    onto = Ontology(root)
+    concept = onto.add_concept("Метод")
+    old_path = onto.save_entity(concept)
+
+    cold = Ontology(root)  # без load_all
+    assert cold.path_for(concept.id) == old_path
+
+    concept.name = "Метод работы"
+    onto.save_all()
+    assert not old_path.exists()
+    assert len(list(onto.concepts_dir.glob("*.md"))) == 1
+
+    onto.remove_entity(concept.id, delete_file=True)
+    assert not list(onto.concepts_dir.glob("*.md"))
+    assert Ontology(root).path_for(concept.id) is None
+
+
+def test_single_saves_append_to_path_log(tmp_path: Path):
+    """Одиночные сохранения дописывают журнал, а не переписывают весь кэш путей."""
+    root = tmp_path / ".ontology"
+    onto = Ontology(root)
+    onto.save_entity(onto.add_concept("Первое"))
+    onto.load_all()  # полная запись кэша
+    cache = root / ".cache" / "paths.json"
+    log = root / ".cache" / "paths.log"
+    snapshot = cache.read_bytes()
+
+    saved = [onto.save_entity(onto.add_concept(f"Понятие {i}")) for i in range(3)]
+    renamed = onto.index.get("C_1")
+    renamed.name = "Первое переименованное"
+    new_path = onto.save_entity(renamed)
+    onto.remove_entity("C_2", delete_file=True)
+
+    assert cache.read_bytes() == snapshot
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 5
+    with open(log, "a", encoding="utf-8") as handler:
+        handler.write('["C_9", "conc')  # строка, оборванная сбоем
+
+    cold = Ontology(root)  # кэш + журнал, без load_all
+    assert cold.path_for("C_1") == new_path
+    assert cold.path_for("C_2") is None
+    assert cold.path_for("C_4") == saved[2]
+    assert cold.path_for("C_9") is None
+
+    cold.paths.save(force=True)
+    assert not log.exists()
+    assert Ontology(root).path_for("C_3") == saved[1]
+
+
+def test_read_only_load_keeps_path_cache(tmp_path: Path):
+    """Повторная загрузка без изменений не переписывает кэш путей."""
+    root = tmp_path / ".ontology"
+    onto = Ontology(root)
+    for name in ("Первое", "Второе"):
+        onto.save_entity(onto.add_concept(name))
+    onto.load_all()
+    cache = root / ".cache" / "paths.json"
+    stamp = cache.stat().st_mtime_ns - 10**9  # отметка в прошлом: запись её изменит
+    os.utime(cache, ns=(stamp, stamp))
+
+    Ontology(root).load_all()
+    assert cache.stat().st_mtime_ns == stamp
+
+    # Файл, появившийся мимо онтологии, — кэш обновляется
+    next(onto.concepts_dir.glob("C_2_*.md")).unlink()
+    reloaded = Ontology(root)
+    reloaded.load_all()
+    assert cache.stat().st_mtime_ns != stamp
+    assert Ontology(root).path_for("C_2") is None
+
+
+def test_bulk_writer_back_pressure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Пул записи ждёт, если в работе уже max_pending файлов."""
+    import threading
+    import time
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+    original_stage = storage._stage
+
+    def slow_stage(path, data):
+        with lock:
+            active.append(path)
+            peak.append(len(active))
+        time.sleep(0.005)
+        try:
+            return original_stage(path, data)
+        finally:
+            with lock:
+                active.remove(path)
+
+    monkeypatch.setattr(storage, "_stage", slow_stage)
+    in_flight = []
+    with BulkWriter(workers=2, max_pending=3) as writer:
+        for i in range(20):
+            writer.write(tmp_path / f"C_{i}.md", f"{i}".encode())
+            in_flight.append(sum(not f.done() for f, _ in writer._pending.values()))
+
+    assert max(in_flight) <= 3
+    assert max(peak) <= 2
+    assert len(list(tmp_path.glob("*.md"))) == 20
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_bulk_writer_reports_errors_at_end(tmp_path: Path):
+    """Ошибка одной записи не мешает остальным и сообщается при фиксации."""
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("file", encoding="utf-8")
+
+    with pytest.raises(BulkWriteError) as error:
+        with BulkWriter(workers=2) as writer:
+            writer.write(tmp_path / "C_1.md", b"one")
+            writer.write(blocker / "C_2.md", b"two")
+            writer.write(tmp_path / "C_3.md", b"three")
+
+    assert [path for path, _ in error.value.errors] == [blocker / "C_2.md"]
+    assert sorted(p.name for p in error.value.written) == ["C_1.md", "C_3.md"]
+    assert (tmp_path / "C_3.md").read_bytes() == b"three"
+
+
+def test_failed_rename_keeps_old_file_and_path_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Если новый файл не записался, старый файл и запись в индексе путей остаются."""
+    root = tmp_path / ".ontology"
+    onto = Ontology(root)
+    concept = onto.add_concept("Агентность")
+    other = onto.add_concept("Стратегирование")
+    old_path = onto.save_entity(concept)
+    onto.save_entity(other)
+    onto.load_all()
+
+    original = BulkWriter._stage_and_sync
+
+    def failing(self, path, data):
+        if path.name.startswith("C_1_"):
+            raise OSError("диск заполнен")
+        return original(self, path, data)
+
+    monkeypatch.setattr(BulkWriter, "_stage_and_sync", failing)
+    onto.index.get("C_1").name = "Агентность роли"
+    onto.index.get("C_2").name = "Стратегирование роли"
+    with pytest.raises(BulkWriteError) as error:
+        onto.save_all()
+
+    assert [path.name[:4] for path, _ in error.value.errors] == ["C_1_"]
+    assert old_path.exists()
+    assert onto.path_for("C_1") == old_path
+    assert Ontology(root).path_for("C_1") == old_path
+    # Успешное переименование другой сущности зафиксировано
+    assert onto.path_for("C_2").exists()
+    assert len(list(onto.concepts_dir.glob("C_2_*.md"))) == 1
+
+
+def test_sharded_layout_save_load_and_relayout(tmp_path: Path):
+    """Раскладка sharded: файлы в подкаталогах по номеру ID, перенос туда и обратно."""
+    from ontology_toolkit.core.config import load_config, save_config
+    from ontology_toolkit.core.schema import OntologyConfig
+
+    root = tmp_path / ".ontology"
+    root.mkdir()
+    save_config(root, OntologyConfig(project_name="test", layout="sharded", shard_size=2))
+
+    onto = Ontology(root)
+    for name in ["Альфа", "Бета", "Гамма"]:
+        onto.add_concept(name)
+    onto.save_all()
+
+    # shard_size=2: C_1 → 00/, C_2 и C_3 → 01/
+    assert onto.path_for("C_1").parent == root / "concepts" / "00"
+    assert onto.path_for("C_3").parent == root / "concepts" / "01"
+
+    reloaded = Ontology(root)
+    reloaded.load_all()
+    assert len(reloaded.index.by_id) == 3
+
+    # Переименование внутри шарда не оставляет старого файла
+    reloaded.index.get("C_3").name = "Дельта"
+    reloaded.save_all()
+    assert sorted(p.name for p in (root / "concepts" / "01").glob("C_3_*.md")) == [
+        reloaded.path_for("C_3").name
+    ]
+
+    moves = reloaded.relayout("flat", dry_run=True)
+    assert len(moves) == 3
+    assert (root / "concepts" / "00").exists()
+
+    reloaded.relayout("flat")
+    assert load_config(root).layout == "flat"
+    assert sorted(p.name for p in (root / "concepts").iterdir()) == sorted(
+        path.name for _, path in moves
+    )
+
+    flat = Ontology(root)
+    flat.load_all()
+    assert flat.path_for("C_2").parent == root / "concepts"
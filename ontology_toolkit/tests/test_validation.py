@@ -0,0 +1,108 @@
+"""
+Тесты движка правил `ontology validate`.
+"""
+
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from ontology_toolkit.cli.main import app
+from ontology_toolkit.core.ontology import Ontology
+from ontology_toolkit.core.schema import ConceptStatus, MetaMetaType, RelationType
+from ontology_toolkit.core.validation import RULES, validate_ontology
+
+runner = CliRunner()
+
+
+def _fill(concept, meta_meta=None):
+    concept.definition = f"Определение {concept.name}"
+    concept.purpose = f"Назначение {concept.name}"
+    concept.status = ConceptStatus.DRAFT_FILLED
+    concept.meta_meta = meta_meta
+
+
+def _make_ontology(root: Path) -> Ontology:
+    onto = Ontology(root)
+    agency = onto.add_concept("Агентность")
+    indicator = onto.add_concept("Число проектов")
+    opposite = onto.add_concept("Пассивность")
+    draft = onto.add_concept("Черновик")
+    _fill(agency, MetaMetaType.CHARACTERISTIC)
+    _fill(indicator, MetaMetaType.INDICATOR)  # Показатель без связи с характеристикой
+    _fill(opposite)  # Заполнено, но без meta_meta
+    agency.add_relation(opposite.id, RelationType.OPPOSITE_OF)  # Без обратной связи
+    agency.add_relation("C_99", RelationType.REQUIRES)  # Битая ссылка
+    draft.add_relation(agency.id, RelationType.PART_OF)
+    agency.add_relation(draft.id, RelationType.PART_OF)  # Взаимная part_of
+    onto.save_all()
+    return onto
+
+
+def test_rules_report_issues(tmp_path: Path):
+    """Каждое встроенное правило находит свою проблему."""
+    root = tmp_path / ".ontology"
+    _make_ontology(root)
+
+    report = validate_ontology(root, workers=1)
+
+    found = {(issue.rule, issue.entity_id) for issue in report.issues}
+    assert ("relation-target", "C_1") in found
+    assert ("relation-symmetry", "C_1") in found
+    assert ("meta-meta-links", "C_2") in found
+    assert ("meta-meta-required", "C_3") in found
+    assert not any(issue.rule == "placeholder" for issue in report.issues)  # Черновик C_4
+    assert [issue.rule for issue in report.errors] == ["relation-target"]
+    assert report.files_checked == report.entities == 4
+    assert not report.passed()
+
+
+def test_schema_errors_and_rule_selection(tmp_path: Path):
+    """Ошибки схемы сообщаются всегда, остальные правила — по выбору."""
+    root = tmp_path / ".ontology"
+    _make_ontology(root)
+    (root / "concepts" / "C_5_broken.md").write_text(
+        "---\nid: C_5\nname: Broken\nstatus: approved\n---\n\n## Definition\n[пусто]\n",
+        encoding="utf-8",
+    )
+
+    report = validate_ontology(root, rules=["placeholder"], workers=1)
+
+    assert report.rules == ["schema", "placeholder"]
+    assert {issue.rule for issue in report.issues} == {"schema"}
+    assert any("purpose" in issue.message for issue in report.errors)
+
+
+def test_parallel_matches_serial(tmp_path: Path, monkeypatch):
+    """Проверка в пуле процессов даёт тот же отчёт, что и последовательная."""
+    from ontology_toolkit.core import validation
+
+    root = tmp_path / ".ontology"
+    _make_ontology(root)
+    monkeypatch.setattr(validation, "PARALLEL_THRESHOLD", 1)
+
+    serial = validate_ontology(root, workers=1)
+    parallel = validate_ontology(root, workers=2)
+
+    assert parallel.issues == serial.issues
+
+
+def test_validate_command_json(tmp_path: Path):
+    """validate --json: машиночитаемый отчёт и код 1 при ошибках."""
+    root = tmp_path / ".ontology"
+    _make_ontology(root)
+
+    result = runner.invoke(app, ["validate", "--path", str(root), "--json", "--workers", "1"])
+    assert result.exit_code == 1
+    report = json.loads(result.stdout)
+    assert report["entities"] == 4
+    assert set(report["rules"]) == {"schema", *RULES}
+
+    result = runner.invoke(app, ["validate", "--path", str(root), "-r", "meta-meta-required"])
+    assert result.exit_code == 0
+    result = runner.invoke(
+        app, ["validate", "--path", str(root), "-r", "meta-meta-required", "--strict"]
+    )
+    assert result.exit_code == 1
+    result = runner.invoke(app, ["validate", "--path", str(root), "-r", "nonexistent"])
+    assert result.exit_code == 1